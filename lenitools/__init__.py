@@ -1,17 +1,66 @@
 # <> with ❤ by @LeniMagEsVonHinten
 
-from .rigginghelpers import *
-from .shelftools import *
-from .install import *
-from .filter import *
+""" Scripts and helper tools for Maya, submodules are imported on first use """
+
+import importlib
 
 __all__ = [
     # rigginghelpers
     'Leni_rigginghelpers_lock',
+    'Leni_rigginghelpers_snapshot',
+    'Leni_rigginghelpers_restore',
 
     # shelftools
     'Leni_shelftools_get_shelf',
     'Leni_shelftools_toggle_height',
     'Leni_shelftools_height_in_pixel',
     'Leni_shelftools_set_height',
-]
\ No newline at end of file
+    'Leni_shelftools_define_shelf',
+    'Leni_shelftools_build_shelf',
+    'Leni_shelftools_timings',
+]
+
+# public names and the submodules defining them. Importing lenitools stays fast and works outside of Maya,
+# maya.cmds is only imported with the first Maya tool used.
+_LAZY_NAMES = {
+    'Leni_rigginghelpers_lock': 'rigginghelpers',
+    'Leni_rigginghelpers_snapshot': 'rigginghelpers',
+    'Leni_rigginghelpers_restore': 'rigginghelpers',
+    'Leni_shelftools_get_shelf': 'shelftools',
+    'Leni_shelftools_toggle_height': 'shelftools',
+    'Leni_shelftools_height_in_pixel': 'shelftools',
+    'Leni_shelftools_set_height': 'shelftools',
+    'Leni_shelftools_define_shelf': 'shelftools',
+    'Leni_shelftools_build_shelf': 'shelftools',
+    'Leni_shelftools_timings': 'shelftools',
+    'Leni_install_wheel': 'install',
+    'Leni_list_archive': 'install',
+    'Leni_iter_archive_members': 'install',
+    'Leni_extract_archive': 'install',
+    'Leni_installed_distributions': 'install',
+    'Leni_install_plan': 'install',
+    'Leni_filter_tarmembersuffix': 'filter',
+}
+
+# submodules, that used to be imported with lenitools, e.g. lenitools.filter
+_LAZY_SUBMODULES = ('rigginghelpers', 'shelftools', 'install', 'filter')
+
+
+def __getattr__(name: str):
+    """
+    import the submodule defining <name>, or the submodule <name>, on first access
+
+    :param name: attribute name
+    :raise AttributeError: if no submodule defines <name>
+    """
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('.{}'.format(name), __name__)
+    if name not in _LAZY_NAMES:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(importlib.import_module('.{}'.format(_LAZY_NAMES[name]), __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_NAMES) | set(_LAZY_SUBMODULES))
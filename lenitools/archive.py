@@ -0,0 +1,136 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Read tar archives in a single pass """
+
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import bz2
+import functools
+import gzip
+import lzma
+import os
+import tarfile
+
+__all__ = ['Leni_archive_format', 'Leni_archive_iter', 'Leni_archive_read']
+
+# magic bytes of the supported compressions, mapped to the tarfile mode suffix and a function to open them
+_COMPRESSIONS = (
+    (b'\x1f\x8b', 'gz', gzip.open),
+    (b'BZh', 'bz2', bz2.open),
+    (b'\xfd7zXZ\x00', 'xz', lzma.open),
+)
+
+
+def Leni_archive_format(filepath) -> Optional[str]:
+    """
+    Sniff the format of a tar archive
+
+    Only the first bytes of the file are read. Compressed files are decompressed up to the first tar header,
+    which makes this a lot cheaper than ``tarfile.is_tarfile``.
+
+    :param filepath: filepath to archive
+    :return: compression of the tar archive ('', 'gz', 'bz2' or 'xz') or None, if it is no tar archive
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return _sniff_format(str(filepath), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sniff_format(filepath: str, size: int, mtime: int) -> Optional[str]:
+    """
+    Sniff the format of a tar archive, memoized by file size and modification time
+
+    :param filepath: filepath to archive
+    :param size: file size, only used as cache key
+    :param mtime: modification time in nanoseconds, only used as cache key
+    :return: compression of the tar archive ('', 'gz', 'bz2' or 'xz') or None, if it is no tar archive
+    """
+    if not Path(filepath).is_file():
+        return None
+    try:
+        with open(filepath, 'rb') as file:
+            magic = file.read(8)
+        compression, open_func = '', open
+        for signature, name, func in _COMPRESSIONS:
+            if magic.startswith(signature):
+                compression, open_func = name, func
+                break
+        with open_func(filepath, 'rb') as file:
+            header = file.read(tarfile.BLOCKSIZE)
+        tarfile.TarInfo.frombuf(header, tarfile.ENCODING, 'surrogateescape')
+    except (OSError, EOFError, lzma.LZMAError, tarfile.HeaderError):
+        return None
+    return compression
+
+
+def Leni_archive_iter(filepath, path=None, select: Optional[Callable] = None,
+                      compression: Optional[str] = None) -> Iterator[tarfile.TarInfo]:
+    """
+    Generator to enumerate the members of a tar archive and extract the selected ones on the way
+
+    The archive is read as a stream, so compressed archives are decompressed exactly once.
+
+    :param filepath: filepath to archive
+    :param path: target directory. If not given, members are only enumerated.
+    :param select: function returning True for each TarInfo to extract, Defaults to all members
+    :param compression: compression as returned by Leni_archive_format, sniffed if not given
+    :return: next TarInfo object
+    """
+    compression = Leni_archive_format(filepath) if compression is None else compression
+    if compression is None:
+        raise tarfile.ReadError('*** Not a tar archive: {}'.format(filepath))
+
+    with tarfile.open(filepath, mode='r|{}'.format(compression)) as archive:
+        for member in archive:
+            if path is not None and (select is None or select(member)):
+                _extract_member(archive, member, path)
+            yield member
+
+
+def Leni_archive_read(filepath, path=None, select: Optional[Callable] = None,
+                      compression: Optional[str] = None) -> list[tarfile.TarInfo]:
+    """
+    Enumerate the members of a tar archive and extract the selected ones in a single pass
+
+    >>> Leni_archive_read('wheels.tar.gz', path='/tmp/wheels', select=lambda m: m.name.endswith('.whl'))
+
+    :param filepath: filepath to archive
+    :param path: target directory. If not given, members are only enumerated.
+    :param select: function returning True for each TarInfo to extract, Defaults to all members
+    :param compression: compression as returned by Leni_archive_format, sniffed if not given
+    :return: list of TarInfo objects of all members
+    """
+    return list(Leni_archive_iter(filepath, path=path, select=select, compression=compression))
+
+
+def _extract_member(archive: tarfile.TarFile, member: tarfile.TarInfo, path) -> None:
+    """
+    Extract a member of an open archive, refusing members outside of the target directory
+
+    :param archive: open archive
+    :param member: TarInfo to extract
+    :param path: target directory
+    """
+    _target_path(path, member.name)
+    if hasattr(tarfile, 'data_filter'):
+        archive.extract(member, path=path, filter='data')
+    else:
+        archive.extract(member, path=path)
+
+
+def _target_path(path, name: str) -> str:
+    """
+    return the target path of a member, refusing members outside of the target directory
+
+    :param path: target directory
+    :param name: member name
+    """
+    root = os.path.realpath(path)
+    target = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, target]) != root:
+        raise tarfile.ExtractError('*** Member outside of target directory: {}'.format(name))
+    return target
@@ -0,0 +1,313 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Persistent member index for tar archives """
+
+from pathlib import Path
+from typing import Callable, Optional
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+
+from .archive import Leni_archive_format, _COMPRESSIONS, _extract_member, _target_path
+from .cache import Leni_cache_digest, Leni_cache_directory, _write_atomic
+from .lockfile import Leni_lockfile_once
+
+__all__ = ['Leni_archive_index', 'Leni_archive_extract_members']
+
+# version of the index file format, indices with another version are rebuilt
+INDEX_VERSION = 1
+
+# suffix of index files stored next to the archive
+SIDECAR_SUFFIX = '.lenitools-index.json'
+
+# member types that can be extracted by offset, links and special files need tarfile
+_SEEKABLE_TYPES = (tarfile.REGTYPE.decode(), tarfile.AREGTYPE.decode(), tarfile.DIRTYPE.decode())
+
+# member types with content, that can be streamed to a sink
+_FILE_TYPES = (tarfile.REGTYPE.decode(), tarfile.AREGTYPE.decode())
+
+
+def Leni_archive_index(filepath, cache_dir=None, sidecar: bool = False, shared: bool = False) -> list[dict]:
+    """
+    return the members of a tar archive from its index
+
+    The index is built on the first scan and reused as long as size and modification time of the archive
+    do not change. If only the modification time changed, the content hash decides.
+
+    Each member is described by name, type, size, mode, mtime, offset (of its header) and
+    offset_data (of its content), offsets are positions in the decompressed stream.
+
+    :param filepath: filepath to archive
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param sidecar: store the index next to the archive instead of the cache directory
+    :param shared: the cache is shared by many hosts, only one of them scans the archive,
+        see lenitools.cache.Leni_cache_extract
+    :return: list of member descriptions
+    """
+    if shared:
+        index_file = _index_file(filepath, cache_dir, sidecar)
+        index = Leni_lockfile_once(index_file.with_name('.lock-' + index_file.name),
+                                   lambda: _load_index(filepath, cache_dir, sidecar),
+                                   lambda: _scan(filepath, cache_dir=cache_dir, sidecar=sidecar))
+        return index['members']
+    index = _load_index(filepath, cache_dir, sidecar)
+    if index is None:
+        index = _scan(filepath, cache_dir=cache_dir, sidecar=sidecar)
+    return index['members']
+
+
+def Leni_archive_extract_members(filepath, names, path=None, cache_dir=None, sidecar: bool = False,
+                                 sink: Optional[Callable] = None) -> list[str]:
+    """
+    Extract some members of a tar archive, using its index to avoid decompressing all of it
+
+    With a valid index, uncompressed archives are read only at the offsets of the selected members and
+    compressed archives are only decompressed up to the last selected member. Without an index, the archive
+    is read in a single pass, which builds the index on the way. Either way, each member is read once.
+
+    Instead of writing files, the content of each selected file can be streamed to a file-like object:
+
+    >>> wheels = {}
+    >>> Leni_archive_extract_members('bundle.tar.gz', ['six-1.16.0-py2.py3-none-any.whl'],
+    ...                              sink=lambda name: wheels.setdefault(name, io.BytesIO()))
+    ['six-1.16.0-py2.py3-none-any.whl']
+
+    :param filepath: filepath to archive
+    :param names: names of the members to extract, or a function returning True for the name of each member to extract
+    :param path: target directory, required without <sink>
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param sidecar: store the index next to the archive instead of the cache directory
+    :param sink: function returning a writable binary file for the name of each selected file, or None to skip it.
+        The file is not closed. Directories, links and special files are skipped.
+    :return: names of the extracted members
+    """
+    if path is None and sink is None:
+        raise TypeError('*** Wrong parameters: Expecting a path or a sink')
+    matches = names if callable(names) else set(names).__contains__
+    index = _load_index(filepath, cache_dir, sidecar)
+    if index is None or sink is None and any(
+            m['type'] not in _SEEKABLE_TYPES for m in index['members'] if matches(m['name'])):
+        extracted = []
+
+        def select(member: tarfile.TarInfo) -> bool:
+            if not matches(member.name):
+                return False
+            if sink is None:
+                extracted.append(member.name)
+            return True
+
+        def record(name: str):
+            target_file = sink(name)
+            if target_file is not None:
+                extracted.append(name)
+            return target_file
+
+        _scan(filepath, path=path, select=select, cache_dir=cache_dir, sidecar=sidecar,
+              sink=record if sink is not None else None)
+        return extracted
+
+    selected = sorted((m for m in index['members'] if matches(m['name'])), key=lambda m: m['offset_data'])
+    compression = index['compression']
+    open_func = next((func for _signature, name, func in _COMPRESSIONS if name == compression), open)
+    extracted = []
+    with open_func(filepath, 'rb') as stream:
+        position = 0
+        for member in selected:
+            if sink is not None:
+                if member['type'] not in _FILE_TYPES:
+                    continue
+                target_file = sink(member['name'])
+                if target_file is None:
+                    continue
+                if compression:
+                    _skip(stream, member['offset_data'] - position)
+                else:
+                    stream.seek(member['offset_data'])
+                _copy(stream, target_file, member['size'])
+                position = member['offset_data'] + member['size']
+                extracted.append(member['name'])
+                continue
+            target = _target_path(path, member['name'])
+            if member['type'] == tarfile.DIRTYPE.decode():
+                os.makedirs(target, exist_ok=True)
+                extracted.append(member['name'])
+                continue
+            if compression:
+                # compressed streams can only be read forward
+                _skip(stream, member['offset_data'] - position)
+            else:
+                stream.seek(member['offset_data'])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as file:
+                _copy(stream, file, member['size'])
+            os.chmod(target, member['mode'] & 0o777)
+            os.utime(target, (member['mtime'], member['mtime']))
+            position = member['offset_data'] + member['size']
+            extracted.append(member['name'])
+    return extracted
+
+
+def _index_file(filepath, cache_dir=None, sidecar: bool = False) -> Path:
+    """
+    return the filepath of the index of an archive
+
+    :param filepath: filepath to archive
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param sidecar: store the index next to the archive instead of the cache directory
+    """
+    filepath = Path(filepath).absolute()
+    if sidecar:
+        return filepath.with_name(filepath.name + SIDECAR_SUFFIX)
+    key = hashlib.sha1(str(filepath).encode('utf-8', 'surrogateescape')).hexdigest()
+    return Leni_cache_directory(cache_dir) / 'index' / '{}.json'.format(key)
+
+
+def _load_index(filepath, cache_dir=None, sidecar: bool = False) -> Optional[dict]:
+    """
+    Load the index of an archive, if it is still valid
+
+    :param filepath: filepath to archive
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param sidecar: look for the index next to the archive instead of the cache directory
+    :return: index or None
+    """
+    index_file = _index_file(filepath, cache_dir, sidecar)
+    try:
+        stat = os.stat(filepath)
+        index = json.loads(index_file.read_text(encoding='utf-8'))
+        if index['version'] != INDEX_VERSION or index['size'] != stat.st_size:
+            return None
+        if index['mtime'] != stat.st_mtime_ns:
+            # touched, but maybe not changed
+            if Leni_cache_digest(filepath, cache_dir) != index['digest']:
+                return None
+            index['mtime'] = stat.st_mtime_ns
+            try:
+                _write_index(index_file, index)
+            except OSError:
+                pass
+        return index
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _scan(filepath, path=None, select: Optional[Callable] = None, cache_dir=None, sidecar: bool = False,
+          sink: Optional[Callable] = None) -> dict:
+    """
+    Read a tar archive in a single pass, extract the selected members and write its index
+
+    :param filepath: filepath to archive
+    :param path: target directory. If not given, members are only enumerated.
+    :param select: function returning True for each TarInfo to extract, Defaults to all members
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param sidecar: store the index next to the archive instead of the cache directory
+    :param sink: stream selected files to a file returned by sink(name) instead, see Leni_archive_extract_members
+    :return: index
+    """
+    compression = Leni_archive_format(filepath)
+    if compression is None:
+        raise tarfile.ReadError('*** Not a tar archive: {}'.format(filepath))
+
+    stat = os.stat(filepath)
+    members = []
+    with open(filepath, 'rb') as file:
+        reader = _HashingReader(file)
+        with tarfile.open(fileobj=reader, mode='r|{}'.format(compression)) as archive:
+            for member in archive:
+                if sink is not None and member.isreg() and (select is None or select(member)):
+                    target_file = sink(member.name)
+                    if target_file is not None:
+                        shutil.copyfileobj(archive.extractfile(member), target_file)
+                elif sink is None and path is not None and (select is None or select(member)):
+                    _extract_member(archive, member, path)
+                members.append({
+                    'name': member.name,
+                    'type': member.type.decode(),
+                    'size': member.size,
+                    'mode': member.mode,
+                    'mtime': int(member.mtime),
+                    'offset': member.offset,
+                    'offset_data': member.offset_data,
+                })
+        reader.read_to_end()
+
+    index = {
+        'version': INDEX_VERSION,
+        'path': str(Path(filepath).absolute()),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'digest': reader.hexdigest(),
+        'compression': compression,
+        'members': members,
+    }
+    try:
+        _write_index(_index_file(filepath, cache_dir, sidecar), index)
+    except OSError:
+        # read-only share or cache, the index is an optimization only
+        pass
+    return index
+
+
+def _write_index(index_file: Path, index: dict) -> None:
+    """
+    Write an index file atomically
+
+    :param index_file: filepath of the index
+    :param index: index
+    """
+    _write_atomic(index_file, json.dumps(index))
+
+
+def _copy(source, target, size: int) -> None:
+    """
+    Copy <size> bytes from one file to another
+
+    :param source: file to read from
+    :param target: file to write to
+    :param size: number of bytes
+    """
+    while size > 0:
+        chunk = source.read(min(size, shutil.COPY_BUFSIZE))
+        if not chunk:
+            raise tarfile.ReadError('*** Unexpected end of archive')
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def _skip(stream, size: int) -> None:
+    """
+    Skip <size> bytes of a stream, that can only be read forward
+
+    :param stream: file to read from
+    :param size: number of bytes
+    """
+    while size > 0:
+        chunk = stream.read(min(size, shutil.COPY_BUFSIZE))
+        if not chunk:
+            raise tarfile.ReadError('*** Unexpected end of archive')
+        size -= len(chunk)
+
+
+class _HashingReader:
+    """ File wrapper computing the SHA-256 digest of everything read through it """
+
+    def __init__(self, file):
+        self._file = file
+        self._digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._digest.update(data)
+        return data
+
+    def read_to_end(self) -> None:
+        """ read the rest of the file, to include it in the digest """
+        for chunk in iter(lambda: self.read(shutil.COPY_BUFSIZE), b''):
+            pass
+
+    def hexdigest(self) -> str:
+        """ return the digest of everything read so far """
+        return self._digest.hexdigest()
@@ -0,0 +1,270 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Content addressed cache for extracted archives """
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from .archive import Leni_archive_read
+from .lockfile import Leni_lockfile_once, LockFile
+from .wheelfile import Leni_wheel_is_compatible
+
+__all__ = ['Leni_cache_directory', 'Leni_cache_digest', 'Leni_cache_extract', 'Leni_cache_evict']
+
+# default size limit of the extraction cache in bytes
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+
+# entries used within this many seconds are never evicted, another process might just be reading them
+EVICTION_GRACE_PERIOD = 60
+
+# unfinished extractions older than this many seconds are considered abandoned
+STALE_EXTRACTION_AGE = 60 * 60
+
+
+def Leni_cache_directory(cache_dir=None) -> Path:
+    """
+    return the root directory of the cache
+
+    Uses, in this order: <cache_dir>, $LENITOOLS_CACHE, $XDG_CACHE_HOME/lenitools, %LOCALAPPDATA%\\lenitools
+    or ~/.cache/lenitools.
+
+    :param cache_dir: explicit cache directory
+    :return: cache directory
+    """
+    if cache_dir:
+        return Path(cache_dir).expanduser()
+    if os.environ.get('LENITOOLS_CACHE'):
+        return Path(os.environ['LENITOOLS_CACHE']).expanduser()
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') or '~/.cache'
+    return Path(base).expanduser() / 'lenitools'
+
+
+def Leni_cache_digest(filepath, cache_dir=None, shared: bool = False) -> str:
+    """
+    return the SHA-256 digest of a file
+
+    Digests are remembered in the cache together with size and modification time of the file,
+    so unchanged files are never read twice.
+
+    :param filepath: filepath
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param shared: the cache is shared by many hosts, only one of them reads the file, see Leni_cache_extract
+    :return: hex digest of the file content
+    """
+    filepath = Path(filepath).absolute()
+    stat = filepath.stat()
+    record_file = Leni_cache_directory(cache_dir) / 'digests' / '{}.json'.format(
+        hashlib.sha1(str(filepath).encode('utf-8', 'surrogateescape')).hexdigest()
+    )
+    if shared:
+        return Leni_lockfile_once(record_file.with_name('.lock-' + record_file.name),
+                                  lambda: _read_digest(record_file, stat), lambda: _hash_file(filepath, stat, record_file))
+    return _read_digest(record_file, stat) or _hash_file(filepath, stat, record_file)
+
+
+def _read_digest(record_file: Path, stat: os.stat_result) -> Optional[str]:
+    """
+    return the remembered digest of a file, if the file did not change since
+
+    :param record_file: filepath of the record
+    :param stat: current stat of the file
+    """
+    try:
+        record = json.loads(record_file.read_text(encoding='utf-8'))
+        if record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns:
+            return record['digest']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _hash_file(filepath: Path, stat: os.stat_result, record_file: Path) -> str:
+    """
+    return the digest of a file and remember it
+
+    :param filepath: filepath
+    :param stat: stat of the file
+    :param record_file: filepath of the record
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    record = {'path': str(filepath), 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'digest': digest.hexdigest()}
+    _write_atomic(record_file, json.dumps(record))
+    return record['digest']
+
+
+def Leni_cache_extract(filepath, suffix: str = '.whl', cache_dir=None, max_size: Optional[int] = None,
+                       tags: Optional[Iterable[str]] = None, shared: bool = False) -> Path:
+    """
+    Extract all members of a tar archive with a given suffix into the cache
+
+    Archives are identified by their content, so an archive is only extracted again after it changed.
+    Several processes may use the same cache at once: archives are extracted into a private directory,
+    which is renamed into place when it is complete.
+
+    In a shared cache, e.g. on NFS for many hosts, the first process to need an archive locks it, reads and
+    extracts it, the others wait for the result instead of doing the same work. If it dies, another process
+    takes over, see lenitools.lockfile.LockFile. Only one process at a time evicts entries.
+
+    :param filepath: filepath to archive
+    :param suffix: suffix of the members to extract, Defaults to '.whl'
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param max_size: size limit of the cache in bytes, Defaults to DEFAULT_CACHE_SIZE
+    :param tags: only extract wheels compatible with these tags, see lenitools.interpreter.Leni_interpreter_tags
+    :param shared: the cache is shared by many hosts
+    :return: directory containing the extracted members
+    """
+    root = Leni_cache_directory(cache_dir) / 'extract'
+    name = '{}-{}'.format(Leni_cache_digest(filepath, cache_dir, shared=shared), suffix.lstrip('.'))
+    if tags is not None:
+        tags = frozenset(tags)
+        name += '-{}'.format(hashlib.sha1('\n'.join(sorted(tags)).encode()).hexdigest()[:12])
+    entry = root / name
+    if entry.is_dir():
+        os.utime(entry)
+        return entry
+
+    root.mkdir(parents=True, exist_ok=True)
+    if shared:
+        Leni_lockfile_once(root / '.lock-{}'.format(entry.name), lambda: entry if entry.is_dir() else None,
+                           lambda: _extract_entry(filepath, entry, suffix, tags))
+    else:
+        _extract_entry(filepath, entry, suffix, tags)
+    Leni_cache_evict(cache_dir, max_size=max_size, keep=[entry], shared=shared)
+    return entry
+
+
+def _extract_entry(filepath, entry: Path, suffix: str, tags: Optional[frozenset]) -> Path:
+    """
+    Extract an archive into a private directory and rename it to <entry>
+
+    :param filepath: filepath to archive
+    :param entry: directory of the cache entry
+    :param suffix: suffix of the members to extract
+    :param tags: only extract wheels compatible with these tags
+    :return: <entry>
+    """
+    tmp_directory = tempfile.mkdtemp(prefix='.tmp-{}-'.format(entry.name), dir=entry.parent)
+    try:
+        Leni_archive_read(filepath, path=tmp_directory, select=lambda m: os.path.splitext(m.name)[1] == suffix and (
+            tags is None or Leni_wheel_is_compatible(m.name, tags)
+        ))
+        os.rename(tmp_directory, entry)
+    except OSError:
+        # another process was faster
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        if not entry.is_dir():
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        raise
+    return entry
+
+
+def Leni_cache_evict(cache_dir=None, max_size: Optional[int] = None, keep=(), shared: bool = False) -> list[Path]:
+    """
+    Remove the least recently used entries until the cache fits into its size limit
+
+    :param cache_dir: cache directory, see Leni_cache_directory
+    :param max_size: size limit of the cache in bytes, Defaults to DEFAULT_CACHE_SIZE
+    :param keep: entries that must not be removed
+    :param shared: the cache is shared by many hosts, skip eviction while another process evicts
+    :return: list of removed entries
+    """
+    root = Leni_cache_directory(cache_dir) / 'extract'
+    removed = []
+    if not root.is_dir():
+        return removed
+    if shared:
+        lock = LockFile(root / '.lock-evict')
+        if not lock.acquire(blocking=False):
+            return removed
+        try:
+            return Leni_cache_evict(cache_dir, max_size=max_size, keep=keep)
+        finally:
+            lock.release()
+
+    max_size = DEFAULT_CACHE_SIZE if max_size is None else max_size
+    now = time.time()
+    keep = set(Path(entry) for entry in keep)
+
+    entries = []
+    for entry in root.iterdir():
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue
+        if entry.name.startswith('.'):
+            # leftovers of processes that died while extracting, locks of live processes are refreshed
+            if now - mtime > STALE_EXTRACTION_AGE:
+                if entry.is_dir():
+                    shutil.rmtree(entry, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(entry)
+                    except OSError:
+                        pass
+            continue
+        entries.append((mtime, _directory_size(entry), entry))
+
+    total_size = sum(size for _mtime, size, _entry in entries)
+    for mtime, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total_size <= max_size:
+            break
+        if entry in keep or now - mtime < EVICTION_GRACE_PERIOD:
+            continue
+        trash = root / '.trash-{}-{}'.format(entry.name, os.getpid())
+        try:
+            os.rename(entry, trash)
+        except OSError:
+            # already removed by another process
+            continue
+        shutil.rmtree(trash, ignore_errors=True)
+        total_size -= size
+        removed.append(entry)
+    return removed
+
+
+def _directory_size(directory: Path) -> int:
+    """
+    return the size of all files in a directory tree in bytes
+
+    :param directory: directory
+    :return: size in bytes
+    """
+    size = 0
+    for root, _directories, files in os.walk(directory):
+        for file in files:
+            try:
+                size += os.stat(os.path.join(root, file)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _write_atomic(filepath: Path, content: str) -> None:
+    """
+    Write a text file atomically, readers either see the old or the new content
+
+    :param filepath: filepath
+    :param content: file content
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, tmp_file = tempfile.mkstemp(prefix='.tmp-', dir=filepath.parent)
+    try:
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(tmp_file, filepath)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
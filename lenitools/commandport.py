@@ -0,0 +1,440 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Persistent client for Maya's command port """
+
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+import asyncio
+import queue
+import select
+import socket
+import socketserver
+import threading
+
+__all__ = [
+    'Leni_commandport_send',
+    'Leni_commandport_send_async',
+    'CommandPortClient',
+    'CommandPortPool',
+    'AsyncCommandPortClient',
+    'CommandPortStandIn',
+]
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 4344
+
+# commands are terminated by a line feed, Maya terminates every response with a null character
+COMMAND_TERMINATOR = b'\n'
+RESPONSE_TERMINATOR = b'\x00'
+
+# number of commands sent in one write before their responses are read
+DEFAULT_BATCH_SIZE = 64
+
+# connections kept open by each pool
+DEFAULT_POOL_SIZE = 4
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def Leni_commandport_send(*args, **kwargs) -> list[str]:
+    """
+    Send commands to a Maya command port, using a shared pool of persistent connections
+
+    >>> Leni_commandport_send('polyCube()', 'polySphere()', port=4344)
+    ['pCube1 polyCube1', 'pSphere1 polySphere1']
+
+    :param args: commands
+    :param host: host name, Defaults to DEFAULT_HOST
+    :param port: port, Defaults to DEFAULT_PORT
+    :param timeout: timeout of each socket operation in seconds, Defaults to 10
+    :param batch_size: number of commands sent per round trip, Defaults to DEFAULT_BATCH_SIZE
+    :return: list of responses, in the order of the commands
+    """
+    address = (kwargs.get('host', DEFAULT_HOST), kwargs.get('port', DEFAULT_PORT))
+    with _pools_lock:
+        if address not in _pools:
+            _pools[address] = CommandPortPool(*address, timeout=kwargs.get('timeout', 10.0))
+        pool = _pools[address]
+    return pool.send_many(args, batch_size=kwargs.get('batch_size', DEFAULT_BATCH_SIZE))
+
+
+async def Leni_commandport_send_async(*args, **kwargs) -> list[str]:
+    """
+    Send commands to a Maya command port over a single pipelined connection
+
+    :param args: commands
+    :param host: host name, Defaults to DEFAULT_HOST
+    :param port: port, Defaults to DEFAULT_PORT
+    :param timeout: timeout of each response in seconds, Defaults to 10
+    :return: list of responses, in the order of the commands
+    """
+    async with AsyncCommandPortClient(
+            kwargs.get('host', DEFAULT_HOST), kwargs.get('port', DEFAULT_PORT), timeout=kwargs.get('timeout', 10.0)
+    ) as client:
+        return await client.send_many(args)
+
+
+def _encode(command: str) -> bytes:
+    """
+    Encode a command for the command port
+
+    :param command: command, a single line
+    :raise ValueError: if the command contains a line feed or null character
+    """
+    data = command.encode('utf-8')
+    if COMMAND_TERMINATOR in data or RESPONSE_TERMINATOR in data:
+        raise ValueError('*** Commands must be a single line: {!r}'.format(command))
+    return data + COMMAND_TERMINATOR
+
+
+def _decode(frame: bytes) -> str:
+    """
+    Decode a response frame without its terminator
+
+    :param frame: response frame
+    """
+    return frame.decode('utf-8', 'replace').rstrip('\n')
+
+
+class CommandPortClient:
+    """
+    Persistent connection to a Maya command port
+
+    Commands are pipelined: a batch of commands is written at once and then all of their responses are read.
+    A broken connection is opened again on the next command. Batches, which could not be sent, are sent again
+    up to <retries> times. Once a batch is sent, it is never sent again, as Maya may already have run it.
+
+    >>> with CommandPortClient(port=4344) as client:
+    ...     client.send('polyCube()')
+    'pCube1 polyCube1'
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10.0, retries: int = 1):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self._socket = None
+        self._buffer = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        """ True, if the connection is open """
+        return self._socket is not None
+
+    def connect(self) -> None:
+        """ Open the connection, if it is not open yet or was closed by the command port """
+        if self._socket is not None and self._is_closed_by_peer():
+            self.close()
+        if self._socket is None:
+            self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._buffer = b''
+
+    def close(self) -> None:
+        """ Close the connection """
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+                self._buffer = b''
+
+    def send(self, command: str) -> str:
+        """
+        Send a command and return its response
+
+        :param command: command
+        :return: response
+        """
+        return self.send_many([command])[0]
+
+    def send_many(self, commands: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> list[str]:
+        """
+        Send commands in batches and return their responses
+
+        :param commands: commands
+        :param batch_size: number of commands sent per round trip
+        :raise ConnectionError: if the command port can't be reached after all retries, or the connection broke
+            after a batch was sent, e.g. Maya did not answer within <timeout>
+        :return: list of responses, in the order of the commands
+        """
+        frames = [_encode(command) for command in commands]
+        responses = []
+        attempts = 0
+        while len(responses) < len(frames):
+            batch = frames[len(responses):len(responses) + max(1, batch_size)]
+            sent = False
+            try:
+                self.connect()
+                self._socket.sendall(b''.join(batch))
+                sent = True
+                for _frame in batch:
+                    responses.append(self._read_response())
+                attempts = 0
+            except OSError as error:
+                self.close()
+                attempts += 1
+                if sent or attempts > self.retries:
+                    raise ConnectionError('*** Command port {}:{} failed: {}'.format(self.host, self.port, error)) \
+                        from error
+        return responses
+
+    def _is_closed_by_peer(self) -> bool:
+        """ return whether the command port closed the idle connection, so a batch is not sent into the void """
+        try:
+            readable, _writable, _errors = select.select([self._socket], [], [], 0)
+            return bool(readable) and self._socket.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+
+    def _read_response(self) -> str:
+        """ read the next response frame """
+        while RESPONSE_TERMINATOR not in self._buffer:
+            chunk = self._socket.recv(65536)
+            if not chunk:
+                raise ConnectionResetError('*** Connection closed by command port')
+            self._buffer += chunk
+        frame, _terminator, self._buffer = self._buffer.partition(RESPONSE_TERMINATOR)
+        return _decode(frame)
+
+
+class CommandPortPool:
+    """
+    Thread safe pool of persistent connections to one command port
+
+    Each thread borrows a connection for a call, at most <size> connections are open at once.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, size: int = DEFAULT_POOL_SIZE, **kwargs):
+        self.host = host
+        self.port = port
+        self._options = kwargs
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send(self, command: str) -> str:
+        """
+        Send a command over a pooled connection and return its response
+
+        :param command: command
+        :return: response
+        """
+        return self.send_many([command])[0]
+
+    def send_many(self, commands: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> list[str]:
+        """
+        Send commands over a pooled connection, see CommandPortClient.send_many
+
+        :param commands: commands
+        :param batch_size: number of commands sent per round trip
+        :return: list of responses, in the order of the commands
+        """
+        with self._slots:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                client = CommandPortClient(self.host, self.port, **self._options)
+            try:
+                return client.send_many(commands, batch_size=batch_size)
+            finally:
+                self._idle.put(client)
+
+    def close(self) -> None:
+        """ Close all idle connections """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class AsyncCommandPortClient:
+    """
+    Persistent asyncio connection to a Maya command port
+
+    Concurrent calls share the connection: every command is written as soon as it is sent and the
+    responses are matched to the commands in order. A broken connection fails the commands waiting
+    for a response and is opened again on the next command.
+
+    >>> async with AsyncCommandPortClient(port=4344) as client:
+    ...     await asyncio.gather(client.send('polyCube()'), client.send('polySphere()'))
+    ['pCube1 polyCube1', 'pSphere1 polySphere1']
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = deque()
+        self._connect_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        """ True, if the connection is open """
+        return self._writer is not None
+
+    async def connect(self) -> None:
+        """ Open the connection, if it is not open yet """
+        async with self._connect_lock:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout
+                )
+                self._reader_task = asyncio.ensure_future(self._read_responses(self._reader, self._pending))
+
+    async def close(self) -> None:
+        """ Close the connection """
+        writer, self._writer = self._writer, None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._fail_pending(ConnectionAbortedError('*** Connection closed'))
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def send(self, command: str) -> str:
+        """
+        Send a command and return its response
+
+        :param command: command
+        :raise ConnectionError: if the connection broke before the response arrived
+        :raise asyncio.TimeoutError: if the response took longer than <timeout> seconds
+        :return: response
+        """
+        data = _encode(command)
+        await self.connect()
+        response = asyncio.get_running_loop().create_future()
+        self._pending.append(response)
+        self._writer.write(data)
+        try:
+            await self._writer.drain()
+            return await asyncio.wait_for(asyncio.shield(response), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            # responses can't be matched to commands anymore
+            await self.close()
+            raise
+
+    async def send_many(self, commands: Iterable[str]) -> list[str]:
+        """
+        Send commands at once and return their responses
+
+        :param commands: commands
+        :return: list of responses, in the order of the commands
+        """
+        return list(await asyncio.gather(*[self.send(command) for command in commands]))
+
+    async def _read_responses(self, reader: asyncio.StreamReader, pending: deque) -> None:
+        """ match incoming response frames to the commands waiting for them """
+        try:
+            while True:
+                frame = await reader.readuntil(RESPONSE_TERMINATOR)
+                if pending:
+                    response = pending.popleft()
+                    if not response.done():
+                        response.set_result(_decode(frame[:-len(RESPONSE_TERMINATOR)]))
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as error:
+            if reader is self._reader:
+                self._writer = None
+                self._reader_task = None
+                self._fail_pending(ConnectionResetError('*** Connection closed by command port: {}'.format(error)))
+
+    def _fail_pending(self, error: Exception) -> None:
+        """ fail all commands waiting for a response """
+        while self._pending:
+            response = self._pending.popleft()
+            if not response.done():
+                response.set_exception(error)
+
+
+class CommandPortStandIn(socketserver.ThreadingTCPServer):
+    """
+    Local stand-in for Maya's command port, for tests without Maya
+
+    Every line received is passed to <handler>, its return value is sent back as response.
+    Received commands are recorded in <commands>.
+
+    >>> with CommandPortStandIn(handler=lambda command: command.upper()) as server:
+    ...     CommandPortClient(*server.server_address).send('ls()')
+    'LS()'
+
+    :param handler: function returning the response to a command, Defaults to an empty response
+    :param host: host name, Defaults to DEFAULT_HOST
+    :param port: port, Defaults to 0 (any free port)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handler: Optional[Callable[[str], str]] = None, host: str = DEFAULT_HOST, port: int = 0):
+        super().__init__((host, port), _StandInHandler)
+        self.handler = handler or (lambda command: '')
+        self.commands = []
+        self._commands_lock = threading.Lock()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self) -> None:
+        """ Serve in a background thread """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ Stop serving and close the port """
+        self.shutdown()
+        self.server_close()
+
+    def record(self, command: str) -> None:
+        """ remember a received command """
+        with self._commands_lock:
+            self.commands.append(command)
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    """ one connection to the stand-in command port """
+
+    disable_nagle_algorithm = True
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            command = line.decode('utf-8', 'replace').rstrip('\r\n')
+            self.server.record(command)
+            try:
+                response = str(self.server.handler(command))
+            except Exception as error:
+                response = '# Error: {}'.format(error)
+            self.wfile.write(response.encode('utf-8') + b'\n' + RESPONSE_TERMINATOR)
+            self.wfile.flush()
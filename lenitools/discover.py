@@ -0,0 +1,110 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Find python wheels and archives in directory trees """
+
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import fnmatch
+import os
+
+from .archive import Leni_archive_format
+
+__all__ = ['Leni_discover_files']
+
+# directories and files that are never scanned
+DEFAULT_IGNORE = ('.git', '.hg', '.svn', '__pycache__')
+
+# suffixes of files, that might be tar archives. Only these are opened to check their magic bytes
+ARCHIVE_SUFFIXES = ('.tar', '.gz', '.tgz', '.bz2', '.tbz', '.tbz2', '.xz', '.txz')
+
+# magic bytes of zip files, which wheels are
+_ZIP_MAGIC = b'PK\x03\x04'
+
+
+def Leni_discover_files(*args, **kwargs) -> Iterator[Path]:
+    """
+    Generator to find python wheels and tar archives
+
+    Directories are walked with os.scandir. Files are filtered by suffix first, only the remaining
+    candidates are opened to check their magic bytes. Results are yielded as soon as they are found,
+    in a stable order: sorted by name within each directory, depth first.
+
+    >>> for file in Leni_discover_files('~/Downloads', recursive=True, ignore=['old_*']):
+    ...     print(file)
+
+    :param args: files or directories to search
+    :param recursive: search sub directories, Defaults to False
+    :param archives: include tar archives, Defaults to True
+    :param ignore: glob patterns of file and directory names to skip, Defaults to DEFAULT_IGNORE
+    :return: next wheel or archive
+    """
+    recursive = kwargs.get('recursive', False)
+    archives = kwargs.get('archives', True)
+    ignore = tuple(kwargs.get('ignore', DEFAULT_IGNORE) or ())
+
+    for path in args:
+        path = Path(path).expanduser()
+        if path.is_dir():
+            yield from _walk(path, recursive, archives, ignore)
+        elif _is_candidate(path.name, archives) and _check_magic(path, archives):
+            yield path
+
+
+def _walk(directory: Path, recursive: bool, archives: bool, ignore: Iterable[str]) -> Iterator[Path]:
+    """
+    Generator to walk a directory tree
+
+    :param directory: directory to walk
+    :param recursive: descend into sub directories
+    :param archives: include tar archives
+    :param ignore: glob patterns of file and directory names to skip
+    :return: next wheel or archive
+    """
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda e: e.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        if any(fnmatch.fnmatch(entry.name, pattern) for pattern in ignore):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from _walk(Path(entry.path), recursive, archives, ignore)
+                continue
+            if not entry.is_file():
+                continue
+        except OSError:
+            continue
+        if _is_candidate(entry.name, archives) and _check_magic(Path(entry.path), archives):
+            yield Path(entry.path)
+
+
+def _is_candidate(name: str, archives: bool) -> bool:
+    """
+    return whether a file name looks like a wheel or (if requested) a tar archive
+
+    :param name: file name
+    :param archives: include tar archives
+    """
+    suffix = os.path.splitext(name)[1].lower()
+    return suffix == '.whl' or archives and suffix in ARCHIVE_SUFFIXES
+
+
+def _check_magic(filepath: Path, archives: bool) -> bool:
+    """
+    return whether a file really is a wheel or (if requested) a tar archive
+
+    :param filepath: filepath
+    :param archives: include tar archives
+    """
+    if filepath.suffix.lower() == '.whl':
+        try:
+            with open(filepath, 'rb') as file:
+                return file.read(len(_ZIP_MAGIC)) == _ZIP_MAGIC
+        except OSError:
+            return False
+    return archives and Leni_archive_format(filepath) is not None
@@ -3,5 +3,6 @@
 from .tararchive import *
 
 __all__ = [
-    'Leni_filter_tarmembersuffix'
+    'Leni_filter_tarmembersuffix',
+    'Leni_filter_tarmembertags'
 ]
\ No newline at end of file
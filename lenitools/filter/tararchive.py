@@ -1,11 +1,45 @@
 # <> with ❤ by @LeniMagEsVonHinten
 
+from typing import Iterable
+
 import os
 
-__all__ = ['Leni_filter_tarmembersuffix']
+from ..archive import Leni_archive_iter
+from ..wheelfile import Leni_wheel_is_compatible
+
+__all__ = ['Leni_filter_tarmembersuffix', 'Leni_filter_tarmembertags']
 
 
 def Leni_filter_tarmembersuffix(members, suffix: str = '.txt'):
+    """
+    Generator to filter members of a tar archive by file suffix
+
+    :param members: TarInfo objects, or filepath to a tar archive to read in a single pass
+    :param suffix: suffix to look for
+
+    :return: next TarInfo object with suffix
+    """
+    if isinstance(members, (str, os.PathLike)):
+        members = Leni_archive_iter(members)
     for tarinfo in members:
         if os.path.splitext(tarinfo.name)[1] == suffix:
             yield tarinfo
+
+
+def Leni_filter_tarmembertags(members, tags: Iterable[str]):
+    """
+    Generator to filter the wheels of a tar archive by the tags an interpreter supports
+
+    >>> from lenitools.interpreter import Leni_interpreter_tags
+    >>> for tarinfo in Leni_filter_tarmembertags('wheels.tar.gz', Leni_interpreter_tags('mayapy')):
+    ...     print(tarinfo.name)
+
+    :param members: TarInfo objects, or filepath to a tar archive to read in a single pass
+    :param tags: tags supported by the interpreter, see lenitools.interpreter.Leni_interpreter_tags
+
+    :return: next TarInfo object of a compatible wheel
+    """
+    tags = frozenset(tags)
+    for tarinfo in Leni_filter_tarmembersuffix(members, '.whl'):
+        if Leni_wheel_is_compatible(tarinfo.name, tags):
+            yield tarinfo
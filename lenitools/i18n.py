@@ -0,0 +1,124 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Translate messages lazily, when they are actually shown """
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+import functools
+import gettext
+
+__all__ = ['Leni_i18n_translation', 'Leni_i18n_gettext', 'Leni_i18n_lazy']
+
+# gettext domain and directory of the catalogs, see compile_catalog in setup.cfg
+DOMAIN = 'lenitools'
+LOCALE_DIR = Path(__file__).absolute().parent / 'locale'
+
+
+def Leni_i18n_translation(languages: Optional[Iterable[str]] = None) -> gettext.NullTranslations:
+    """
+    return the translation of lenitools for a list of languages
+
+    The compiled catalog of each list of languages is loaded only once. Without a catalog, messages stay untranslated.
+
+    :param languages: languages in order of preference, Defaults to $LANGUAGE, $LC_ALL, $LC_MESSAGES and $LANG
+    :return: translation
+    """
+    return _load_translation(tuple(languages) if languages is not None else None)
+
+
+def Leni_i18n_gettext(message: str) -> str:
+    """
+    Translate a message right away
+
+    :param message: message
+    :return: translated message
+    """
+    return Leni_i18n_translation().gettext(message)
+
+
+def Leni_i18n_lazy(message: str) -> 'LazyMessage':
+    """
+    Mark a message for translation, it is translated and formatted only when converted to a string
+
+    Bind it as _ to let Babel's extract_messages find the messages:
+
+    >>> from lenitools.i18n import Leni_i18n_lazy as _
+    >>> message = _('Add {file}').format(file='six-1.16.0-py2.py3-none-any.whl')
+    >>> print(message)
+    Add six-1.16.0-py2.py3-none-any.whl
+
+    :param message: message
+    :return: lazy message
+    """
+    return LazyMessage(message)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_translation(languages: Optional[tuple]) -> gettext.NullTranslations:
+    """
+    load the catalog for a list of languages
+
+    :param languages: languages in order of preference or None
+    """
+    return gettext.translation(DOMAIN, localedir=str(LOCALE_DIR), languages=languages, fallback=True)
+
+
+class LazyMessage:
+    """
+    Message, which is translated and formatted when converted to a string
+
+    Arguments of format are stored until then, so messages, which are never shown, cost next to nothing.
+    """
+
+    __slots__ = ('message', 'args', 'kwargs')
+
+    def __init__(self, message: str, args: tuple = (), kwargs: Optional[dict] = None):
+        self.message = message
+        self.args = args
+        self.kwargs = kwargs
+
+    def format(self, *args, **kwargs) -> 'LazyMessage':
+        """ return the message with format arguments, formatted when converted to a string """
+        return LazyMessage(self.message, args, kwargs)
+
+    def __str__(self) -> str:
+        translated = Leni_i18n_gettext(self.message)
+        if self.kwargs is None:
+            return translated
+        return translated.format(*[str(a) if isinstance(a, LazyMessage) else a for a in self.args], **{
+            key: str(value) if isinstance(value, LazyMessage) else value for key, value in self.kwargs.items()
+        })
+
+    def __repr__(self) -> str:
+        return 'LazyMessage({!r})'.format(self.message)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+    def __add__(self, other) -> str:
+        return str(self) + str(other)
+
+    def __radd__(self, other) -> str:
+        return str(other) + str(self)
+
+    def __mod__(self, other) -> str:
+        return str(self) % other
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __contains__(self, item) -> bool:
+        return item in str(self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (str, LazyMessage)):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __getattr__(self, name: str):
+        # string methods like lower or splitlines
+        return getattr(str(self), name)
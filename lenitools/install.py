@@ -3,66 +3,267 @@
 """ Install python wheels """
 
 from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
 
-import tarfile
+import os
+import csv
+import sys
+import errno
+import json
+import base64
+import shutil
+import hashlib
+import zipfile
+import sysconfig
+import configparser
+import email.parser
 import tempfile
 import functools
+import tarfile
+import subprocess
+import importlib.metadata
+
+from .archive import Leni_archive_format, Leni_archive_read, _target_path
+from .archiveindex import Leni_archive_extract_members, Leni_archive_index
+from .cache import Leni_cache_extract
+from .schedule import Leni_schedule_waves
+from .timing import Leni_timing_add, Leni_timing_span
+from .interpreter import Leni_interpreter_info, Leni_interpreter_tags, _is_running_interpreter
+from .wheelfile import Leni_wheel_is_compatible, Leni_wheel_normalize_name, Leni_wheel_parse_filename, Leni_wheel_version_key
+
+# native extensions, wheels containing any of these are installed by pip
+_COMPILED_SUFFIXES = ('.so', '.pyd', '.dll', '.dylib')
+
+# members passed from a listing thread to the consumer at once, see Leni_iter_archive_members
+_MEMBER_CHUNK_SIZE = 256
+
+# console script generated for each entry point by the native installer
+_SCRIPT_TEMPLATE = """#!{interpreter}
+# -*- coding: utf-8 -*-
+import re
+import sys
+from {module} import {attribute}
+if __name__ == '__main__':
+    sys.argv[0] = re.sub(r'(-script\\.pyw|\\.exe)?$', '', sys.argv[0])
+    sys.exit({function}())
+"""
+
+__all__ = [
+    'Leni_install_wheel',
+    'Leni_list_archive',
+    'Leni_iter_archive_members',
+    'Leni_extract_archive',
+    'Leni_installed_distributions',
+    'Leni_install_plan'
+]
+
 
-from .filter.tararchive import Leni_filter_tarmembersuffix
+class InstallAction(NamedTuple):
+    """ Planned action for a wheel: 'install', 'upgrade' or 'skip' """
+    action: str
+    wheel: str
+    project: str
+    version: str
+    installed: Optional[str]
 
-__all__ = ['Leni_install_wheel', 'Leni_list_archive', 'Leni_extract_archive']
+
+class ArchiveMember(NamedTuple):
+    """ Member of an archive, or the error listing the archive failed with """
+    archive: str
+    member: Optional[dict]
+    error: Optional[Exception] = None
 
 
 def Leni_install_wheel(*args, **kwargs) -> bool:
     """
     Install a python wheel
 
-    :param wheel: filepath to wheel, Defaults to ''
+    By default, wheels are installed with pip. With native=True, pure python wheels (e.g. py3-none-any)
+    are unpacked straight into site-packages of the running interpreter instead, which is a lot faster than
+    starting pip. Wheels the native installer can't handle, are passed on to pip.
+
+    >>> Leni_install_wheel('six-1.16.0-py2.py3-none-any.whl', native=True)
+    True
+
+    :param args: filepaths to wheels
+    :param path: directory containing wheels to install
+    :param native: unpack pure python wheels without pip, Defaults to False
+    :param user: install into the user site-packages, Defaults to True
+    :param target: install into this directory instead of site-packages
+    :param interpreter: python interpreter to run pip with, Defaults to the running interpreter
+    :param fallback: pass wheels the native installer can't handle on to pip, Defaults to True
+    :param schedule: install wheels in waves after the wheels they depend on, see Leni_schedule_waves.
+        Defaults to False
+    :param jobs: number of wheels of a wave to install at the same time, Defaults to 1
+    :return: True, if all wheels were installed
     """
     if len(args) < 1 and 'path' not in kwargs.keys():
         return False
     if 'path' in kwargs.keys():
-        success = True
-        for wheel_file in Path(kwargs.keys('path')).iterdir():
-            ret = Leni_install_wheel(str(wheel_file))
-            if not ret:
-                success = False
-        return success
-
-    suffices: list[str] = ['.whl']
-    for file in args:
-        print('Install', file)
-    return True
+        options = {key: value for key, value in kwargs.items() if key != 'path'}
+        wheels = sorted(str(file) for file in Path(kwargs.get('path')).iterdir() if file.suffix == '.whl')
+        return Leni_install_wheel(*wheels, **options) if wheels else True
+
+    interpreter = kwargs.get('interpreter') or sys.executable
+    native = kwargs.get('native', False) and _is_running_interpreter(interpreter)
+    scheme = _install_scheme(kwargs.get('user', True), kwargs.get('target'))
+
+    pip_options = ['--target', str(kwargs['target'])] if kwargs.get('target') else \
+        ['--user'] if kwargs.get('user', True) else []
+
+    def install(file) -> bool:
+        with Leni_timing_span('Leni_install_wheel', wheel=file) as span:
+            if span.enabled:
+                span.add(files=1, bytes_read=os.path.getsize(file))
+            if native and _install_native(file, scheme):
+                return True
+            if not kwargs.get('fallback', True):
+                return False
+            return subprocess.run([str(interpreter), '-m', 'pip', 'install'] + pip_options + [str(file)]).returncode == 0
+
+    waves = [list(args)]
+    if kwargs.get('schedule', False):
+        # markers of the dependencies are evaluated for the interpreter the wheels are installed for
+        info = Leni_interpreter_info(interpreter)
+        waves = Leni_schedule_waves(*args, environment=info.environment if info is not None else None).waves
+    jobs = kwargs.get('jobs', 1) or os.cpu_count() or 1
+    success = True
+    for wave in waves:
+        if jobs <= 1 or len(wave) <= 1:
+            results = [install(file) for file in wave]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(jobs, len(wave))) as executor:
+                results = list(executor.map(install, wave))
+        success = success and all(results)
+    return success
 
 
 def Leni_list_archive(*args, **kwargs) -> dict[str, list[str]]:
     """
     List content of archive
 
-    Currently, only tar-archives are supported.
+    Currently, only tar-archives are supported. The members are read from the index of each archive,
+    which is built on the first call, see Leni_archive_index.
 
     :param archive: filepath to archive, Defaults to ''
+    :param cache_dir: cache directory to keep the index in, see Leni_cache_directory
+    :param sidecar: keep the index next to the archive instead of the cache directory, Defaults to False
+    :param jobs: number of archives to list at the same time, see Leni_iter_archive_members
     """
     if len(args) < 1:
         raise RuntimeError('*** Wrong parameters: Expecting more than 1 argument, got 0')
-    elif not functools.reduce(lambda x, y: x and y, [Path(f).is_file() for f in args]):
+    elif not all(Path(f).is_file() for f in args):
         raise RuntimeError('*** Wrong parameter: One or more file paths given are no files!')
-    archive_items = {}
 
-    archives = filter(lambda f: tarfile.is_tarfile(f), args)
-
-    for filepath in archives:
-        archive = tarfile.open(filepath)
-        archive_items[filepath] = archive.getnames()
-        archive.close()
+    archive_items = {filepath: [] for filepath in args if Leni_archive_format(filepath) is not None}
+    for record in Leni_iter_archive_members(*archive_items, **kwargs):
+        if record.error is not None:
+            raise record.error
+        archive_items[record.archive].append(record.member['name'])
     return archive_items
 
 
+def Leni_iter_archive_members(*args, **kwargs) -> Iterator[ArchiveMember]:
+    """
+    List the members of many archives at the same time, yielding them as they arrive
+
+    Archives are listed on a thread pool from their index, see Leni_archive_index. Members of different
+    archives are interleaved, those of one archive stay in order. Memory stays bounded: at most <jobs>
+    archives are listed at once and listing threads wait, while the consumer is <buffer> chunks behind.
+    An archive, that can't be listed, yields a single record with the error instead of raising.
+
+    >>> for record in Leni_iter_archive_members(*Path('/mnt/wheelhouse').glob('*.tar.gz'), jobs=8):
+    ...     if record.error is None and record.member['name'].endswith('.whl'):
+    ...         print(record.archive, record.member['name'])
+
+    :param args: filepaths to archives, may be a generator
+    :param jobs: number of archives to list at the same time, 0 uses one per CPU, Defaults to 4
+    :param buffer: chunks of members to hold for the consumer, Defaults to 16
+    :param cache_dir: cache directory to keep the index in, see Leni_cache_directory
+    :param sidecar: keep the index next to the archive instead of the cache directory, Defaults to False
+    :param shared: the cache is shared by many hosts, see lenitools.cache.Leni_cache_extract
+    :return: generator of (archive, member, error) records. member is a description like in Leni_archive_index,
+        or None together with the error
+    """
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = kwargs.get('jobs', 4) or os.cpu_count() or 1
+    records = queue.Queue(maxsize=kwargs.get('buffer', 16))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # wait for the consumer, unless it went away
+        while not stop.is_set():
+            try:
+                records.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def list_members(filepath) -> None:
+        try:
+            with Leni_timing_span('Leni_iter_archive_members', archive=filepath) as span:
+                if not Path(filepath).is_file():
+                    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(filepath))
+                if Leni_archive_format(filepath) is None:
+                    raise tarfile.ReadError('*** Not a tar archive: {}'.format(filepath))
+                members = Leni_archive_index(filepath, cache_dir=kwargs.get('cache_dir'),
+                                             sidecar=kwargs.get('sidecar', False), shared=kwargs.get('shared', False))
+                span.add(files=len(members))
+        except Exception as error:
+            put([ArchiveMember(filepath, None, error)])
+        else:
+            for start in range(0, len(members), _MEMBER_CHUNK_SIZE):
+                if not put([ArchiveMember(filepath, member) for member in members[start:start + _MEMBER_CHUNK_SIZE]]):
+                    return
+        finally:
+            # archive finished
+            put(None)
+
+    archives = iter(args)
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='Leni_iter_archive_members')
+    try:
+        running = 0
+        for filepath in archives:
+            executor.submit(list_members, filepath)
+            running += 1
+            if running >= jobs:
+                break
+        while running:
+            chunk = records.get()
+            if chunk is not None:
+                yield from chunk
+                continue
+            running -= 1
+            filepath = next(archives, None)
+            if filepath is not None:
+                executor.submit(list_members, filepath)
+                running += 1
+    finally:
+        # the consumer may stop early, release threads waiting to pass on members
+        stop.set()
+        executor.shutdown(wait=False)
+
+
 def Leni_extract_archive(*args, **kwargs) -> str:
     """
     Extract archive and install all contained python wheels
 
     Currently, only tar-archives are supported.
+
+    :param path: target directory, Defaults to a new temporary directory
+    :param selection: dict with a list of members to extract for each archive, Defaults to all wheels
+    :param jobs: number of worker processes to extract archives with, 0 uses one per CPU, Defaults to 1
+    :param cache: reuse wheels extracted by earlier runs. True or a cache directory, Defaults to False
+    :param cache_size: size limit of the cache in bytes, see lenitools.cache.DEFAULT_CACHE_SIZE
+    :param interpreter: only extract wheels this python interpreter can install (e.g. mayapy), Defaults to all wheels
+    :param sink: stream the wheels to a file returned by sink(member name) instead of writing them to <path>,
+        see Leni_archive_extract_members. Archives are read one after another in this process, without cache.
+    :return: target directory, None with <sink>
     """
     if 'selection' in kwargs.keys():
         selection = kwargs.get('selection')
@@ -71,21 +272,399 @@ def Leni_extract_archive(*args, **kwargs) -> str:
         raise RuntimeError('*** Wrong parameters: Expecting more than 1 argument, got 0')
     else:
         selection = 'all'
-        archives = filter(lambda f: tarfile.is_tarfile(f), args)
+        archives = filter(lambda f: Leni_archive_format(f) is not None, args)
+
+    tags = Leni_interpreter_tags(kwargs['interpreter']) if kwargs.get('interpreter') else None
+    tags = frozenset(tags) if tags is not None else None
+    if kwargs.get('sink') is not None:
+        with Leni_timing_span('Leni_extract_archive', sink=True) as span:
+            for filepath in archives:
+                names = [getattr(m, 'name', m) for m in selection[filepath]] if selection != 'all' else \
+                    lambda name: os.path.splitext(name)[1] == '.whl' and (tags is None or Leni_wheel_is_compatible(name, tags))
+                span.add(files=len(Leni_archive_extract_members(filepath, names, sink=kwargs['sink'])))
+        return None
 
-    tmp_directory = kwargs.get('path', tempfile.mkdtemp())
+    tmp_directory = kwargs.get('path') or tempfile.mkdtemp()
+    cache = kwargs.get('cache', False)
+    cache_dir = None if not cache else cache if isinstance(cache, (str, os.PathLike)) else ''
+    tasks = [
+        (filepath, tmp_directory, None if selection == 'all' else selection[filepath], cache_dir, kwargs.get('cache_size'), tags)
+        for filepath in archives
+    ]
 
     # extract archive
-    for filepath in archives:
-        with tarfile.open(filepath) as archive:
-            if selection == 'all':
-                archive.extractall(
-                    path=tmp_directory,
-                    members=Leni_filter_tarmembersuffix(archive, '.whl')
-                )
-            else:
-                for member in selection[filepath]:
-                    archive.extract(member=member, path=tmp_directory)
+    jobs = kwargs.get('jobs', 1) or os.cpu_count() or 1
+    with Leni_timing_span('Leni_extract_archive', jobs=jobs) as span:
+        if span.enabled:
+            span.add(files=len(tasks), bytes_read=sum(os.path.getsize(task[0]) for task in tasks))
+        if jobs <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                _extract_tar(*task)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+                list(executor.map(_extract_tar, *zip(*tasks)))
     return tmp_directory
 
 
+def Leni_installed_distributions(interpreter=None) -> dict[str, str]:
+    """
+    return the installed distributions of a python interpreter
+
+    The running interpreter is asked directly via importlib.metadata, any other interpreter
+    (e.g. mayapy) is asked once per process in a subprocess. An interpreter, that can't be run,
+    has nothing installed.
+
+    :param interpreter: python interpreter, Defaults to the running interpreter
+    :return: dict mapping the normalized project name to the installed version
+    """
+    with Leni_timing_span('Leni_installed_distributions', interpreter=interpreter) as span:
+        if interpreter is None or _is_running_interpreter(interpreter):
+            distributions = _metadata_distributions()
+        else:
+            distributions = dict(_interpreter_distributions(str(interpreter)))
+        span.add(files=len(distributions))
+    return distributions
+
+
+def Leni_install_plan(*args, **kwargs) -> list[InstallAction]:
+    """
+    Decide for each wheel, whether it must be installed, upgraded or skipped
+
+    Name and version are taken from the wheel file names, nothing is extracted.
+    Wheels with invalid file names are always installed.
+
+    >>> Leni_install_plan('six-1.16.0-py2.py3-none-any.whl', installed={'six': '1.16.0'})[0].action
+    'skip'
+
+    :param args: wheel files
+    :param interpreter: python interpreter to compare with, Defaults to the running interpreter
+    :param installed: installed distributions as returned by Leni_installed_distributions
+    :return: list of actions, one for each wheel
+    """
+    installed = kwargs.get('installed')
+    if installed is None:
+        installed = Leni_installed_distributions(kwargs.get('interpreter'))
+
+    plan = []
+    for wheel in args:
+        try:
+            wheel_name = Leni_wheel_parse_filename(wheel)
+        except ValueError:
+            plan.append(InstallAction('install', str(wheel), Path(wheel).name, '', None))
+            continue
+        installed_version = installed.get(wheel_name.project)
+        if installed_version is None:
+            action = 'install'
+        elif Leni_wheel_version_key(installed_version) == Leni_wheel_version_key(wheel_name.version):
+            action = 'skip'
+        else:
+            action = 'upgrade'
+        plan.append(InstallAction(action, str(wheel), wheel_name.project, wheel_name.version, installed_version))
+    return plan
+
+
+def _extract_tar(filepath, path: str, members=None, cache_dir=None, cache_size=None, tags=None) -> str:
+    """
+    Extract members of a tar archive in a single pass
+
+    Wheels found in the cache are linked (or copied) into the target directory instead.
+
+    :param filepath: filepath to archive
+    :param path: target directory
+    :param members: members or names of the members to extract, Defaults to all wheels
+    :param cache_dir: cache directory, the extraction cache is only used for wheels and if this is not None
+    :param cache_size: size limit of the cache in bytes
+    :param tags: only extract wheels compatible with these tags, if members is None
+
+    :return: filepath of the archive
+    """
+    if members is None and cache_dir is not None:
+        entry = Leni_cache_extract(filepath, '.whl', cache_dir=cache_dir, max_size=cache_size, tags=tags)
+        for wheel in entry.rglob('*'):
+            target = Path(path) / wheel.relative_to(entry)
+            if wheel.is_dir() or target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(wheel, target)
+            except OSError:
+                shutil.copy2(wheel, target)
+        return filepath
+
+    if members is None:
+        Leni_archive_read(filepath, path=path, select=lambda member: os.path.splitext(member.name)[1] == '.whl' and (
+            tags is None or Leni_wheel_is_compatible(member.name, tags)
+        ))
+    else:
+        names = set(getattr(member, 'name', member) for member in members)
+        Leni_archive_extract_members(filepath, names, path, cache_dir=cache_dir or None)
+    return filepath
+
+
+def _metadata_distributions() -> dict[str, str]:
+    """
+    return the distributions installed for the running interpreter
+
+    :return: dict mapping the normalized project name to the installed version
+    """
+    distributions = {}
+    for distribution in importlib.metadata.distributions():
+        name = distribution.metadata['Name']
+        if name:
+            distributions.setdefault(Leni_wheel_normalize_name(name), distribution.version)
+    return distributions
+
+
+@functools.lru_cache(maxsize=None)
+def _interpreter_distributions(interpreter: str) -> tuple[tuple[str, str], ...]:
+    """
+    return the distributions installed for another python interpreter
+
+    :param interpreter: name or path of a python interpreter
+    :return: tuple of (project name, version) tuples, hashable for the cache. Empty if the interpreter
+        can't be run, so every wheel is planned for installation and pip reports the failure
+    """
+    script = (
+        'import importlib.metadata, json\n'
+        'print(json.dumps([(d.metadata["Name"], d.version) for d in importlib.metadata.distributions()]))'
+    )
+    try:
+        output = subprocess.run([interpreter, '-c', script], capture_output=True, check=True, timeout=60).stdout
+        rows = json.loads(output.decode())
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return ()
+    distributions = {}
+    for name, version in rows:
+        if name:
+            distributions.setdefault(Leni_wheel_normalize_name(name), version)
+    return tuple(distributions.items())
+
+
+def _install_scheme(user: bool = True, target=None) -> dict[str, str]:
+    """
+    return the installation directories for the running interpreter
+
+    :param user: use the user scheme, e.g. ~/.local/lib/python3.x/site-packages
+    :param target: install everything into this directory, like pip install --target
+    :return: dict with purelib, platlib, scripts, data and headers directories
+    """
+    if target is not None:
+        target = str(Path(target).absolute())
+        return {
+            'purelib': target,
+            'platlib': target,
+            'scripts': os.path.join(target, 'bin'),
+            'data': target,
+            'headers': os.path.join(target, 'include'),
+        }
+    if user:
+        get_scheme = getattr(sysconfig, 'get_preferred_scheme', lambda key: '{}_user'.format(os.name))
+        paths = sysconfig.get_paths(scheme=get_scheme('user'))
+    else:
+        paths = sysconfig.get_paths()
+    return {key: paths[key] for key in ('purelib', 'platlib', 'scripts', 'data')} | {'headers': paths['include']}
+
+
+def _install_native(wheel, scheme: dict[str, str]) -> bool:
+    """
+    Unpack a pure python wheel into site-packages, without pip
+
+    Writes the files of the wheel, console scripts for its entry points and an updated RECORD,
+    INSTALLER and REQUESTED into its .dist-info directory. Older versions of the project are removed.
+
+    :param wheel: filepath to wheel
+    :param scheme: installation directories as returned by _install_scheme
+    :return: False, if the wheel can't be installed natively, e.g. a file does not match its hash in RECORD
+        or would be written outside of its directory. Nothing is written or removed in that case.
+    """
+    try:
+        wheel_name = Leni_wheel_parse_filename(wheel)
+    except ValueError:
+        return False
+    if not _is_pure_tag(wheel_name):
+        return False
+
+    with zipfile.ZipFile(wheel) as archive:
+        names = archive.namelist()
+        dist_info = next((n.split('/')[0] for n in names if n.split('/')[0].endswith('.dist-info')
+                          and n.endswith('/WHEEL') and n.count('/') == 1), None)
+        if dist_info is None:
+            return False
+        wheel_metadata = email.parser.Parser().parsestr(archive.read(dist_info + '/WHEEL').decode('utf-8'))
+        if wheel_metadata.get('Root-Is-Purelib', '').strip().lower() != 'true' \
+                or not wheel_metadata.get('Wheel-Version', '').startswith('1.'):
+            return False
+        if any(os.path.splitext(name)[1].lower() in _COMPILED_SUFFIXES for name in names):
+            return False
+
+        entry_points = configparser.ConfigParser(delimiters=('=',))
+        entry_points.optionxform = str
+        if dist_info + '/entry_points.txt' in names:
+            entry_points.read_string(archive.read(dist_info + '/entry_points.txt').decode('utf-8'))
+        has_scripts = any(entry_points.has_section(s) and entry_points.items(s) for s in ('console_scripts', 'gui_scripts'))
+        if os.name == 'nt' and has_scripts:
+            # Windows needs .exe launchers, leave that to pip
+            return False
+
+        hashes = {}
+        if dist_info + '/RECORD' in names:
+            for row in csv.reader(archive.read(dist_info + '/RECORD').decode('utf-8').splitlines()):
+                if len(row) >= 2 and row[1]:
+                    hashes[row[0]] = row[1]
+
+        # check everything before touching the installed version, so a bad wheel leaves it intact
+        data_prefix = '{}.data/'.format(dist_info[:-len('.dist-info')])
+        purelib = scheme['purelib']
+        files = []
+        for info in archive.infolist():
+            if info.is_dir() or info.filename in (dist_info + '/RECORD', dist_info + '/INSTALLER', dist_info + '/REQUESTED'):
+                continue
+            if info.filename in hashes and not _matches_record_hash(archive, info, hashes[info.filename]):
+                return False
+            directory, relative_path = purelib, info.filename
+            if info.filename.startswith(data_prefix):
+                key, _separator, relative_path = info.filename[len(data_prefix):].partition('/')
+                if key not in scheme:
+                    return False
+                directory = scheme[key]
+            destination = _destination(directory, relative_path)
+            if destination is None:
+                return False
+            files.append((info, destination, info.filename.startswith(data_prefix + 'scripts/')))
+
+        scripts = []
+        for section in ('console_scripts', 'gui_scripts'):
+            if not entry_points.has_section(section):
+                continue
+            for script_name, entry_point in entry_points.items(section):
+                destination = _destination(scheme['scripts'], script_name)
+                if destination is None:
+                    return False
+                module, _separator, function = entry_point.partition(':')
+                content = _SCRIPT_TEMPLATE.format(
+                    interpreter=sys.executable, module=module.strip(), attribute=function.strip().split('.')[0],
+                    function=function.split('[')[0].strip()
+                ).encode()
+                scripts.append((destination, content))
+
+        _uninstall_native(wheel_name.project, purelib)
+
+        record = []
+        for info, destination, is_script in files:
+            content = archive.read(info)
+            if is_script and content.startswith(b'#!python'):
+                content = '#!{}'.format(sys.executable).encode() + content[len(b'#!python'):]
+            record.append(_write_file(destination, content, purelib, executable=is_script))
+        for destination, content in scripts:
+            record.append(_write_file(destination, content, purelib, executable=True))
+
+    record.append(_write_file(os.path.join(purelib, dist_info, 'INSTALLER'), b'lenitools\n', purelib))
+    record.append(_write_file(os.path.join(purelib, dist_info, 'REQUESTED'), b'', purelib))
+    record.append((os.path.join(dist_info, 'RECORD').replace(os.path.sep, '/'), '', ''))
+    with open(os.path.join(purelib, dist_info, 'RECORD'), 'w', newline='', encoding='utf-8') as file:
+        csv.writer(file, lineterminator='\n').writerows(record)
+    return True
+
+
+def _is_pure_tag(wheel_name) -> bool:
+    """
+    return whether a wheel is tagged as pure python 3 wheel, e.g. py3-none-any or py2.py3-none-any
+
+    :param wheel_name: wheel name as returned by Leni_wheel_parse_filename
+    """
+    return wheel_name.abi == 'none' and wheel_name.platform == 'any' and any(
+        tag == 'py3' or tag == 'py{}{}'.format(*sys.version_info[:2]) for tag in wheel_name.python.split('.')
+    )
+
+
+def _destination(directory: str, relative_path: str) -> Optional[str]:
+    """
+    return the path to write a file of a wheel to, or None if it would end up outside of <directory>
+
+    :param directory: installation directory, e.g. site-packages
+    :param relative_path: path inside of the wheel or name of a script
+    """
+    try:
+        _target_path(directory, relative_path)
+    except tarfile.ExtractError:
+        return None
+    # the resolved path only guards, site-packages may be a symbolic link and RECORD is relative to it
+    return os.path.normpath(os.path.join(directory, relative_path))
+
+
+def _matches_record_hash(archive: zipfile.ZipFile, info: zipfile.ZipInfo, expected: str) -> bool:
+    """
+    return whether a file of a wheel matches its hash in RECORD, e.g. "sha256=<urlsafe base64 digest>"
+
+    :param archive: wheel
+    :param info: file in the wheel
+    :param expected: hash from RECORD, md5 and sha1 are refused, see PEP 427
+    """
+    algorithm = expected.partition('=')[0]
+    if algorithm not in hashlib.algorithms_guaranteed or algorithm in ('md5', 'sha1') or algorithm.startswith('shake'):
+        return False
+    digest = hashlib.new(algorithm)
+    with archive.open(info) as file:
+        for chunk in iter(functools.partial(file.read, 1024 * 1024), b''):
+            digest.update(chunk)
+    return _record_hash(digest) == expected
+
+
+def _record_hash(content) -> str:
+    """
+    return the hash of a file as written into RECORD
+
+    :param content: file content, or a hashlib object holding the hash of it
+    """
+    if isinstance(content, bytes):
+        content = hashlib.sha256(content)
+    digest = base64.urlsafe_b64encode(content.digest()).rstrip(b'=').decode('ascii')
+    return '{}={}'.format(content.name, digest)
+
+
+def _uninstall_native(project: str, purelib: str) -> None:
+    """
+    Remove the files of an installed project, as listed in its RECORD
+
+    :param project: normalized project name
+    :param purelib: site-packages directory
+    """
+    if not os.path.isdir(purelib):
+        return
+    for entry in os.listdir(purelib):
+        if not entry.endswith('.dist-info') or Leni_wheel_normalize_name(entry[:-len('.dist-info')].rsplit('-', 1)[0]) != project:
+            continue
+        dist_info = os.path.join(purelib, entry)
+        try:
+            with open(os.path.join(dist_info, 'RECORD'), newline='', encoding='utf-8') as file:
+                rows = list(csv.reader(file))
+        except OSError:
+            rows = []
+        for row in rows:
+            filepath = os.path.normpath(os.path.join(purelib, row[0])) if row else ''
+            if filepath and os.path.isfile(filepath):
+                os.remove(filepath)
+                if filepath.endswith('.py'):
+                    shutil.rmtree(os.path.join(os.path.dirname(filepath), '__pycache__'), ignore_errors=True)
+        shutil.rmtree(dist_info, ignore_errors=True)
+
+
+def _write_file(filepath: str, content: bytes, purelib: str, executable: bool = False) -> tuple[str, str, str]:
+    """
+    Write a file for the native installer
+
+    :param filepath: filepath to write
+    :param content: file content
+    :param purelib: site-packages directory, paths in RECORD are relative to it
+    :param executable: make the file executable
+    :return: row for RECORD
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'wb') as file:
+        file.write(content)
+    Leni_timing_add(bytes_written=len(content))
+    if executable:
+        os.chmod(filepath, os.stat(filepath).st_mode | 0o111)
+    relative_path = os.path.relpath(filepath, purelib).replace(os.path.sep, '/')
+    return relative_path, _record_hash(content), str(len(content))
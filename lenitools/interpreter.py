@@ -0,0 +1,148 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Ask python interpreters, e.g. mayapy, which wheels they can install """
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import functools
+import hashlib
+import json
+import platform
+import shutil
+import subprocess
+import sys
+
+from .cache import Leni_cache_directory, _write_atomic
+
+__all__ = ['Leni_interpreter_tags', 'Leni_interpreter_info']
+
+# prints the python version, the tags supported by an interpreter, most specific first, see PEP 425,
+# and its environment for markers like "python_version < '3.11'", see PEP 508
+_TAGS_SCRIPT = '''
+import json, platform
+try:
+    from packaging import markers, tags
+except ImportError:
+    from pip._vendor.packaging import markers, tags
+print(json.dumps({'python_version': platform.python_version(), 'tags': [str(tag) for tag in tags.sys_tags()],
+                  'environment': markers.default_environment()}))
+'''
+
+
+class InterpreterInfo(NamedTuple):
+    """ Python version, supported wheel tags and marker environment of an interpreter """
+    python_version: str
+    tags: tuple[str, ...]
+    # None for the running interpreter, which evaluates markers itself
+    environment: Optional[dict] = None
+
+
+def Leni_interpreter_tags(interpreter=None) -> Optional[tuple[str, ...]]:
+    """
+    return the wheel tags a python interpreter supports
+
+    The running interpreter is asked directly, any other interpreter (e.g. mayapy) in a subprocess,
+    see Leni_interpreter_info. Both need the packaging module or pip.
+
+    >>> 'cp310-cp310-manylinux_2_17_x86_64' in Leni_interpreter_tags('/usr/autodesk/maya2024/bin/mayapy')
+    True
+
+    :param interpreter: python interpreter, Defaults to the running interpreter
+    :return: tags like 'cp310-cp310-manylinux_2_17_x86_64', most specific first, or None if they can't be determined
+    """
+    if interpreter is None or _is_running_interpreter(interpreter):
+        return _running_interpreter_tags()
+    info = Leni_interpreter_info(interpreter)
+    return info.tags if info is not None else None
+
+
+def Leni_interpreter_info(interpreter, cache_dir=None, refresh: bool = False) -> Optional[InterpreterInfo]:
+    """
+    return python version and supported wheel tags of a python interpreter, e.g. mayapy
+
+    Starting mayapy takes seconds, so the answer is remembered in the cache, as long as size and
+    modification time of the interpreter do not change, and in memory for the rest of the process.
+
+    >>> Leni_interpreter_info('/usr/autodesk/maya2024/bin/mayapy').python_version
+    '3.10.8'
+
+    :param interpreter: name or path of a python interpreter
+    :param cache_dir: cache directory, see lenitools.cache.Leni_cache_directory
+    :param refresh: ask the interpreter again, even if the answer is known
+    :return: python version, tags like 'cp310-cp310-manylinux_2_17_x86_64', most specific first, and the
+        marker environment, e.g. for lenitools.schedule.Leni_schedule_waves, or None if the interpreter can't be run
+        or lacks packaging and pip
+    """
+    if _is_running_interpreter(interpreter):
+        tags = _running_interpreter_tags()
+        return InterpreterInfo(platform.python_version(), tags) if tags is not None else None
+    if refresh:
+        _interpreter_info.cache_clear()
+    return _interpreter_info(shutil.which(str(interpreter)) or str(interpreter), cache_dir, refresh)
+
+
+def _is_running_interpreter(interpreter) -> bool:
+    """
+    return whether <interpreter> is the python interpreter running this code
+
+    :param interpreter: name or path of a python interpreter
+    """
+    interpreter = shutil.which(str(interpreter)) or str(interpreter)
+    try:
+        return Path(interpreter).resolve() == Path(sys.executable).resolve()
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _running_interpreter_tags() -> Optional[tuple[str, ...]]:
+    """ return the tags supported by the running interpreter """
+    try:
+        from packaging import tags
+    except (ModuleNotFoundError, ImportError):
+        try:
+            from pip._vendor.packaging import tags
+        except (ModuleNotFoundError, ImportError):
+            return None
+    return tuple(str(tag) for tag in tags.sys_tags())
+
+
+@functools.lru_cache(maxsize=None)
+def _interpreter_info(interpreter: str, cache_dir=None, refresh: bool = False) -> Optional[InterpreterInfo]:
+    """
+    return python version, tags and marker environment of another interpreter, from the cache or a subprocess
+
+    :param interpreter: path of a python interpreter
+    :param cache_dir: cache directory
+    :param refresh: ignore the cache
+    """
+    try:
+        stat = Path(interpreter).resolve().stat()
+    except OSError:
+        return None
+    record_file = Leni_cache_directory(cache_dir) / 'interpreters' / '{}.json'.format(
+        hashlib.sha1(str(Path(interpreter).absolute()).encode('utf-8', 'surrogateescape')).hexdigest()
+    )
+    if not refresh:
+        try:
+            record = json.loads(record_file.read_text(encoding='utf-8'))
+            if record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns and 'environment' in record:
+                return InterpreterInfo(record['python_version'], tuple(record['tags']), record['environment'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    try:
+        process = subprocess.run([interpreter, '-c', _TAGS_SCRIPT], capture_output=True, check=True, timeout=60)
+        answer = json.loads(process.stdout.decode().strip().splitlines()[-1])
+        info = InterpreterInfo(answer['python_version'], tuple(answer['tags']), answer.get('environment'))
+    except (OSError, ValueError, KeyError, IndexError, TypeError, subprocess.SubprocessError):
+        return None
+    record = {'path': str(interpreter), 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+              'python_version': info.python_version, 'tags': info.tags, 'environment': info.environment}
+    try:
+        _write_atomic(record_file, json.dumps(record))
+    except OSError:
+        # read-only cache, ask again next time
+        pass
+    return info
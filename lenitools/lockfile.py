@@ -0,0 +1,249 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Lock files for processes on one or many hosts sharing a directory, e.g. a cache on NFS """
+
+from pathlib import Path
+from typing import Callable, Optional
+
+import json
+import os
+import socket
+import threading
+import time
+
+__all__ = ['Leni_lockfile_owner', 'Leni_lockfile_once', 'LockFile']
+
+# locks not refreshed for this many seconds belong to dead processes, owners refresh them four times as often.
+# The clocks of all hosts sharing a directory have to agree within this time.
+STALE_LOCK_AGE = 120
+
+# longest pause between two looks at a lock held by another process, in seconds
+MAX_POLL_INTERVAL = 1.0
+
+_HOST = socket.gethostname()
+
+
+def Leni_lockfile_owner(filepath) -> Optional[dict]:
+    """
+    return the owner of a lock file
+
+    :param filepath: filepath of the lock
+    :return: dict with host, pid, token and created (a timestamp), or None if nobody holds the lock
+    """
+    try:
+        owner = json.loads(Path(filepath).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    return owner if isinstance(owner, dict) else None
+
+
+def Leni_lockfile_once(filepath, result: Callable, produce: Callable, stale_after: Optional[float] = None):
+    """
+    Let only one of several processes produce something, e.g. extract an archive into a shared cache
+
+    The process holding the lock calls <produce>, all others wait until <result> returns something.
+    If the producer dies or fails, the next waiting process takes over. If the lock can't be created,
+    e.g. in a read-only directory, <produce> is called without it.
+
+    :param filepath: filepath of the lock
+    :param result: function returning the result, if it has already been produced, or None
+    :param produce: function producing and returning the result
+    :param stale_after: see LockFile
+    :return: return value of <result> or <produce>
+    """
+    lock = LockFile(filepath, stale_after=stale_after)
+    interval = 0.05
+    while True:
+        value = result()
+        if value is not None:
+            return value
+        try:
+            acquired = lock.acquire(blocking=False)
+        except OSError:
+            # read-only directory, nobody can lock it, so work alone
+            return produce()
+        if acquired:
+            try:
+                value = result()
+                return value if value is not None else produce()
+            finally:
+                lock.release()
+        time.sleep(interval)
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+class LockFile:
+    """
+    Exclusive lock, held by the process that created the lock file
+
+    The lock file records host, process id and a random token of its owner. It is created with a hard link,
+    which is atomic on local file systems and NFS alike. While held, a thread refreshes its modification time,
+    so a lock of a process that died, on any host, is taken over after <stale_after> seconds. Locks of dead
+    processes on the same host are taken over at once.
+
+    >>> with LockFile('/mnt/wheelhouse/.cache/.lock-bundle'):
+    ...     extract_bundle()
+
+    :param filepath: filepath of the lock
+    :param stale_after: seconds without refresh, after which the lock is taken over, Defaults to STALE_LOCK_AGE
+    """
+
+    def __init__(self, filepath, stale_after: Optional[float] = None):
+        self.filepath = Path(filepath)
+        self.stale_after = STALE_LOCK_AGE if stale_after is None else stale_after
+        self.token = None
+        self._stop = None
+
+    @property
+    def locked(self) -> bool:
+        """ whether this object holds the lock """
+        return self.token is not None
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Acquire the lock
+
+        :param blocking: wait until the lock is free
+        :param timeout: seconds to wait at most, Defaults to waiting forever
+        :return: True, if the lock was acquired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = 0.05
+        while True:
+            if self._create() or self._break_stale() and self._create():
+                self._start_refresh()
+                return True
+            if not blocking or deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(interval if deadline is None else max(0.0, min(interval, deadline - time.monotonic())))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+    def release(self) -> None:
+        """ Release the lock, a lock taken over by another process is left alone """
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        owner = Leni_lockfile_owner(self.filepath)
+        if owner is not None and owner.get('token') == self.token:
+            try:
+                os.remove(self.filepath)
+            except FileNotFoundError:
+                pass
+        self.token = None
+
+    def is_stale(self) -> bool:
+        """ return whether the lock file belongs to a process, that died """
+        try:
+            mtime = os.stat(self.filepath).st_mtime
+        except FileNotFoundError:
+            return False
+        owner = Leni_lockfile_owner(self.filepath)
+        if owner is not None and owner.get('host') == _HOST and not _is_alive(owner.get('pid')):
+            return True
+        return time.time() - mtime > self.stale_after
+
+    def _create(self) -> bool:
+        """ create the lock file, return whether it was created """
+        token = os.urandom(16).hex()
+        content = json.dumps({'host': _HOST, 'pid': os.getpid(), 'token': token, 'created': time.time()})
+        # the lock file appears complete or not at all, readers never see it half written
+        tmp_file = self.filepath.with_name('{}.{}-{}-{}.tmp'.format(self.filepath.name, _HOST, os.getpid(), token[:8]))
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(content, encoding='utf-8')
+        try:
+            os.link(tmp_file, self.filepath)
+            created = True
+        except FileExistsError:
+            created = False
+        except OSError:
+            # NFS may report a failure for a link, that was created, e.g. after retransmitting the request
+            try:
+                created = os.stat(tmp_file).st_nlink == 2
+            except OSError:
+                created = False
+            if not created and Leni_lockfile_owner(self.filepath) is None and not self.filepath.exists():
+                # no hard links on this file system
+                created = self._create_exclusive(content)
+        finally:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+        if created:
+            self.token = token
+        return created
+
+    def _create_exclusive(self, content: str) -> bool:
+        """ create the lock file with O_EXCL, for file systems without hard links """
+        try:
+            file_descriptor = os.open(self.filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return True
+
+    def _break_stale(self) -> bool:
+        """ remove the lock file of a dead process, return whether it was removed """
+        owner = Leni_lockfile_owner(self.filepath)
+        if not self.is_stale():
+            return False
+        # renaming is atomic, if several processes break the same lock, only one succeeds
+        broken = self.filepath.with_name('{}.broken-{}-{}'.format(self.filepath.name, _HOST, os.getpid()))
+        try:
+            os.rename(self.filepath, broken)
+        except FileNotFoundError:
+            return True
+        if Leni_lockfile_owner(broken) != owner:
+            # another process took the lock over in the meantime, give it back
+            try:
+                os.link(broken, self.filepath)
+            except OSError:
+                pass
+            os.remove(broken)
+            return False
+        os.remove(broken)
+        return True
+
+    def _start_refresh(self) -> None:
+        """ start a thread, that refreshes the modification time of the lock file while it is held """
+        stop = self._stop = threading.Event()
+        thread = threading.Thread(target=self._refresh, args=(stop, self.token), daemon=True,
+                                  name='lockfile-{}'.format(self.filepath.name))
+        thread.start()
+
+    def _refresh(self, stop: threading.Event, token: str) -> None:
+        while not stop.wait(self.stale_after / 4):
+            owner = Leni_lockfile_owner(self.filepath)
+            if owner is None or owner.get('token') != token:
+                # taken over, e.g. after this process was suspended for too long
+                return
+            try:
+                os.utime(self.filepath)
+            except OSError:
+                return
+
+    def __enter__(self) -> 'LockFile':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def _is_alive(pid) -> bool:
+    """
+    return whether a process on this host is running
+
+    :param pid: process id
+    """
+    if not isinstance(pid, int) or os.name == 'nt':
+        # os.kill would terminate the process on Windows, rely on the refresh instead
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,104 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Find Maya installations and their mayapy interpreters, without starting Maya """
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import os
+import re
+import platform
+
+__all__ = ['Leni_maya_installs', 'Leni_maya_install']
+
+# directories to look for Maya installations in, separated by os.pathsep. Replaces the default directories,
+# e.g. to test against fake installations
+ROOTS_VARIABLE = 'LENITOOLS_MAYA_ROOTS'
+
+# default directories containing Maya installations, by platform.system()
+DEFAULT_ROOTS = {
+    'Linux': ['/usr/autodesk'],
+    'Windows': [os.path.join(os.environ.get('ProgramFiles', r'C:\Program Files'), 'Autodesk')],
+    'Darwin': ['/Applications/Autodesk'],
+}
+
+# mayapy relative to the installation directory
+_INTERPRETERS = ('bin/mayapy', 'bin/mayapy.exe', 'Maya.app/Contents/bin/mayapy')
+
+# version in the name of an installation directory, e.g. maya2024 or Maya2023.3
+_VERSION = re.compile(r'maya\s*(\d{4}(?:\.\d+)*)', re.IGNORECASE)
+
+
+class MayaInstall(NamedTuple):
+    """ Maya installation """
+    version: str
+    location: str
+    interpreter: str
+
+
+def Leni_maya_installs(*args) -> list[MayaInstall]:
+    """
+    return the Maya installations with a mayapy interpreter
+
+    Each directory is either an installation itself or contains installations, like /usr/autodesk/maya2024.
+    Python version and tags of each mayapy are known from lenitools.interpreter.Leni_interpreter_info.
+
+    >>> [install.version for install in Leni_maya_installs()]
+    ['2023', '2024', '2025']
+
+    :param args: directories to look in, Defaults to $LENITOOLS_MAYA_ROOTS or the default directories of
+        the platform and $MAYA_LOCATION
+    :return: installations, sorted by version
+    """
+    roots = list(args)
+    if not roots and os.environ.get(ROOTS_VARIABLE):
+        roots = [root for root in os.environ[ROOTS_VARIABLE].split(os.pathsep) if root]
+    elif not roots:
+        roots = DEFAULT_ROOTS.get(platform.system(), []) + (
+            [os.environ['MAYA_LOCATION']] if os.environ.get('MAYA_LOCATION') else []
+        )
+
+    installs = {}
+    for root in (Path(root).expanduser() for root in roots):
+        try:
+            candidates = [root] + sorted(directory for directory in root.iterdir() if directory.is_dir())
+        except OSError:
+            continue
+        for location in candidates:
+            install = _maya_install(location)
+            if install is not None:
+                installs.setdefault(os.path.realpath(install.location), install)
+    return sorted(installs.values(), key=lambda install: (_version_key(install.version), install.location))
+
+
+def Leni_maya_install(version, *args) -> Optional[MayaInstall]:
+    """
+    return the Maya installation of a version
+
+    :param version: Maya version, e.g. '2024' or 2024. A version without update, like '2024', also matches '2024.2'
+    :param args: directories to look in, see Leni_maya_installs
+    :return: installation, the latest update of <version> or None
+    """
+    version = str(version)
+    matches = [install for install in Leni_maya_installs(*args)
+               if install.version == version or install.version.startswith(version + '.')]
+    return matches[-1] if matches else None
+
+
+def _maya_install(location: Path) -> Optional[MayaInstall]:
+    """
+    return the installation in a directory, if it contains mayapy
+
+    :param location: installation directory
+    """
+    for interpreter in _INTERPRETERS:
+        filepath = location / interpreter
+        if filepath.is_file() and os.access(filepath, os.X_OK):
+            match = _VERSION.search(location.name)
+            return MayaInstall(match.group(1) if match else location.name, str(location), str(filepath))
+    return None
+
+
+def _version_key(version: str) -> tuple:
+    """ return a sort key for a Maya version """
+    return tuple(int(part) if part.isdigit() else -1 for part in version.split('.'))
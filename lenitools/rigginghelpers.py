@@ -1,43 +1,191 @@
 # <> with ❤ by @LeniMagEsVonHinten
 
+from pathlib import Path
+from typing import Union
+
+import json
+
 import maya.cmds as cmds
 
-__all__ = ['Leni_rigginghelpers_lock']
+__all__ = ['Leni_rigginghelpers_lock', 'Leni_rigginghelpers_snapshot', 'Leni_rigginghelpers_restore']
+
+# attributes by their short names
+TRANSFORM_ATTRIBUTES = {'t': 'translate', 'r': 'rotate', 's': 'scale'}
 
+# channels captured in snapshots, the bit of each channel in the masks is its position
+SNAPSHOT_CHANNELS = ['{}{}'.format(attribute, axis) for attribute in TRANSFORM_ATTRIBUTES.values() for axis in 'XYZ']
 
-def Leni_rigginghelpers_lock(*args, **kwargs):
+# version of the snapshot format
+SNAPSHOT_VERSION = 1
+
+
+def Leni_rigginghelpers_lock(*args, **kwargs) -> list[str]:
     """
-    Lock or unlock transformations in a selected node
+    Lock or unlock transformations in the selected nodes
+
+    The lock state of each node is queried once, only plugs in another state are changed.
+    All changes are made in a single undo chunk.
 
     >>> Leni_rigginghelpers_lock()
     >>> Leni_rigginghelpers_lock(lock=False)
     >>> Leni_rigginghelpers_lock('translate', 'rotate')
     >>> Leni_rigginghelpers_lock(axis=['x','y'])
+    >>> Leni_rigginghelpers_lock('r', nodes=['root_jnt'], hierarchy=True)
+    >>> Leni_rigginghelpers_lock(sets=['controls_set'], lock=False)
 
-    :param args: arguments
-    :param kargs: keyword options
+    :param args: attributes, translate (t), rotate (r) and/or scale (s), Defaults to all
+    :param lock: lock or unlock, Defaults to True
+    :param axis: axes, Defaults to ['X', 'Y', 'Z']
+    :param nodes: nodes, Defaults to the selection if neither nodes nor sets are given
+    :param sets: object sets, whose members are included
+    :param hierarchy: include all descendants of the nodes, Defaults to False
+    :return: list of changed plugs
     """
-    attributes = []
     args = [argument.lower() for argument in args]
-
+    attributes = [attribute for short, attribute in TRANSFORM_ATTRIBUTES.items() if short in args or attribute in args]
     if len(args) <= 0:
-        attributes = ['translate', 'rotate', 'scale']
+        attributes = list(TRANSFORM_ATTRIBUTES.values())
 
-    if 'translate' in args or 't' in args:
-        attributes.append('translate')
+    axes = [axis.upper() for axis in kwargs.get('axis', ['X', 'Y', 'Z'])]
+    lock = kwargs.get('lock', True)
+    names = ['{}{}'.format(attribute, axis) for attribute in attributes for axis in axes]
 
-    if 'rotate' in args or 'r' in args:
-        attributes.append('rotate')
+    changes = []
+    for node in _collect_nodes(**kwargs):
+        locked = set(cmds.listAttr(node, locked=True) or [])
+        changes.extend('{}.{}'.format(node, name) for name in names if (name in locked) != lock)
+    if not changes:
+        return changes
 
-    if 'scale' in args or 's' in args:
-        attributes.append('scale')
+    cmds.undoInfo(openChunk=True, chunkName='Leni_rigginghelpers_lock')
+    try:
+        for plug in changes:
+            cmds.setAttr(plug, lock=lock)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return changes
 
-    axes = kwargs.get('axis', ['X', 'Y', 'Z'])
-    axes = [axis.upper() for axis in axes]
-    lock = kwargs.get('lock', True)
 
-    selected_objects = kwargs.get('axis', cmds.ls(selection=True))
-    for attribute in attributes:
-        for axis in axes:
-            for _object in selected_objects:
-                cmds.setAttr('{}.{}{}'.format(_object, attribute, axis), lock=lock)
+def Leni_rigginghelpers_snapshot(*args, **kwargs) -> dict:
+    """
+    Capture the lock and keyable state of the transform channels of nodes
+
+    The state of each node is stored as two bit masks over SNAPSHOT_CHANNELS, so snapshots of large rigs
+    stay small. A snapshot is a plain dict and can be written as JSON.
+
+    >>> snapshot = Leni_rigginghelpers_snapshot(nodes='root_jnt', hierarchy=True, filepath='~/rig_locks.json')
+    >>> Leni_rigginghelpers_lock(lock=False, nodes='root_jnt', hierarchy=True)
+    >>> Leni_rigginghelpers_restore(snapshot)
+
+    :param args: nodes, see nodes
+    :param nodes: nodes, Defaults to the selection if neither nodes nor sets are given
+    :param sets: object sets, whose members are included
+    :param hierarchy: include all descendants of the nodes, Defaults to False
+    :param filepath: also write the snapshot as JSON to this file
+    :return: snapshot
+    """
+    if args:
+        kwargs['nodes'] = _as_list(kwargs.get('nodes')) + list(args)
+    nodes = {}
+    for node in _collect_nodes(**kwargs):
+        locked, keyable = _channel_state(node)
+        nodes[node] = [_mask(locked), _mask(keyable)]
+    snapshot = {'version': SNAPSHOT_VERSION, 'channels': SNAPSHOT_CHANNELS, 'nodes': nodes}
+
+    if kwargs.get('filepath'):
+        with open(Path(kwargs['filepath']).expanduser(), 'w', encoding='utf-8') as file:
+            json.dump(snapshot, file, separators=(',', ':'))
+    return snapshot
+
+
+def Leni_rigginghelpers_restore(snapshot: Union[dict, str, Path]) -> list[str]:
+    """
+    Restore the lock and keyable state of transform channels from a snapshot
+
+    The current state is compared with the snapshot, only plugs that differ are changed, in a single undo chunk.
+    Nodes that don't exist anymore are skipped.
+
+    :param snapshot: snapshot as returned by Leni_rigginghelpers_snapshot, or the filepath of its JSON file
+    :raise ValueError: if the snapshot has an unknown format
+    :return: list of changed plugs
+    """
+    if not isinstance(snapshot, dict):
+        with open(Path(snapshot).expanduser(), encoding='utf-8') as file:
+            snapshot = json.load(file)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError('*** Unknown snapshot version: {}'.format(snapshot.get('version')))
+    channels = snapshot['channels']
+
+    changes = []
+    existing = set(cmds.ls(list(snapshot['nodes']), long=True) or [])
+    for node, (locked_mask, keyable_mask) in snapshot['nodes'].items():
+        if node not in existing:
+            continue
+        locked, keyable = _channel_state(node)
+        for bit, channel in enumerate(channels):
+            if (channel in keyable) != bool(keyable_mask >> bit & 1):
+                changes.append(('{}.{}'.format(node, channel), 'keyable', bool(keyable_mask >> bit & 1)))
+            if (channel in locked) != bool(locked_mask >> bit & 1):
+                changes.append(('{}.{}'.format(node, channel), 'lock', bool(locked_mask >> bit & 1)))
+    if not changes:
+        return []
+
+    cmds.undoInfo(openChunk=True, chunkName='Leni_rigginghelpers_restore')
+    try:
+        for plug, flag, value in changes:
+            cmds.setAttr(plug, **{flag: value})
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return list(dict.fromkeys(plug for plug, _flag, _value in changes))
+
+
+def _collect_nodes(**kwargs) -> list[str]:
+    """
+    return the transform nodes to work on, each once and with its full path
+
+    :param nodes: nodes, Defaults to the selection if neither nodes nor sets are given
+    :param sets: object sets, whose members are included
+    :param hierarchy: include all descendants of the nodes, Defaults to False
+    :return: list of nodes
+    """
+    nodes = _as_list(kwargs.get('nodes'))
+    for object_set in _as_list(kwargs.get('sets')):
+        nodes.extend(cmds.sets(object_set, query=True) or [])
+    if 'nodes' not in kwargs and 'sets' not in kwargs:
+        nodes = cmds.ls(selection=True) or []
+    if not nodes:
+        return []
+
+    if kwargs.get('hierarchy', False):
+        nodes.extend(cmds.listRelatives(nodes, allDescendents=True, type='transform', fullPath=True) or [])
+    # joints and other transform types only, without duplicates
+    return list(dict.fromkeys(cmds.ls(nodes, type='transform', long=True) or []))
+
+
+def _as_list(value) -> list:
+    """
+    return a single name or a list of names as list
+
+    :param value: name, list of names or None
+    """
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _channel_state(node: str) -> tuple[set, set]:
+    """
+    return the locked and the keyable attributes of a node
+
+    :param node: node
+    """
+    return set(cmds.listAttr(node, locked=True) or []), set(cmds.listAttr(node, keyable=True) or [])
+
+
+def _mask(attributes: set) -> int:
+    """
+    return the bit mask of the snapshot channels in attributes
+
+    :param attributes: attribute names
+    """
+    return sum(1 << bit for bit, channel in enumerate(SNAPSHOT_CHANNELS) if channel in attributes)
@@ -0,0 +1,204 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Schedule the installation of python wheels by their dependencies """
+
+from typing import NamedTuple, Optional
+
+import functools
+import re
+import zipfile
+
+from .wheelfile import Leni_wheel_metadata, Leni_wheel_normalize_name, Leni_wheel_parse_filename
+
+__all__ = ['Leni_wheel_requirements', 'Leni_schedule_waves']
+
+# project name at the start of a requirement, see PEP 508
+_REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)')
+
+
+class Schedule(NamedTuple):
+    """ Installation waves, dependency cycles and missing dependencies of a set of wheels """
+    waves: list[list[str]]
+    cycles: list[list[str]]
+    missing: dict[str, list[str]]
+
+
+def Leni_wheel_requirements(wheel, environment: Optional[dict] = None) -> list[str]:
+    """
+    return the normalized project names a wheel depends on
+
+    Requirements are read from Requires-Dist in the METADATA of the wheel, without extracting it.
+    Requirements for extras and requirements whose environment markers don't match are left out.
+
+    :param wheel: filepath to wheel
+    :param environment: marker environment of the target interpreter, Defaults to the running interpreter
+    :return: list of normalized project names
+    """
+    requirements = []
+    for requirement in Leni_wheel_metadata(wheel).get_all('Requires-Dist') or []:
+        match = _REQUIREMENT_NAME.match(requirement)
+        if not match:
+            continue
+        _requirement, _separator, marker = requirement.partition(';')
+        if marker.strip() and not _evaluate_marker(marker.strip(), environment):
+            continue
+        name = Leni_wheel_normalize_name(match.group(1))
+        if name not in requirements:
+            requirements.append(name)
+    return requirements
+
+
+def Leni_schedule_waves(*args, **kwargs) -> Schedule:
+    """
+    Sort wheels into waves, so that every wheel is installed after the wheels it depends on
+
+    Wheels within a wave don't depend on each other and can be installed in parallel.
+    Wheels depending on each other in a cycle end up in the same wave. Dependencies, that are not
+    part of the given wheels, are reported as missing; they might already be installed.
+
+    >>> Leni_schedule_waves('app-1.0-py3-none-any.whl', 'lib-2.0-py3-none-any.whl').waves
+    [['lib-2.0-py3-none-any.whl'], ['app-1.0-py3-none-any.whl']]
+
+    :param args: wheel files
+    :param environment: marker environment of the target interpreter, Defaults to the running interpreter
+    :return: waves of wheels, cycles as lists of project names and missing dependencies for each wheel
+    """
+    environment = kwargs.get('environment')
+    wheels = [str(wheel) for wheel in args]
+
+    projects = {}
+    for wheel in wheels:
+        projects.setdefault(_project(wheel), []).append(wheel)
+
+    dependencies = {}
+    missing = {}
+    for project, project_wheels in projects.items():
+        dependencies[project] = set()
+        for wheel in project_wheels:
+            try:
+                requirements = Leni_wheel_requirements(wheel, environment)
+            except (OSError, ValueError, zipfile.BadZipFile):
+                requirements = []
+            for requirement in requirements:
+                if requirement in projects:
+                    dependencies[project].add(requirement)
+                elif requirement not in missing.get(wheel, []):
+                    missing.setdefault(wheel, []).append(requirement)
+
+    components = _strongly_connected_components(dependencies)
+    component_of = {project: number for number, component in enumerate(components) for project in component}
+    cycles = [
+        sorted(component) for component in components
+        if len(component) > 1 or component[0] in dependencies[component[0]]
+    ]
+
+    # Kahn's algorithm on the graph of components
+    pending = {
+        number: set(component_of[dependency] for project in component for dependency in dependencies[project]) - {number}
+        for number, component in enumerate(components)
+    }
+    waves = []
+    while pending:
+        ready = sorted(number for number, requires in pending.items() if not requires)
+        wave = []
+        for number in ready:
+            del pending[number]
+            for project in sorted(components[number]):
+                wave.extend(projects[project])
+        for requires in pending.values():
+            requires.difference_update(ready)
+        waves.append(wave)
+    return Schedule(waves=waves, cycles=cycles, missing=missing)
+
+
+def _project(wheel: str) -> str:
+    """
+    return the normalized project name of a wheel
+
+    :param wheel: filepath to wheel
+    """
+    try:
+        return Leni_wheel_parse_filename(wheel).project
+    except ValueError:
+        return Leni_wheel_normalize_name(wheel)
+
+
+def _evaluate_marker(marker: str, environment: Optional[dict] = None) -> bool:
+    """
+    Evaluate an environment marker of a requirement, see PEP 508
+
+    Without the packaging module (or pip), only markers for extras are recognized.
+
+    :param marker: environment marker
+    :param environment: marker environment, Defaults to the running interpreter
+    :return: True, if the requirement applies
+    """
+    marker_class = _marker_class()
+    if marker_class is None:
+        return 'extra' not in marker
+    try:
+        return marker_class(marker).evaluate(dict(environment or {}, extra=''))
+    except (ValueError, KeyError):
+        # InvalidMarker is a ValueError
+        return 'extra' not in marker
+
+
+@functools.lru_cache(maxsize=None)
+def _marker_class():
+    """ return packaging's Marker class, imported on first use as importing it is slow, or None """
+    try:
+        from packaging.markers import Marker
+    except (ModuleNotFoundError, ImportError):
+        try:
+            from pip._vendor.packaging.markers import Marker
+        except (ModuleNotFoundError, ImportError):
+            return None
+    return Marker
+
+
+def _strongly_connected_components(graph: dict[str, set]) -> list[list[str]]:
+    """
+    Find the strongly connected components of a graph (Tarjan's algorithm)
+
+    :param graph: dict mapping each node to the nodes it points to
+    :return: list of components, each a list of nodes
+    """
+    index = {}
+    low_link = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in sorted(graph):
+        if root in index:
+            continue
+        # iterative depth first search, to not hit the recursion limit on long chains
+        work = [(root, iter(sorted(graph[root])))]
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = low_link[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(graph[child]))))
+                elif child in on_stack:
+                    low_link[node] = min(low_link[node], index[child])
+                continue
+            work.pop()
+            if work:
+                low_link[work[-1][0]] = min(low_link[work[-1][0]], low_link[node])
+            if low_link[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
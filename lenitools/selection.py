@@ -0,0 +1,157 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Pick the best wheel of each project """
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import functools
+import re
+
+from .wheelfile import Leni_wheel_normalize_name, Leni_wheel_parse_filename, Leni_wheel_tags, Leni_wheel_version_key
+
+__all__ = ['Leni_select_wheels', 'Leni_read_pins']
+
+# project name and version specifier of a line in a pin file, e.g. "numpy==1.26.4" or "requests>=2,<3"
+_PIN_LINE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^]]*])?\s*(.*?)\s*(;.*)?$')
+
+
+class Selection(NamedTuple):
+    """ Selected wheels and the reason for each dropped wheel """
+    selected: list[str]
+    dropped: dict[str, str]
+
+
+def Leni_read_pins(filepath) -> dict[str, str]:
+    """
+    Read a pin file, written like a requirements file
+
+    Each line holds a project and a version specifier, e.g. "numpy==1.26.4" or "requests>=2,<3".
+    Comments, empty lines and options like "--index-url" are ignored.
+
+    :param filepath: filepath to pin file
+    :return: dict mapping the normalized project name to its version specifier
+    """
+    pins = {}
+    for line in Path(filepath).expanduser().read_text(encoding='utf-8').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line or line.startswith('-'):
+            continue
+        match = _PIN_LINE.match(line)
+        if match:
+            pins[Leni_wheel_normalize_name(match.group(1))] = match.group(3).replace(' ', '')
+    return pins
+
+
+def Leni_select_wheels(*args, **kwargs) -> Selection:
+    """
+    Keep the best wheel of each project
+
+    Wheels are grouped by their normalized project name. Of each group, only the wheel with the highest version
+    is kept, then the one with the most specific tag for the interpreter, then the highest build number.
+    Without tags, wheels of the best version, that differ in their tags, are all kept, as pip has to choose.
+    Only file names are looked at, so this works for wheels inside of archives before they are extracted.
+
+    >>> Leni_select_wheels('six-1.15.0-py2.py3-none-any.whl', 'six-1.16.0-py2.py3-none-any.whl').selected
+    ['six-1.16.0-py2.py3-none-any.whl']
+
+    :param args: wheel files or names
+    :param tags: tags supported by the interpreter, most specific first, see Leni_interpreter_tags.
+        Incompatible wheels are dropped. Defaults to keeping all wheels regardless of their tags
+    :param keep_incompatible: keep wheels incompatible with <tags>, ranked below all compatible wheels,
+        e.g. to install wheels for other platforms. Defaults to False
+    :param pins: dict mapping projects to version specifiers, see Leni_read_pins. Wheels of pinned projects
+        not matching their specifier are dropped
+    :return: selected wheels in the order they were given, and the dropped wheels with the reason
+    """
+    tags = kwargs.get('tags')
+    priority = {tag: number for number, tag in reversed(list(enumerate(tags)))} if tags is not None else None
+    keep_incompatible = kwargs.get('keep_incompatible', False)
+    pins = {Leni_wheel_normalize_name(project): specifier for project, specifier in (kwargs.get('pins') or {}).items()}
+
+    # best wheels of each project, more than one only without tags, if they differ in their tags
+    best = {}
+    dropped = {}
+    # the same archive member may be given more than once, e.g. from two archives, it is judged once
+    wheels = list(dict.fromkeys(str(wheel) for wheel in args))
+    for wheel in wheels:
+        try:
+            wheel_name = Leni_wheel_parse_filename(wheel)
+        except ValueError:
+            # not ours to judge, pip will tell
+            best[wheel] = [(None, wheel)]
+            continue
+        if priority is not None and not keep_incompatible and Leni_wheel_tags(wheel).isdisjoint(priority):
+            dropped[wheel] = 'incompatible'
+            continue
+        specifier = pins.get(wheel_name.project)
+        if specifier and not _matches_specifier(wheel_name.version, specifier):
+            dropped[wheel] = 'pinned to {}'.format(specifier)
+            continue
+
+        key = _rank(wheel_name, priority)
+        current = best.get(wheel_name.project, [])
+        if current and key == current[0][0] and priority is None and all(
+                Leni_wheel_tags(wheel) != Leni_wheel_tags(other) for _key, other in current):
+            # e.g. the same release for Linux and Windows, only pip knows which one fits
+            current.append((key, wheel))
+            continue
+        if current and key <= current[0][0]:
+            # the first of equally good wheels, e.g. copies of the same file, wins
+            dropped[wheel] = 'superseded by {}'.format(current[0][1])
+            continue
+        for _key, other in current:
+            dropped[other] = 'superseded by {}'.format(wheel)
+        best[wheel_name.project] = [(key, wheel)]
+
+    selected = set(wheel for group in best.values() for _key, wheel in group)
+    return Selection(selected=[wheel for wheel in wheels if wheel in selected], dropped=dropped)
+
+
+def _rank(wheel_name, priority: Optional[dict[str, int]]) -> tuple:
+    """
+    return a sort key for a wheel, better wheels are larger
+
+    Compatible wheels rank above all incompatible ones, then the version counts, then the tags.
+
+    :param wheel_name: parsed wheel file name
+    :param priority: dict mapping supported tags to their position, 0 being the most specific
+    """
+    compatible, tag_rank = True, 0
+    if priority is not None:
+        tag_rank = -min(priority.get(tag, len(priority)) for tag in Leni_wheel_tags(wheel_name.filename))
+        compatible = tag_rank > -len(priority)
+    build = re.match(r'(\d*)(.*)', wheel_name.build)
+    return compatible, Leni_wheel_version_key(wheel_name.version), tag_rank, int(build.group(1) or 0), build.group(2)
+
+
+def _matches_specifier(version: str, specifier: str) -> bool:
+    """
+    return whether a version matches a version specifier, see PEP 440
+
+    Without the packaging module (or pip), only exact pins (==) are understood.
+
+    :param version: version
+    :param specifier: version specifier, e.g. ">=2,<3"
+    """
+    specifier_class = _specifier_class()
+    if specifier_class is not None:
+        try:
+            return specifier_class(specifier).contains(version, prereleases=True)
+        except ValueError:
+            pass
+    pinned = [part[2:] for part in specifier.split(',') if part.startswith('==')]
+    return all(Leni_wheel_version_key(version) == Leni_wheel_version_key(pin) for pin in pinned)
+
+
+@functools.lru_cache(maxsize=None)
+def _specifier_class():
+    """ return packaging's SpecifierSet class, imported on first use as importing it is slow, or None """
+    try:
+        from packaging.specifiers import SpecifierSet
+    except (ModuleNotFoundError, ImportError):
+        try:
+            from pip._vendor.packaging.specifiers import SpecifierSet
+        except (ModuleNotFoundError, ImportError):
+            return None
+    return SpecifierSet
@@ -1,7 +1,10 @@
 # <> with ❤ by @LeniMagEsVonHinten
 # Toggle Shelf Height between 1 or 2 rows
 
-from typing import Any
+from typing import Any, Iterable, NamedTuple, Optional, Union
+
+import os
+import time
 
 import maya.cmds as cmds
 import maya.mel as mel
@@ -10,11 +13,32 @@ __all__ = [
     'Leni_shelftools_get_shelf',
     'Leni_shelftools_toggle_height',
     'Leni_shelftools_height_in_pixel',
-    'Leni_shelftools_set_height'
+    'Leni_shelftools_set_height',
+    'Leni_shelftools_define_shelf',
+    'Leni_shelftools_build_shelf',
+    'Leni_shelftools_timings'
 ]
 
 SHELF_HEIGHT = 35
 
+# print how long defining and building each shelf takes, e.g. LENITOOLS_SHELF_TIMING=1 maya
+MEASURE = bool(os.environ.get('LENITOOLS_SHELF_TIMING'))
+
+_shelf_top_level = None
+_definitions = {}
+_built = set()
+_hooked = set()
+_timings = {}
+
+
+class ShelfButton(NamedTuple):
+    """ Definition of a shelf button, created when its shelf is first shown """
+    label: str
+    command: str
+    image: str = 'commandButton.png'
+    annotation: str = ''
+    source_type: str = 'python'
+
 
 def Leni_shelftools_get_shelf() -> Any:
     """
@@ -22,8 +46,71 @@ def Leni_shelftools_get_shelf() -> Any:
 
     :return: current shelf
     """
-    current_shelf = mel.eval("global string $gShelfTopLevel; $temp = $gShelfTopLevel;")
-    return cmds.tabLayout(current_shelf, q=True, st=True)
+    return cmds.tabLayout(_get_shelf_top_level(), q=True, st=True)
+
+
+def Leni_shelftools_define_shelf(name: str, buttons: Iterable[Union[ShelfButton, dict]], lazy: bool = True) -> str:
+    """
+    Add a shelf, whose buttons are only created when its tab is first shown
+
+    Only the empty shelf tab is created right away, which keeps Maya's startup fast for shelves
+    with hundreds of buttons. Buttons are described by ShelfButton or dicts with the same keys.
+
+    >>> Leni_shelftools_define_shelf('Rigging', [{'label': 'Lock', 'command': 'lenitools.Leni_rigginghelpers_lock()'}])
+    'Rigging'
+
+    :param name: shelf name
+    :param buttons: button definitions
+    :param lazy: False to create the buttons right away, e.g. to compare startup times, Defaults to True
+    :return: shelf layout
+    """
+    start = time.perf_counter()
+    top_level = _get_shelf_top_level()
+    _definitions[name] = [button if isinstance(button, ShelfButton) else ShelfButton(**button) for button in buttons]
+    _built.discard(name)
+    if not cmds.shelfLayout(name, exists=True):
+        cmds.setParent(top_level)
+        cmds.shelfLayout(name)
+    _install_tab_change_command(top_level)
+    _record(name, 'define', start)
+
+    if not lazy or cmds.tabLayout(top_level, q=True, st=True) == name:
+        Leni_shelftools_build_shelf(name)
+    return name
+
+
+def Leni_shelftools_build_shelf(name: str) -> bool:
+    """
+    Create the buttons of a shelf defined with Leni_shelftools_define_shelf, if not done yet
+
+    :param name: shelf name
+    :return: True, if the buttons were created now
+    """
+    if name not in _definitions or name in _built:
+        return False
+    start = time.perf_counter()
+    for child in cmds.shelfLayout(name, q=True, childArray=True) or []:
+        cmds.deleteUI(child)
+    for button in _definitions[name]:
+        cmds.shelfButton(
+            parent=name, label=button.label, command=button.command, image=button.image,
+            annotation=button.annotation or button.label, sourceType=button.source_type
+        )
+    _built.add(name)
+    _record(name, 'build', start)
+    return True
+
+
+def Leni_shelftools_timings() -> dict:
+    """
+    return how long defining and building each shelf took
+
+    >>> Leni_shelftools_timings()
+    {'Rigging': {'buttons': 250, 'define': 0.0004, 'build': 0.21}}
+
+    :return: dict mapping each shelf to its number of buttons and the durations in seconds
+    """
+    return {name: dict(timings, buttons=len(_definitions.get(name, []))) for name, timings in _timings.items()}
 
 
 def Leni_shelftools_toggle_height() -> None:
@@ -67,3 +154,51 @@ def Leni_shelftools_set_height(height:int = SHELF_HEIGHT) -> None:
     """
     current_shelf = Leni_shelftools_get_shelf()
     cmds.layout(current_shelf, edit=True, height=height)
+
+
+def _get_shelf_top_level() -> str:
+    """ return the tab layout holding the shelves, $gShelfTopLevel is only evaluated once """
+    global _shelf_top_level
+    if _shelf_top_level is None or not cmds.tabLayout(_shelf_top_level, exists=True):
+        _shelf_top_level = mel.eval("global string $gShelfTopLevel; $temp = $gShelfTopLevel;")
+    return _shelf_top_level
+
+
+def _install_tab_change_command(top_level: str) -> None:
+    """
+    Build shelves when their tab is shown, Maya's own change command still runs
+
+    :param top_level: tab layout holding the shelves
+    """
+    if top_level in _hooked:
+        return
+    change_command = cmds.tabLayout(top_level, q=True, changeCommand=True)
+    cmds.tabLayout(top_level, edit=True, changeCommand=lambda *args: _on_tab_change(change_command))
+    _hooked.add(top_level)
+
+
+def _on_tab_change(change_command: Optional[Any] = None) -> None:
+    """
+    Build the shown shelf, then run the previous change command
+
+    :param change_command: previous change command, MEL string or python callable
+    """
+    Leni_shelftools_build_shelf(Leni_shelftools_get_shelf())
+    if callable(change_command):
+        change_command()
+    elif change_command:
+        mel.eval(change_command)
+
+
+def _record(name: str, phase: str, start: float) -> None:
+    """
+    remember the duration of a phase
+
+    :param name: shelf name
+    :param phase: define or build
+    :param start: start time, from time.perf_counter
+    """
+    duration = time.perf_counter() - start
+    _timings.setdefault(name, {'define': None, 'build': None})[phase] = duration
+    if MEASURE:
+        print('Shelf {}: {} took {:.1f} ms'.format(name, phase, duration * 1000))
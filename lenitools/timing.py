@@ -0,0 +1,161 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Time phases of long running tasks, e.g. an installation """
+
+from pathlib import Path
+from typing import Optional
+
+import json
+import os
+import threading
+import time
+
+__all__ = ['Leni_timing_enable', 'Leni_timing_span', 'Leni_timing_add', 'Leni_timing_report', 'Leni_timing_write']
+
+_enabled = False
+_started = 0.0
+_spans = []
+_spans_lock = threading.Lock()
+_local = threading.local()
+
+
+def Leni_timing_enable(enabled: bool = True) -> None:
+    """
+    Start or stop recording spans, starting discards spans recorded before
+
+    :param enabled: True to record spans
+    """
+    global _enabled, _started
+    with _spans_lock:
+        if enabled and not _enabled:
+            _spans.clear()
+            _started = time.perf_counter()
+        _enabled = enabled
+
+
+def Leni_timing_span(name: str, **kwargs) -> 'Span':
+    """
+    return a span, which records the wall time of a with block and counters like files or bytes written
+
+    While recording is off, a shared span doing nothing is returned, so spans can stay in hot code.
+    Use span.enabled to skip work, that is only needed for counters.
+
+    >>> with Leni_timing_span('extract', archive='wheels.tar.gz') as span:
+    ...     span.add(files=3, bytes_read=os.path.getsize('wheels.tar.gz'))
+
+    :param name: name of the phase
+    :param kwargs: attributes of the span, e.g. the file it works on
+    :return: span
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, kwargs)
+
+
+def Leni_timing_add(**kwargs) -> None:
+    """
+    Add to the counters of the innermost open span of this thread, e.g. from helper functions
+
+    :param kwargs: counters, e.g. bytes_written=1024
+    """
+    if _enabled and getattr(_local, 'stack', None):
+        _local.stack[-1].add(**kwargs)
+
+
+def Leni_timing_report() -> dict:
+    """
+    return the recorded spans and their totals by name
+
+    :return: dict with the total wall time, the spans in order of their start and totals for each name
+    """
+    with _spans_lock:
+        spans = sorted(_spans, key=lambda s: s['start'])
+    phases = {}
+    for span in spans:
+        phase = phases.setdefault(span['name'], {'count': 0, 'seconds': 0.0})
+        phase['count'] += 1
+        phase['seconds'] += span['seconds']
+        for counter, value in span['counters'].items():
+            phase[counter] = phase.get(counter, 0) + value
+    return {
+        'pid': os.getpid(),
+        'seconds': time.perf_counter() - _started if _enabled else None,
+        'phases': phases,
+        'spans': spans,
+    }
+
+
+def Leni_timing_write(filepath) -> dict:
+    """
+    Write the report of the recorded spans as JSON file
+
+    :param filepath: filepath of the report
+    :return: report
+    """
+    report = Leni_timing_report()
+    with open(Path(filepath).expanduser(), 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+class Span:
+    """ Recording span, see Leni_timing_span """
+
+    __slots__ = ('name', 'attributes', 'counters', 'parent', 'start')
+    enabled = True
+
+    def __init__(self, name: str, attributes: Optional[dict] = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.counters = {}
+        self.parent = None
+        self.start = 0.0
+
+    def add(self, **kwargs) -> None:
+        """ add to counters, e.g. span.add(files=1, bytes_written=1024) """
+        for counter, value in kwargs.items():
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def __enter__(self) -> 'Span':
+        stack = _local.__dict__.setdefault('stack', [])
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        end = time.perf_counter()
+        _local.stack.pop()
+        record = {
+            'name': self.name,
+            'parent': self.parent,
+            'start': self.start - _started,
+            'seconds': end - self.start,
+            'thread': threading.current_thread().name,
+            'counters': self.counters,
+        }
+        if self.attributes:
+            record['attributes'] = {key: str(value) for key, value in self.attributes.items()}
+        if exc_info[0] is not None:
+            record['error'] = exc_info[0].__name__
+        with _spans_lock:
+            _spans.append(record)
+
+
+class _NullSpan:
+    """ Span doing nothing, used while recording is off """
+
+    __slots__ = ()
+    enabled = False
+
+    def add(self, **kwargs) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
@@ -0,0 +1,165 @@
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Parse python wheel file names and metadata """
+
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import email.message
+import email.parser
+import re
+import zipfile
+
+__all__ = [
+    'Leni_wheel_parse_filename',
+    'Leni_wheel_normalize_name',
+    'Leni_wheel_version_key',
+    'Leni_wheel_metadata',
+    'Leni_wheel_tags',
+    'Leni_wheel_is_compatible',
+]
+
+try:
+    from packaging.version import InvalidVersion, Version
+except (ModuleNotFoundError, ImportError):
+    try:
+        from pip._vendor.packaging.version import InvalidVersion, Version
+    except (ModuleNotFoundError, ImportError):
+        Version = None
+
+# {distribution}-{version}(-{build tag})?-{python tag}-{abi tag}-{platform tag}.whl, see PEP 427
+_WHEEL_FILENAME = re.compile(
+    r'^(?P<name>[^-]+)-(?P<version>[^-]+)(-(?P<build>\d[^-]*))?-(?P<python>[^-]+)-(?P<abi>[^-]+)-(?P<platform>[^-]+)\.whl$'
+)
+
+
+class WheelName(NamedTuple):
+    """ Components of a wheel file name """
+    name: str
+    version: str
+    build: str
+    python: str
+    abi: str
+    platform: str
+    filename: str
+
+    @property
+    def project(self) -> str:
+        """ normalized project name """
+        return Leni_wheel_normalize_name(self.name)
+
+
+def Leni_wheel_parse_filename(filename) -> WheelName:
+    """
+    Split the file name of a wheel into its components
+
+    >>> Leni_wheel_parse_filename('/wheels/Babel-2.11.0-py3-none-any.whl').version
+    '2.11.0'
+
+    :param filename: file name or path of a wheel
+    :raise ValueError: if filename is no valid wheel file name
+    :return: name, version, build tag, python tag, abi tag, platform tag and the file name itself
+    """
+    match = _WHEEL_FILENAME.match(Path(filename).name)
+    if not match:
+        raise ValueError('*** Not a wheel file name: {}'.format(filename))
+    return WheelName(
+        name=match.group('name'),
+        version=match.group('version').replace('_', '-'),
+        build=match.group('build') or '',
+        python=match.group('python'),
+        abi=match.group('abi'),
+        platform=match.group('platform'),
+        filename=str(filename)
+    )
+
+
+def Leni_wheel_normalize_name(name: str) -> str:
+    """
+    Normalize a project name as described in PEP 503
+
+    >>> Leni_wheel_normalize_name('Foo_Bar.baz')
+    'foo-bar-baz'
+
+    :param name: project name
+    :return: normalized project name
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def Leni_wheel_version_key(version: Optional[str]):
+    """
+    return a sort key for a version string
+
+    Versions are compared as described in PEP 440, if the packaging module (or pip) is available.
+    Otherwise, a simple numeric comparison is used.
+
+    :param version: version string
+    :return: sortable and comparable key
+    """
+    version = (version or '').strip()
+    if Version is not None:
+        try:
+            return 1, Version(version)
+        except InvalidVersion:
+            pass
+    return 0, tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in re.split(r'[.+!-]', version.lower()))
+
+
+def Leni_wheel_metadata(wheel) -> email.message.Message:
+    """
+    Read the METADATA of a wheel, without extracting it
+
+    Only the central directory of the wheel and the METADATA file itself are read.
+
+    >>> Leni_wheel_metadata('six-1.16.0-py2.py3-none-any.whl')['Version']
+    '1.16.0'
+
+    :param wheel: filepath to wheel
+    :raise ValueError: if the wheel contains no METADATA
+    :return: metadata as email message, e.g. metadata.get_all('Requires-Dist')
+    """
+    with zipfile.ZipFile(wheel) as archive:
+        for name in archive.namelist():
+            if name.count('/') == 1 and name.endswith('.dist-info/METADATA'):
+                return email.parser.Parser().parsestr(archive.read(name).decode('utf-8'), headersonly=True)
+    raise ValueError('*** No METADATA in wheel: {}'.format(wheel))
+
+
+def Leni_wheel_tags(filename) -> frozenset[str]:
+    """
+    return the tags of a wheel, with compressed tag sets expanded, see PEP 425
+
+    >>> sorted(Leni_wheel_tags('six-1.16.0-py2.py3-none-any.whl'))
+    ['py2-none-any', 'py3-none-any']
+
+    :param filename: file name or path of a wheel
+    :raise ValueError: if filename is no valid wheel file name
+    :return: set of tags like 'cp310-cp310-win_amd64'
+    """
+    wheel_name = Leni_wheel_parse_filename(filename)
+    return frozenset(
+        '{}-{}-{}'.format(python, abi, platform)
+        for python in wheel_name.python.split('.')
+        for abi in wheel_name.abi.split('.')
+        for platform in wheel_name.platform.split('.')
+    )
+
+
+def Leni_wheel_is_compatible(filename, supported: Iterable[str]) -> bool:
+    """
+    return whether an interpreter supporting <supported> tags can install a wheel
+
+    >>> Leni_wheel_is_compatible('numpy-1.26.4-cp310-cp310-win_amd64.whl', ['cp310-cp310-manylinux_2_17_x86_64'])
+    False
+
+    :param filename: file name or path of a wheel
+    :param supported: tags supported by the interpreter, see lenitools.interpreter.Leni_interpreter_tags
+    :return: True, if any tag of the wheel is supported. False for invalid wheel file names.
+    """
+    if not isinstance(supported, (set, frozenset)):
+        supported = frozenset(supported)
+    try:
+        return not Leni_wheel_tags(filename).isdisjoint(supported)
+    except ValueError:
+        return False
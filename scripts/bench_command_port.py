@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Load test a Maya command port, or a local fake of it, and report throughput and latency as JSON """
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import sys
+import json
+import math
+import time
+import socket
+import asyncio
+import argparse
+import threading
+
+sys.path[:0] = [str(Path(__file__).absolute().parent.parent)]
+
+from lenitools.commandport import (
+    DEFAULT_BATCH_SIZE, RESPONSE_TERMINATOR, AsyncCommandPortClient, CommandPortClient, CommandPortPool,
+    CommandPortStandIn, _encode
+)
+
+STRATEGIES = ('connect', 'persistent', 'pool', 'async')
+
+
+def fake_server(latency: float = 0.0, serial: bool = True) -> CommandPortStandIn:
+    """
+    return a started fake command port
+
+    :param latency: seconds each command takes
+    :param serial: run one command at a time, like Maya does on its main thread
+    """
+    lock = threading.Lock() if serial else None
+
+    def handler(command):
+        if lock is None:
+            time.sleep(latency)
+            return command
+        with lock:
+            time.sleep(latency)
+        return command
+
+    server = CommandPortStandIn(handler=handler)
+    server.start()
+    return server
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    return the nearest-rank percentile of values
+
+    :param values: sorted values
+    :param percent: percentile, 0 to 100
+    """
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def client_connect(address, commands: list[str], batch_size: int, latencies: list[float], **kwargs) -> None:
+    """ open a new connection for every command, like the original test_command_port.py """
+    for command in commands:
+        start = time.perf_counter()
+        with socket.create_connection(address) as client:
+            client.sendall(_encode(command))
+            response = b''
+            while RESPONSE_TERMINATOR not in response:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+        latencies.append(time.perf_counter() - start)
+
+
+def client_persistent(address, commands: list[str], batch_size: int, latencies: list[float], **kwargs) -> None:
+    """ one persistent connection per client, <batch_size> commands per round trip """
+    with CommandPortClient(*address) as client:
+        _send_batches(client, commands, batch_size, latencies)
+
+
+def client_pool(address, commands: list[str], batch_size: int, latencies: list[float], **kwargs) -> None:
+    """ all clients share a pool of connections """
+    _send_batches(kwargs['pool'], commands, batch_size, latencies)
+
+
+def _send_batches(client, commands: list[str], batch_size: int, latencies: list[float]) -> None:
+    """ send batches of commands, every command of a batch takes the time of the whole round trip """
+    for offset in range(0, len(commands), batch_size):
+        batch = commands[offset:offset + batch_size]
+        start = time.perf_counter()
+        client.send_many(batch, batch_size=batch_size)
+        latencies.extend([time.perf_counter() - start] * len(batch))
+
+
+async def client_async(address, commands: list[str], batch_size: int, latencies: list[float]) -> None:
+    """ one pipelined asyncio connection per client, <batch_size> commands in flight """
+    async with AsyncCommandPortClient(*address) as client:
+        for offset in range(0, len(commands), batch_size):
+            batch = commands[offset:offset + batch_size]
+            start = time.perf_counter()
+            await client.send_many(batch)
+            latencies.extend([time.perf_counter() - start] * len(batch))
+
+
+def run_benchmark(address, strategy: str, clients: int, count: int, batch_size: int, command: str) -> dict:
+    """
+    Drive a command port with concurrent clients
+
+    :param address: host and port of the command port
+    :param strategy: connection strategy, one of STRATEGIES
+    :param clients: number of concurrent clients
+    :param count: number of commands per client
+    :param batch_size: number of commands per round trip
+    :param command: command to send
+    :return: benchmark result
+    """
+    if strategy == 'connect':
+        batch_size = 1
+    latencies = [[] for _client in range(clients)]
+    commands = [command] * count
+    start = time.perf_counter()
+    if strategy == 'async':
+        async def main():
+            await asyncio.gather(*[client_async(address, commands, batch_size, latencies[number])
+                                   for number in range(clients)])
+        asyncio.run(main())
+    else:
+        function = {'connect': client_connect, 'persistent': client_persistent, 'pool': client_pool}[strategy]
+        with CommandPortPool(*address, size=max(1, clients // 2)) as pool, ThreadPoolExecutor(clients) as executor:
+            futures = [executor.submit(function, address, commands, batch_size, latencies[number], pool=pool)
+                       for number in range(clients)]
+            for future in futures:
+                future.result()
+    seconds = time.perf_counter() - start
+
+    values = sorted(value for client_latencies in latencies for value in client_latencies)
+    return {
+        'strategy': strategy,
+        'clients': clients,
+        'commands': len(values),
+        'batch_size': batch_size,
+        'seconds': round(seconds, 6),
+        'throughput': round(len(values) / seconds, 2) if seconds else None,
+        'latency_ms': {
+            'p50': round(percentile(values, 50) * 1000, 3),
+            'p95': round(percentile(values, 95) * 1000, 3),
+            'p99': round(percentile(values, 99) * 1000, 3),
+            'max': round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    """ main function """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', help='Command port host, needs --port')
+    parser.add_argument('--port', type=int,
+                        help='Command port of a running Maya session. Without it, a local fake server is started.')
+    parser.add_argument('--strategy', default=','.join(STRATEGIES),
+                        help='Comma separated connection strategies: {}'.format(', '.join(STRATEGIES)))
+    parser.add_argument('-c', '--clients', type=int, default=4, help='Number of concurrent clients')
+    parser.add_argument('-n', '--commands', type=int, default=1000, help='Number of commands per client')
+    parser.add_argument('-b', '--batch-size', default=str(DEFAULT_BATCH_SIZE),
+                        help='Comma separated numbers of commands per round trip')
+    parser.add_argument('--latency', type=float, default=0.0, help='Milliseconds each command takes on the fake server')
+    parser.add_argument('--parallel-server', action='store_true',
+                        help='Let the fake server run commands of different connections at the same time')
+    parser.add_argument('--command', default='polyCube()', help='Command to send')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    strategies = [strategy.strip() for strategy in args.strategy.split(',') if strategy.strip()]
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        parser.error('unknown strategy: {}'.format(', '.join(sorted(unknown))))
+    if args.host is not None and args.port is None:
+        parser.error('--host needs --port')
+
+    server = None
+    if args.port is None:
+        server = fake_server(args.latency / 1000, serial=not args.parallel_server)
+        address = server.server_address
+    else:
+        address = (args.host or '127.0.0.1', args.port)
+
+    try:
+        results = [
+            run_benchmark(address, strategy, args.clients, args.commands, int(batch_size), args.command)
+            for strategy in strategies
+            for batch_size in args.batch_size.split(',')
+            if strategy != 'connect' or batch_size == args.batch_size.split(',')[0]
+        ]
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = json.dumps({
+        'server': 'fake' if server is not None else '{}:{}'.format(*address),
+        'latency_ms': args.latency if server is not None else None,
+        'results': results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report + '\n')
+    print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
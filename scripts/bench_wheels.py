@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Benchmark listing, extraction, discovery and installation of wheels on synthetic wheelhouses """
+
+from pathlib import Path
+
+import io
+import os
+import sys
+import json
+import random
+import shutil
+import tarfile
+import zipfile
+import argparse
+import tempfile
+import statistics
+import time
+
+SCRIPTS_DIR = Path(__file__).absolute().parent
+sys.path[:0] = [str(SCRIPTS_DIR.parent), str(SCRIPTS_DIR)]
+
+from lenitools.discover import Leni_discover_files
+from lenitools.filter import Leni_filter_tarmembersuffix
+from lenitools.install import Leni_extract_archive, Leni_install_wheel, Leni_list_archive
+
+import wheel as wheel_script
+
+FORMATS = {'tar': '', 'tar.gz': 'gz', 'tar.xz': 'xz'}
+
+# stands in for "python -m pip install", prints what pip prints after installing the wheels
+_STUB_PIP = '''#!{interpreter}
+import sys, os
+wheels = [os.path.basename(arg)[:-4].split('-')[:2] for arg in sys.argv if arg.endswith('.whl')]
+print('Successfully installed ' + ' '.join('-'.join(name) for name in wheels))
+'''
+
+
+def make_wheel(directory: Path, name: str, version: str, size: int, rng: random.Random) -> Path:
+    """
+    Write a pure python wheel with a payload of about <size> bytes
+
+    :param directory: target directory
+    :param name: project name
+    :param version: version
+    :param size: payload size in bytes, half of it compressible text
+    :param rng: random number generator
+    :return: filepath of the wheel
+    """
+    dist_info = '{}-{}.dist-info'.format(name, version)
+    payload = rng.randbytes(size // 2) + ('# {}\n'.format(name) * (size // (2 * (len(name) + 3)) + 1)).encode()
+    files = {
+        '{}/__init__.py'.format(name): b'VERSION = ' + repr(version).encode() + b'\n',
+        '{}/data.bin'.format(name): payload,
+        dist_info + '/METADATA': 'Metadata-Version: 2.1\nName: {}\nVersion: {}\n'.format(name, version).encode(),
+        dist_info + '/WHEEL': b'Wheel-Version: 1.0\nGenerator: bench\nRoot-Is-Purelib: true\nTag: py3-none-any\n',
+    }
+    record = ''.join('{},,\n'.format(filename) for filename in files) + dist_info + '/RECORD,,\n'
+    filepath = directory / '{}-{}-py3-none-any.whl'.format(name, version)
+    with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in files.items():
+            archive.writestr(filename, content)
+        archive.writestr(dist_info + '/RECORD', record)
+    return filepath
+
+
+def make_wheelhouse(root: Path, wheels: int = 50, size: int = 64 * 1024, depth: int = 3, seed: int = 0) -> dict:
+    """
+    Generate a synthetic wheelhouse
+
+    Wheels are bundled into a tar, tar.gz and tar.xz archive each, which also contain a few other files.
+    A nested directory tree holds loose wheels, the bundles and files, that must be ignored.
+
+    :param root: directory to generate the wheelhouse in
+    :param wheels: number of wheels
+    :param size: payload size of each wheel in bytes
+    :param depth: depth of the directory tree
+    :param seed: seed of the random payloads
+    :return: dict with the wheels, the bundles by format and the tree
+    """
+    rng = random.Random(seed)
+    wheel_dir = root / 'wheels'
+    wheel_dir.mkdir(parents=True)
+    wheel_files = [make_wheel(wheel_dir, 'bench_{:04d}'.format(number), '1.0.{}'.format(number), size, rng)
+                   for number in range(wheels)]
+
+    bundles = {}
+    for extension, compression in FORMATS.items():
+        bundles[extension] = root / 'bundle.{}'.format(extension)
+        with tarfile.open(bundles[extension], 'w:{}'.format(compression) if compression else 'w') as archive:
+            for number, wheel_file in enumerate(wheel_files):
+                archive.add(wheel_file, arcname='wheels/{}'.format(wheel_file.name))
+                if number % 10 == 0:
+                    readme = 'notes for {}\n'.format(wheel_file.name).encode()
+                    info = tarfile.TarInfo('docs/{}.txt'.format(wheel_file.stem))
+                    info.size = len(readme)
+                    archive.addfile(info, io.BytesIO(readme))
+
+    tree = root / 'tree'
+    directory = tree
+    for level in range(depth):
+        directory = directory / 'level{}'.format(level)
+        (directory / '.git').mkdir(parents=True)
+        (directory / 'notes.txt').write_text('not a wheel\n')
+        (directory / 'fake.whl').write_text('not a zip file\n')
+        for wheel_file in wheel_files[level::depth]:
+            shutil.copy(wheel_file, directory / wheel_file.name)
+        shutil.copy(bundles['tar.gz'], directory / 'bundle{}.tar.gz'.format(level))
+    return {'wheels': wheel_files, 'bundles': bundles, 'tree': tree}
+
+
+def stub_interpreter(directory: Path) -> Path:
+    """
+    Write an executable, that runs like "python -m pip install" without installing anything
+
+    :param directory: directory for the stub
+    :return: filepath of the stub
+    """
+    filepath = directory / 'stub-python'
+    filepath.write_text(_STUB_PIP.format(interpreter=sys.executable))
+    filepath.chmod(0o755)
+    return filepath
+
+
+def measure(function, repeat: int = 5, setup=None) -> dict:
+    """
+    Time a function
+
+    :param function: function to time, gets the return value of setup
+    :param repeat: number of runs
+    :param setup: function called before each run, not timed
+    :return: dict with median, min and max in seconds
+    """
+    times = []
+    for _run in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times), 'max': max(times), 'runs': repeat}
+
+
+def run_benchmarks(workdir: Path, wheels: int, size: int, depth: int, repeat: int) -> dict:
+    """
+    Generate a wheelhouse and run all benchmarks on it
+
+    :param workdir: scratch directory
+    :param wheels: number of wheels
+    :param size: payload size of each wheel in bytes
+    :param depth: depth of the directory tree
+    :param repeat: number of runs of each benchmark
+    :return: dict mapping each benchmark to its timings
+    """
+    house = make_wheelhouse(workdir / 'house', wheels=wheels, size=size, depth=depth)
+    scratch = workdir / 'scratch'
+    scratch.mkdir()
+
+    def fresh_directory():
+        return Path(tempfile.mkdtemp(dir=scratch))
+
+    results = {}
+    for extension, bundle in house['bundles'].items():
+        results['Leni_list_archive[{}] cold'.format(extension)] = measure(
+            lambda cache_dir: Leni_list_archive(str(bundle), cache_dir=cache_dir), repeat, setup=fresh_directory
+        )
+        warm_cache = fresh_directory()
+        Leni_list_archive(str(bundle), cache_dir=warm_cache)
+        results['Leni_list_archive[{}] warm'.format(extension)] = measure(
+            lambda _none: Leni_list_archive(str(bundle), cache_dir=warm_cache), repeat
+        )
+        results['Leni_extract_archive[{}]'.format(extension)] = measure(
+            lambda path: Leni_extract_archive(str(bundle), path=str(path)), repeat, setup=fresh_directory
+        )
+        results['Leni_filter_tarmembersuffix[{}]'.format(extension)] = measure(
+            lambda _none: list(Leni_filter_tarmembersuffix(str(bundle), '.whl')), repeat
+        )
+
+    results['Leni_discover_files'] = measure(
+        lambda _none: list(Leni_discover_files(house['tree'], recursive=True)), repeat
+    )
+
+    def extract_tree(_none):
+        files = Leni_discover_files(house['tree'], recursive=True)
+        wheel_script.extract_filelist_by_suffix(files, filter_func=lambda f: Path(f).suffix == '.whl')
+    results['wheel.py discover + extract'] = measure(extract_tree, repeat)
+
+    results['Leni_install_wheel native, local target'] = measure(
+        lambda target: Leni_install_wheel(*house['wheels'], native=True, fallback=False, target=str(target)),
+        repeat, setup=fresh_directory
+    )
+    interpreter = stub_interpreter(workdir)
+    results['wheel.py install_module, stub pip'] = measure(
+        lambda _none: wheel_script.install_module(*house['wheels'], interpreter=str(interpreter), reinstall=True,
+                                                  pip_options=[], jobs=4),
+        repeat
+    )
+    results['wheel.py install_batch, stub pip'] = measure(
+        lambda _none: wheel_script.install_batch(house['wheels'], str(interpreter), []), repeat
+    )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float = 0.001) -> list[str]:
+    """
+    return the benchmarks, whose median got slower than the baseline by more than <threshold>
+
+    :param results: current results
+    :param baseline: saved results
+    :param threshold: allowed slow down, e.g. 0.2 for 20 %
+    :param min_delta: slow downs below this many seconds are noise and never count
+    """
+    regressions = []
+    for name, timings in results.items():
+        saved = baseline.get(name)
+        if saved and timings['median'] > saved['median'] * (1 + threshold) \
+                and timings['median'] - saved['median'] > min_delta:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    """ main function """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--wheels', type=int, default=50, help='Number of wheels in the wheelhouse')
+    parser.add_argument('--size', type=int, default=64, help='Payload size of each wheel in kilobytes')
+    parser.add_argument('--depth', type=int, default=3, help='Depth of the directory tree')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each benchmark')
+    parser.add_argument('--workdir', help='Scratch directory, Defaults to a temporary directory')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Save the results as baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare the results with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slow down compared to the baseline, Defaults to 0.25 (25 %%)')
+    parser.add_argument('--min-delta', type=float, default=1.0,
+                        help='Slow downs below this many milliseconds are never regressions, Defaults to 1')
+    parser.add_argument('-o', '--output', metavar='FILE', help='Write the results as JSON to FILE')
+    args = parser.parse_args(argv)
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='lenitools-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    # extraction caches, indices and temporary directories stay in the scratch directory
+    os.environ['LENITOOLS_CACHE'] = str(workdir / 'cache')
+    (workdir / 'tmp').mkdir(exist_ok=True)
+    tempfile.tempdir = str(workdir / 'tmp')
+    try:
+        results = run_benchmarks(workdir, args.wheels, args.size * 1024, args.depth, args.repeat)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+    regressions = compare(results, baseline, args.threshold, args.min_delta / 1000)
+
+    for name, timings in results.items():
+        saved = baseline.get(name)
+        change = ' {:+6.1f} %'.format((timings['median'] / saved['median'] - 1) * 100) if saved else ''
+        print('{} {:<45} {:9.2f} ms{}'.format(
+            '❌' if name in regressions else '✅', name, timings['median'] * 1000, change
+        ))
+
+    report = {
+        'parameters': {'wheels': args.wheels, 'size_kb': args.size, 'depth': args.depth, 'repeat': args.repeat},
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    for filepath in (args.output, args.save_baseline):
+        if filepath:
+            with open(filepath, 'w', encoding='utf-8') as file:
+                json.dump(report, file, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,19 +3,27 @@
 
 """ Test command port connection to Maya """
 
-import socket
+from pathlib import Path
+
+import sys
+
+sys.path[:0] = [str(Path(__file__).absolute().parent.parent)]
+
+from lenitools.commandport import CommandPortClient, CommandPortStandIn
 
 
 def send_test_command(host='127.0.0.1', port=4344):
     """ send a test command to a Maya command port """
-    address = (host, port)
-    client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    client.connect(address)
     test_command = 'polyCube()'
-    client.send(test_command.encode())
-    client.close()
+    with CommandPortClient(host, port) as client:
+        response = client.send(test_command)
     print("Command: {}".format(test_command))
+    print("Response: {}".format(response))
 
 
 if __name__ == '__main__':
-    send_test_command()
+    if '--stand-in' in sys.argv:
+        with CommandPortStandIn(handler=lambda command: 'pCube1 polyCube1') as server:
+            send_test_command(*server.server_address)
+    else:
+        send_test_command()
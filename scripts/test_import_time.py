@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Test that lenitools and wheel.py start fast in a plain python, without importing Maya or PyMEL """
+
+from pathlib import Path
+
+import sys
+import json
+import time
+import subprocess
+
+SCRIPTS_DIR = Path(__file__).absolute().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+
+# modules, that must not be imported at start, they are slow or need Maya
+DEFERRED_MODULES = ['maya', 'maya.cmds', 'pymel', 'pymel.core', 'asyncio', 'concurrent.futures', 'packaging.markers']
+
+# import statement and the time it may take in milliseconds, on top of the start of python itself
+IMPORTS = {
+    'import lenitools': 50,
+    'import lenitools.install': 250,
+    'import wheel': 300,
+}
+
+_PROBE = '''
+import sys, json
+sys.argv = ['wheel.py']
+sys.path[:0] = [{root!r}, {scripts!r}]
+{statement}
+print(json.dumps(sorted(name for name in {deferred!r} if name in sys.modules)))
+'''
+
+
+def measure(statement: str, runs: int = 5) -> tuple[float, list[str]]:
+    """
+    Run an import statement in fresh interpreters
+
+    :param statement: import statement
+    :param runs: number of interpreters, the fastest run counts
+    :return: tuple with (milliseconds, deferred modules that were imported anyway)
+    """
+    code = _PROBE.format(root=str(ROOT_DIR), scripts=str(SCRIPTS_DIR), statement=statement, deferred=DEFERRED_MODULES)
+    best = None
+    imported = []
+    for _run in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        duration = (time.perf_counter() - start) * 1000
+        best = duration if best is None else min(best, duration)
+        imported = json.loads(process.stdout.splitlines()[-1])
+    return best, imported
+
+
+def test_import_time(scale: float = 1.0) -> int:
+    """
+    Compare import times with their budgets
+
+    :param scale: factor for all budgets, for slow machines
+    :return: number of failed imports
+    """
+    baseline, _imported = measure('pass')
+    failed = 0
+    for statement, budget in IMPORTS.items():
+        duration, imported = measure(statement)
+        duration -= baseline
+        ok = duration <= budget * scale and not imported
+        failed += not ok
+        print('{} {:<28} {:7.1f} ms (budget {:.0f} ms){}'.format(
+            '✅' if ok else '❌', statement, duration, budget * scale,
+            ', imported {}'.format(', '.join(imported)) if imported else ''
+        ))
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(1 if test_import_time(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0) else 0)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Test installing into several Maya versions at once, against fake Maya installations with a fake mayapy """
+
+from pathlib import Path
+
+import os
+import sys
+import random
+import shutil
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+SCRIPTS_DIR = Path(__file__).absolute().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+sys.path[:0] = [str(SCRIPTS_DIR)]
+
+from bench_wheels import make_wheel
+
+# fake Maya versions and the python version of their mayapy. 2025 and 2026 share the user site-packages.
+MAYA_VERSIONS = {'2023': '3.9.7', '2024': '3.10.8', '2025': '3.11.4', '2026': '3.11.9'}
+
+# a mayapy answering the questions of wheel.py, logging them, and pretending to run pip. Anything else runs
+# in the python running this test.
+_FAKE_MAYAPY = '''#!{python}
+import json, os, sys, time
+LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'log.txt')
+if sys.argv[1:2] == ['-c'] and 'sys_tags' in sys.argv[2]:
+    with open(LOG, 'a') as log:
+        log.write('probe\\n')
+    print(json.dumps({{'python_version': {python_version!r}, 'tags': {tags!r}}}))
+elif sys.argv[1:4] == ['-m', 'pip', 'install']:
+    wheels = [os.path.basename(arg) for arg in sys.argv[4:] if not arg.startswith('-')]
+    start = time.time()
+    time.sleep({pip_seconds!r})
+    with open(LOG, 'a') as log:
+        log.write('install {{}} {{}} {{}}\\n'.format(start, time.time(), ' '.join(wheels)))
+    print('Successfully installed ' + ' '.join('-'.join(wheel.split('-')[:2]) for wheel in wheels))
+else:
+    os.execv(sys.executable, [sys.executable] + sys.argv[1:])
+'''
+
+
+def make_maya(root: Path, version: str, python_version: str, pip_seconds: float) -> Path:
+    """
+    Write a fake Maya installation, <root>/maya<version>/bin/mayapy
+
+    :param root: directory containing the installations
+    :param version: Maya version
+    :param python_version: python version mayapy pretends to be
+    :param pip_seconds: seconds each pip call takes
+    :return: installation directory
+    """
+    location = root / 'maya{}'.format(version)
+    (location / 'bin').mkdir(parents=True)
+    abi = 'cp{}{}'.format(*python_version.split('.')[:2])
+    tags = ['{0}-{0}-linux_x86_64'.format(abi), '{}-abi3-linux_x86_64'.format(abi), '{}-none-any'.format(abi),
+            'py3-none-any']
+    mayapy = location / 'bin' / 'mayapy'
+    mayapy.write_text(_FAKE_MAYAPY.format(python=sys.executable, python_version=python_version, tags=tags,
+                                          pip_seconds=pip_seconds), encoding='utf-8')
+    mayapy.chmod(0o755)
+    return location
+
+
+def make_bundle(directory: Path) -> dict[str, set[str]]:
+    """
+    Write a tar.gz archive with a pure python wheel in two versions and a native wheel for each python version
+
+    :param directory: target directory
+    :return: the wheels each Maya version has to get, by Maya version
+    """
+    rng = random.Random(0)
+    wheel_dir = directory / 'wheels'
+    wheel_dir.mkdir(parents=True)
+    files = [make_wheel(wheel_dir, 'pure', version, 1024, rng) for version in ('0.9', '1.0')]
+    expected = {}
+    for maya_version, python_version in MAYA_VERSIONS.items():
+        abi = 'cp{}{}'.format(*python_version.split('.')[:2])
+        native = make_wheel(wheel_dir, 'native', '2.0', 1024, rng)
+        files.append(native.rename(wheel_dir / 'native-2.0-{0}-{0}-linux_x86_64.whl'.format(abi)))
+        expected[maya_version] = {'pure-1.0-py3-none-any.whl', files[-1].name}
+    with tarfile.open(directory / 'bundle.tar.gz', 'w:gz') as archive:
+        for file in files:
+            archive.add(file, arcname='wheels/{}'.format(file.name))
+    shutil.rmtree(wheel_dir)
+    return expected
+
+
+def read_log(location: Path) -> tuple[int, list[tuple[float, float, str]]]:
+    """
+    return how often a fake mayapy was asked for its tags, and its pip calls with start, end and wheel
+    """
+    try:
+        lines = (location / 'log.txt').read_text(encoding='utf-8').splitlines()
+    except FileNotFoundError:
+        return 0, []
+    installs = [line.split(' ', 3)[1:] for line in lines if line.startswith('install ')]
+    return lines.count('probe'), [(float(start), float(end), wheel) for start, end, wheel in installs]
+
+
+def run_wheel(workdir: Path, *args) -> subprocess.CompletedProcess:
+    """ run wheel.py against the fake installations """
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR), LENITOOLS_MAYA_ROOTS=str(workdir / 'autodesk'),
+               LENITOOLS_CACHE=str(workdir / 'cache'))
+    env.pop('MAYA_LOCATION', None)
+    return subprocess.run([sys.executable, str(SCRIPTS_DIR / 'wheel.py'), str(workdir / 'house')] + list(args),
+                          capture_output=True, text=True, env=env, timeout=300)
+
+
+def check(name: str, problems: list[str], process: subprocess.CompletedProcess = None) -> bool:
+    """ print the result of a scenario """
+    print('{} {}{}'.format('❌' if problems else '✅', name, ', {}'.format('; '.join(problems)) if problems else ''))
+    if problems and process is not None:
+        print(process.stdout + process.stderr)
+    return not problems
+
+
+def test_maya_installs(workdir: Path, pip_seconds: float = 0.5) -> int:
+    """
+    Run all scenarios
+
+    :param workdir: scratch directory
+    :param pip_seconds: seconds each fake pip call takes
+    :return: number of failed scenarios
+    """
+    locations = {version: make_maya(workdir / 'autodesk', version, python_version, pip_seconds)
+                 for version, python_version in MAYA_VERSIONS.items()}
+    (workdir / 'house').mkdir()
+    expected = make_bundle(workdir / 'house')
+    failed = 0
+
+    process = run_wheel(workdir, '--all-maya', '-y')
+    problems = [] if process.returncode == 0 else ['exit code {}'.format(process.returncode)]
+    logs = {version: read_log(location) for version, location in locations.items()}
+    for version, (probes, installs) in logs.items():
+        if probes != 1:
+            problems.append('Maya {} asked {} times'.format(version, probes))
+        if set(wheel for _start, _end, wheel in installs) != expected[version]:
+            problems.append('Maya {} got {}'.format(version, ', '.join(sorted(wheel for *_times, wheel in installs))))
+        if 'Maya {}'.format(version) not in process.stdout:
+            problems.append('Maya {} missing in the summary'.format(version))
+    spans = {version: (min(start for start, *_rest in installs), max(end for _start, end, _wheel in installs))
+             for version, (_probes, installs) in logs.items() if installs}
+    if len(spans) == len(MAYA_VERSIONS):
+        if not (spans['2023'][0] < spans['2024'][1] and spans['2024'][0] < spans['2023'][1]):
+            problems.append('Maya 2023 and 2024 did not install at the same time')
+        if spans['2025'][0] < spans['2026'][1] and spans['2026'][0] < spans['2025'][1]:
+            problems.append('Maya 2025 and 2026 installed into the same user site-packages at the same time')
+    failed += not check('install into {} Maya versions'.format(len(MAYA_VERSIONS)), problems, process)
+
+    process = run_wheel(workdir, '--maya', '2024', '-l')
+    problems = [] if process.returncode == 0 else ['exit code {}'.format(process.returncode)]
+    if any(read_log(location)[0] != 1 for location in locations.values()):
+        problems.append('mayapy was asked again, instead of using the cache')
+    if any(read_log(location)[1] != logs[version][1] for version, location in locations.items()):
+        problems.append('installed while listing')
+    if 'Maya 2024' not in process.stdout or 'Maya 2023' in process.stdout:
+        problems.append('the plan is not for Maya 2024 only')
+    failed += not check('list the plan of Maya 2024 from the cache', problems, process)
+
+    process = run_wheel(workdir, '--maya', '2022', '-l')
+    failed += not check('report a missing Maya version', [] if process.returncode == 1 else ['exit code {}'.format(
+        process.returncode)], process)
+    return failed
+
+
+def main(argv=None) -> int:
+    """ main function """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pip-seconds', type=float, default=0.5, help='Seconds each fake pip call takes')
+    parser.add_argument('--workdir', help='Scratch directory, Defaults to a temporary directory')
+    args = parser.parse_args(argv)
+
+    if os.name == 'nt':
+        print('❌ the fake mayapy needs a POSIX shebang, run this test on Linux or macOS')
+        return 1
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='lenitools-maya-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        return 1 if test_maya_installs(workdir, args.pip_seconds) else 0
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
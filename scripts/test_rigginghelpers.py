@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Test the rigging helpers against a stub of maya.cmds, without Maya """
+
+from pathlib import Path
+
+import sys
+import types
+import tempfile
+
+sys.path[:0] = [str(Path(__file__).absolute().parent.parent)]
+
+
+class StubCmds(types.ModuleType):
+    """
+    Stub of the maya.cmds functions used by lenitools.rigginghelpers
+
+    The scene is a dict of transform nodes by their full path, each with its locked and keyable channels.
+    Every setAttr is logged with the undo chunk it was made in.
+    """
+
+    def __init__(self):
+        super().__init__('maya.cmds')
+        self.reset({})
+
+    def reset(self, nodes: dict, selection=(), sets=None) -> None:
+        """
+        Set up a scene
+
+        :param nodes: dict mapping full paths to a tuple of locked and keyable channel names
+        :param selection: selected nodes
+        :param sets: dict mapping object sets to their members
+        """
+        self.nodes = {node: (set(locked), set(keyable)) for node, (locked, keyable) in nodes.items()}
+        self.selection = list(selection)
+        self.object_sets = dict(sets or {})
+        self.set_attr_calls = []
+        self.chunks = []
+        self._chunk = None
+
+    def ls(self, nodes=None, selection=False, type=None, long=False):
+        if selection:
+            return list(self.selection)
+        names = [nodes] if isinstance(nodes, str) else list(nodes or [])
+        return [self._full_path(name) for name in names if self._full_path(name) is not None]
+
+    def listAttr(self, node, locked=False, keyable=False):
+        locked_channels, keyable_channels = self.nodes[self._full_path(node)]
+        return sorted(locked_channels if locked else keyable_channels if keyable else set())
+
+    def listRelatives(self, nodes, allDescendents=False, type=None, fullPath=False):
+        roots = [self._full_path(node) for node in nodes]
+        return [node for node in self.nodes for root in roots if node.startswith(root + '|')]
+
+    def sets(self, object_set, query=False):
+        return list(self.object_sets[object_set])
+
+    def setAttr(self, plug, lock=None, keyable=None):
+        node, _separator, channel = plug.rpartition('.')
+        locked_channels, keyable_channels = self.nodes[self._full_path(node)]
+        for channels, value in ((locked_channels, lock), (keyable_channels, keyable)):
+            if value is True:
+                channels.add(channel)
+            elif value is False:
+                channels.discard(channel)
+        self.set_attr_calls.append((plug, self._chunk))
+
+    def undoInfo(self, openChunk=False, closeChunk=False, chunkName=''):
+        if openChunk:
+            self._chunk = chunkName
+            self.chunks.append(chunkName)
+        if closeChunk:
+            self._chunk = None
+
+    def state(self) -> dict:
+        """ return the locked and keyable channels of all nodes """
+        return {node: (set(locked), set(keyable)) for node, (locked, keyable) in self.nodes.items()}
+
+    def _full_path(self, name: str):
+        if name in self.nodes:
+            return name
+        return next((node for node in self.nodes if node.endswith('|' + name)), None)
+
+
+cmds = StubCmds()
+maya = types.ModuleType('maya')
+maya.cmds = cmds
+sys.modules.update({'maya': maya, 'maya.cmds': cmds})
+
+from lenitools.rigginghelpers import (
+    SNAPSHOT_CHANNELS, Leni_rigginghelpers_lock, Leni_rigginghelpers_restore, Leni_rigginghelpers_snapshot
+)
+
+# a small rig, root_jnt|spine_jnt|head_jnt, and a control, whose translate X is already locked
+RIG = {
+    '|root_jnt': (set(), set(SNAPSHOT_CHANNELS)),
+    '|root_jnt|spine_jnt': (set(), set(SNAPSHOT_CHANNELS)),
+    '|root_jnt|spine_jnt|head_jnt': (set(), set(SNAPSHOT_CHANNELS)),
+    '|head_ctrl': ({'translateX'}, set(SNAPSHOT_CHANNELS) - {'scaleX'}),
+}
+
+
+def check(name: str, problems: list[str]) -> bool:
+    """ print the result of a scenario """
+    print('{} {}{}'.format('❌' if problems else '✅', name, ', {}'.format('; '.join(problems)) if problems else ''))
+    return not problems
+
+
+def single_chunk(name: str) -> list[str]:
+    """ return problems, unless all setAttr calls were made in one undo chunk called <name> """
+    problems = []
+    if cmds.chunks != [name]:
+        problems.append('undo chunks: {}'.format(cmds.chunks))
+    if any(chunk != name for _plug, chunk in cmds.set_attr_calls):
+        problems.append('setAttr outside of the undo chunk')
+    return problems
+
+
+def test_lock() -> int:
+    """ run the scenarios of Leni_rigginghelpers_lock, return the number of failed scenarios """
+    failed = 0
+
+    cmds.reset(RIG, selection=['|head_ctrl', '|root_jnt'])
+    changes = Leni_rigginghelpers_lock('translate')
+    expected = ['|head_ctrl.translateY', '|head_ctrl.translateZ',
+                '|root_jnt.translateX', '|root_jnt.translateY', '|root_jnt.translateZ']
+    problems = single_chunk('Leni_rigginghelpers_lock')
+    if sorted(changes) != expected or sorted(plug for plug, _chunk in cmds.set_attr_calls) != expected:
+        problems.append('changed {}'.format(sorted(plug for plug, _chunk in cmds.set_attr_calls)))
+    failed += not check('lock only the plugs in another state, in one undo chunk', problems)
+
+    cmds.reset(RIG, selection=['|root_jnt'])
+    changes = Leni_rigginghelpers_lock('r', axis=['x', 'y'])
+    problems = [] if sorted(changes) == ['|root_jnt.rotateX', '|root_jnt.rotateY'] else ['changed {}'.format(changes)]
+    failed += not check('axis selects axes, not the nodes', problems)
+
+    cmds.reset(RIG, sets={'joints_set': ['root_jnt']})
+    changes = Leni_rigginghelpers_lock('s', axis=['Z'], sets=['joints_set'], hierarchy=True)
+    expected = ['{}.scaleZ'.format(node) for node in RIG if node.startswith('|root_jnt')]
+    failed += not check('lock the hierarchy of set members', [] if sorted(changes) == sorted(expected) else [
+        'changed {}'.format(changes)])
+
+    cmds.reset(RIG, selection=['|head_ctrl'])
+    changes = Leni_rigginghelpers_lock('t', axis=['x'])
+    failed += not check('nothing to change, no undo chunk', [] if not changes and not cmds.chunks else [
+        'changed {}, chunks {}'.format(changes, cmds.chunks)])
+
+    cmds.reset(RIG, selection=['|head_ctrl'])
+    changes = Leni_rigginghelpers_lock('t', lock=False)
+    problems = single_chunk('Leni_rigginghelpers_lock')
+    if changes != ['|head_ctrl.translateX'] or cmds.nodes['|head_ctrl'][0]:
+        problems.append('changed {}'.format(changes))
+    failed += not check('unlock', problems)
+    return failed
+
+
+def test_restore(workdir: Path) -> int:
+    """ run the scenarios of Leni_rigginghelpers_snapshot and Leni_rigginghelpers_restore """
+    failed = 0
+
+    cmds.reset(RIG)
+    filepath = workdir / 'rig_locks.json'
+    snapshot = Leni_rigginghelpers_snapshot('root_jnt', nodes=['head_ctrl'], hierarchy=True, filepath=str(filepath))
+    original = cmds.state()
+    Leni_rigginghelpers_lock(nodes=list(RIG))
+    cmds.setAttr('|head_ctrl.scaleX', keyable=True)
+    cmds.reset(cmds.state())
+    changes = Leni_rigginghelpers_restore(snapshot)
+    problems = single_chunk('Leni_rigginghelpers_restore')
+    if cmds.state() != original:
+        problems.append('state differs from the snapshot')
+    if len(cmds.set_attr_calls) != len(SNAPSHOT_CHANNELS) * len(RIG):
+        # every channel but translateX of head_ctrl was locked, and scaleX of head_ctrl became keyable
+        problems.append('{} setAttr calls'.format(len(cmds.set_attr_calls)))
+    if len(changes) != len(set(changes)):
+        problems.append('plugs reported twice')
+    failed += not check('restore only the plugs, that differ, in one undo chunk', problems)
+
+    cmds.reset(RIG)
+    Leni_rigginghelpers_lock(nodes=['root_jnt'], axis=['Y'])
+    del cmds.nodes['|root_jnt|spine_jnt|head_jnt']
+    cmds.reset(cmds.state())
+    changes = Leni_rigginghelpers_restore(filepath)
+    expected = ['|root_jnt.{}Y'.format(attribute) for attribute in ('translate', 'rotate', 'scale')]
+    failed += not check('restore from JSON, skip deleted nodes', [] if sorted(changes) == sorted(expected) else [
+        'changed {}'.format(changes)])
+
+    cmds.reset(RIG)
+    failed += not check('restore the unchanged rig, no undo chunk', [] if not Leni_rigginghelpers_restore(snapshot)
+                        and not cmds.chunks else ['chunks {}'.format(cmds.chunks)])
+
+    try:
+        Leni_rigginghelpers_restore(dict(snapshot, version=0))
+        problems = ['accepted an unknown snapshot version']
+    except ValueError:
+        problems = []
+    failed += not check('refuse unknown snapshot versions', problems)
+    return failed
+
+
+def main() -> int:
+    """ main function """
+    with tempfile.TemporaryDirectory(prefix='lenitools-rig-') as workdir:
+        return 1 if test_lock() + test_restore(Path(workdir)) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
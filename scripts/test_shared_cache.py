@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# <> with ❤ by @LeniMagEsVonHinten
+
+""" Test a shared extraction cache with many local processes standing in for render nodes on NFS """
+
+from pathlib import Path
+
+import os
+import sys
+import time
+import random
+import shutil
+import tarfile
+import argparse
+import tempfile
+import multiprocessing
+
+SCRIPTS_DIR = Path(__file__).absolute().parent
+sys.path[:0] = [str(SCRIPTS_DIR.parent), str(SCRIPTS_DIR)]
+
+import lenitools.archiveindex
+import lenitools.cache
+import lenitools.lockfile
+
+from bench_wheels import make_wheel
+
+
+def make_bundle(directory: Path, wheels: int = 20, size: int = 256 * 1024) -> tuple[Path, dict[str, bytes]]:
+    """
+    Write a tar.gz archive of synthetic wheels
+
+    :param directory: target directory
+    :param wheels: number of wheels
+    :param size: payload size of each wheel in bytes
+    :return: filepath of the archive and the content of each wheel by file name
+    """
+    rng = random.Random(0)
+    wheel_dir = directory / 'wheels'
+    wheel_dir.mkdir(parents=True)
+    files = [make_wheel(wheel_dir, 'shared_{:03d}'.format(number), '1.0', size, rng) for number in range(wheels)]
+    bundle = directory / 'bundle.tar.gz'
+    with tarfile.open(bundle, 'w:gz') as archive:
+        for file in files:
+            archive.add(file, arcname=file.name)
+    return bundle, {file.name: file.read_bytes() for file in files}
+
+
+def node(bundle: str, cache_dir: str, work_dir: str, host: str, barrier=None, crash: bool = False,
+         stale_after: float = None) -> None:
+    """
+    Run like wheel.py --shared-cache on one node: index, hash and extract the bundle
+
+    Each piece of real work leaves a marker file in <work_dir>, so the test can count them.
+
+    :param bundle: filepath to archive
+    :param cache_dir: shared cache directory
+    :param work_dir: directory for marker files
+    :param host: host name to pretend
+    :param barrier: barrier to start all nodes at once
+    :param crash: die while extracting, leaving the lock and a half extracted directory behind
+    :param stale_after: seconds after which locks of dead hosts are taken over
+    """
+    lenitools.lockfile._HOST = host
+    if stale_after is not None:
+        lenitools.lockfile.STALE_LOCK_AGE = stale_after
+
+    def counted(kind, function):
+        def wrapper(*args, **kwargs):
+            Path(work_dir, '{}-{}-{}'.format(kind, host, os.getpid())).touch()
+            if crash and kind == 'extract':
+                tempfile.mkdtemp(prefix='.tmp-{}-'.format(args[1].name), dir=args[1].parent)
+                os._exit(1)
+            return function(*args, **kwargs)
+        return wrapper
+
+    lenitools.archiveindex._scan = counted('scan', lenitools.archiveindex._scan)
+    lenitools.cache._hash_file = counted('hash', lenitools.cache._hash_file)
+    lenitools.cache._extract_entry = counted('extract', lenitools.cache._extract_entry)
+    if barrier is not None:
+        barrier.wait()
+
+    members = lenitools.archiveindex.Leni_archive_index(bundle, cache_dir=cache_dir, shared=True)
+    entry = lenitools.cache.Leni_cache_extract(bundle, cache_dir=cache_dir, shared=True)
+    Path(work_dir, 'result-{}-{}'.format(host, os.getpid())).write_text(
+        '{}\n{}'.format(entry, len(members)), encoding='utf-8'
+    )
+
+
+def run_nodes(nodes: int, bundle: Path, cache_dir: Path, work_dir: Path, prefix: str = 'node', **kwargs) -> float:
+    """
+    Run nodes in parallel processes, each pretending to be another host
+
+    :param nodes: number of processes
+    :param bundle: filepath to archive
+    :param cache_dir: shared cache directory
+    :param work_dir: directory for marker files
+    :param prefix: prefix of the host names
+    :param kwargs: keyword arguments passed to node
+    :return: seconds until all nodes finished
+    """
+    context = multiprocessing.get_context('spawn')
+    # the nodes and this process, which starts the clock when all nodes are ready
+    barrier = context.Barrier(nodes + 1)
+    processes = [
+        context.Process(target=node, kwargs=dict(kwargs, barrier=barrier, bundle=str(bundle), cache_dir=str(cache_dir),
+                                                 work_dir=str(work_dir), host='{}-{:03d}'.format(prefix, number)))
+        for number in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start
+
+
+def check(name: str, work_dir: Path, cache_dir: Path, wheels: dict[str, bytes], nodes: int, seconds: float,
+          crashed: bool = False) -> bool:
+    """
+    Check, that all nodes got the same complete cache entry, the work was done once and nothing was left behind
+
+    :param name: name of the scenario
+    :param work_dir: directory with the marker files
+    :param cache_dir: shared cache directory
+    :param wheels: expected content of each wheel by file name
+    :param nodes: number of nodes, that had to finish
+    :param seconds: wall time of the scenario
+    :param crashed: a node died while extracting, its private directory stays until the cache is evicted
+    :return: True, if all checks passed
+    """
+    markers = [file.name.split('-')[0] for file in work_dir.iterdir()]
+    results = [file.read_text(encoding='utf-8').split('\n') for file in work_dir.glob('result-*')]
+    entries = set(entry for entry, _members in results)
+    problems = []
+    if len(results) != nodes:
+        problems.append('{} of {} nodes finished'.format(len(results), nodes))
+    for kind in ('scan', 'hash', 'extract'):
+        if markers.count(kind) > 1:
+            problems.append('{} ran {} times'.format(kind, markers.count(kind)))
+    if len(entries) != 1:
+        problems.append('{} different cache entries'.format(len(entries)))
+    elif {file.name: file.read_bytes() for file in Path(entries.pop()).iterdir()} != wheels:
+        problems.append('cache entry differs from the wheels')
+    leftovers = [file.name for file in (cache_dir / 'extract').iterdir()
+                 if file.name.startswith('.') and not (crashed and file.name.startswith('.tmp-'))]
+    leftovers += [file.name for directory in ('digests', 'index') for file in (cache_dir / directory).glob('.lock-*')]
+    if leftovers:
+        problems.append('left behind: {}'.format(', '.join(sorted(leftovers))))
+    print('{} {:<40} {:6.2f} s{}'.format('❌' if problems else '✅', name, seconds,
+                                         ', {}'.format('; '.join(problems)) if problems else ''))
+    return not problems
+
+
+def test_shared_cache(workdir: Path, nodes: int = 16, stale_after: float = 2.0) -> int:
+    """
+    Run all scenarios
+
+    :param workdir: scratch directory, a local directory standing in for the NFS share
+    :param nodes: number of nodes
+    :param stale_after: seconds after which locks of dead hosts are taken over
+    :return: number of failed scenarios
+    """
+    bundle, wheels = make_bundle(workdir / 'house')
+    failed = 0
+    for scenario in ('concurrent', 'crash on this host', 'crash on another host'):
+        cache_dir = workdir / scenario.replace(' ', '_') / 'cache'
+        work_dir = cache_dir.parent / 'markers'
+        work_dir.mkdir(parents=True)
+        crashed = scenario != 'concurrent'
+        if crashed:
+            # the first node dies while extracting and leaves its lock behind. node-000 takes over a lock of
+            # node-000 at once, as the process is gone, a lock of another host only after <stale_after>.
+            run_nodes(1, bundle, cache_dir, work_dir, prefix='node' if scenario == 'crash on this host' else 'dead',
+                      crash=True, stale_after=stale_after)
+            if not list((cache_dir / 'extract').glob('.lock-*')):
+                print('❌ {}: the crashed node left no lock behind'.format(scenario))
+                failed += 1
+                continue
+            for marker in work_dir.iterdir():
+                marker.unlink()
+        seconds = run_nodes(nodes, bundle, cache_dir, work_dir, stale_after=stale_after)
+        failed += not check('{} ({} nodes)'.format(scenario, nodes), work_dir, cache_dir, wheels, nodes, seconds,
+                            crashed=crashed)
+    return failed
+
+
+def main(argv=None) -> int:
+    """ main function """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--nodes', type=int, default=16, help='Number of processes standing in for nodes')
+    parser.add_argument('--stale-after', type=float, default=2.0,
+                        help='Seconds after which locks of dead hosts are taken over, Defaults to 2')
+    parser.add_argument('--workdir', help='Scratch directory, Defaults to a temporary directory')
+    args = parser.parse_args(argv)
+
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='lenitools-shared-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        return 1 if test_shared_cache(workdir, args.nodes, args.stale_after) else 0
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,62 +5,209 @@
 
 import os
 import sys
+import shlex
+import shutil
+import functools
+import importlib.util
 import tarfile
 import tempfile
 import subprocess
 import platform
+import time
 
 from argparse import ArgumentParser
 from pathlib import Path
 
-try:
-    import maya.cmds as cmds
+if importlib.util.find_spec('lenitools') is None and '__file__' in globals():
+    # run from a checkout, e.g. to install the wheels of lenitools itself
+    sys.path.insert(0, str(Path(__file__).absolute().parent.parent))
+
+from lenitools.archive import Leni_archive_format
+from lenitools.archiveindex import Leni_archive_extract_members
+from lenitools.cache import Leni_cache_extract
+from lenitools.discover import DEFAULT_IGNORE, Leni_discover_files
+from lenitools.i18n import Leni_i18n_lazy as _
+from lenitools.install import (
+    Leni_install_plan, Leni_install_wheel, Leni_installed_distributions, Leni_iter_archive_members
+)
+from lenitools.schedule import Leni_schedule_waves
+from lenitools.selection import Leni_read_pins, Leni_select_wheels
+from lenitools.timing import Leni_timing_enable, Leni_timing_span, Leni_timing_write
+from lenitools.interpreter import Leni_interpreter_info, Leni_interpreter_tags
+from lenitools.mayainstall import Leni_maya_install, Leni_maya_installs
+from lenitools.wheelfile import Leni_wheel_is_compatible, Leni_wheel_normalize_name, Leni_wheel_parse_filename
+
+
+def find_module(name: str) -> bool:
+    """
+    return whether a module can be imported, without importing it. Parent packages of <name> are imported.
 
-    is_maya = True
-except (ModuleNotFoundError, ImportError):
-    is_maya = False
+    :param name: module name, e.g. maya.cmds
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ModuleNotFoundError, ImportError, ValueError):
+        return False
 
-try:
-    import pymel.core as pm
 
-    pymel_supported = True
-except (ModuleNotFoundError, ImportError):
-    pymel_supported = False
+# only look for Maya and PyMEL, importing pymel.core takes seconds.
+# asyncio and concurrent.futures are imported where they are needed, to keep the start fast.
+# Other packages called maya, e.g. the date library on PyPI, have no maya.cmds and no $MAYA_LOCATION.
+is_maya = bool(os.environ.get('MAYA_LOCATION')) and find_module('maya.cmds')
+pymel_supported = find_module('pymel')
 
 DEFAULT_VERBOSE_LEVEL = 2
 
 
+def extract_archive(file, suffix: str = '.whl', tags=None, names=None, cache_dir=None) -> str:
+    """
+    Extract all members of a tar archive with a given suffix into a new temporary directory
+
+    The index of the archive, built while listing it, is used to skip the other members, see
+    lenitools.archiveindex.Leni_archive_extract_members.
+
+    :param file: path to tar archive
+    :param suffix: suffix of the members to extract
+    :param tags: only extract wheels compatible with these tags, see lenitools.interpreter.Leni_interpreter_tags
+    :param names: only extract members with these file names, e.g. the wheels chosen by Leni_select_wheels
+    :param cache_dir: cache directory holding the index, see lenitools.cache.Leni_cache_directory
+
+    :return: temporary directory containing the extracted files
+    """
+    target_directory = tempfile.mkdtemp()
+    Leni_archive_extract_members(file, lambda name: os.path.splitext(name)[1] == suffix and (
+        tags is None or Leni_wheel_is_compatible(name, tags)
+    ) and (names is None or Path(name).name in names), path=target_directory, cache_dir=cache_dir)
+    return target_directory
+
+
+def extract_cached(file, **kwargs) -> str:
+    """
+    Extract an archive through the extraction cache and link its wheels into a new temporary directory
+
+    pip gets the linked (or copied) files, so other processes may evict the cache entry while they are installed.
+
+    :param file: path to tar archive
+    :param kwargs: keyword arguments passed to Leni_cache_extract
+
+    :return: temporary directory containing the extracted files
+    """
+    entry = Leni_cache_extract(file, **kwargs)
+    target_directory = tempfile.mkdtemp()
+    for wheel in entry.rglob('*'):
+        if wheel.is_dir():
+            continue
+        target = Path(target_directory) / wheel.relative_to(entry)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(wheel, target)
+        except OSError:
+            shutil.copy2(wheel, target)
+    return target_directory
+
+
 def extract_filelist_by_suffix(filelist, filter_func=lambda f: Path(f).suffix == '.txt', results=None, **kwargs):
-    results = results or []
-    for file in filelist:
-        if Path(file).is_file() and filter_func(Path(file).suffix):
-            filename = file.resolve().absolute()
-            results.append(filename)
-            # T: #CMD
-            print_verbose(_('Add {file}').format(file=filename), min_level=2, verbose=kwargs.get('verbosity', 0))
-        if tarfile.is_tarfile(file):
-            # T: #CMD
-            print_verbose(_('Analyse {file}').format(file=file), min_level=3, verbose=kwargs.get('verbosity', 0))
-            target_directory = tempfile.mkdtemp()
+    """
+    Collect files matching <filter_func> and extract python wheels from tar archives
+
+    :param filelist: files and tar archives to scan
+    :param filter_func: function returning True for each file to collect
+    :param results: list to append the collected files to
+    :param kwargs: keyword arguments
 
-            with tarfile.open(file) as archive:
-                members = [m for m in filter(lambda x: filter_func(x.name), archive.getmembers())]
-                archive.extractall(path=target_directory, members=[m for m in filter_member_by_suffix(members, '.whl')])
-            results.extend(extract_filelist_by_suffix([x for x in Path(target_directory).iterdir()], filter_func, results, **kwargs))
+    keyword arguments:
+        verbosity: verbosity level
+        jobs: number of worker processes to extract archives with, 0 uses one per CPU, defaults to 1.
+            Worker processes need a python interpreter, so this is not supported inside of Maya's GUI.
+        cache: reuse wheels extracted by earlier runs, defaults to False
+        cache_dir: cache directory, see lenitools.cache.Leni_cache_directory
+        cache_size: size limit of the cache in bytes
+        shared: the cache is shared by many hosts, see lenitools.cache.Leni_cache_extract
+        tags: only extract wheels compatible with these tags, see lenitools.interpreter.Leni_interpreter_tags
+        names: only extract wheels with these file names, e.g. the wheels chosen by Leni_select_wheels.
+            Cached archives are extracted completely, <filter_func> has to skip the other wheels.
+
+    :return: list of collected files, in the order of <filelist>
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = results if results is not None else []
+    verbosity = kwargs.get('verbosity', 0)
+    jobs = kwargs.get('jobs', 1) or os.cpu_count() or 1
+    tags = frozenset(kwargs['tags']) if kwargs.get('tags') is not None else None
+    names = frozenset(kwargs['names']) if kwargs.get('names') is not None else None
+    extract_func = functools.partial(extract_archive, tags=tags, names=names, cache_dir=kwargs.get('cache_dir'))
+    if kwargs.get('cache', False):
+        extract_func = functools.partial(
+            extract_cached, suffix='.whl', cache_dir=kwargs.get('cache_dir'), max_size=kwargs.get('cache_size'),
+            tags=tags, shared=kwargs.get('shared', False)
+        )
+
+    # <filelist> may be a generator still scanning directories, so archives are submitted as soon as they show up
+    executor = None
+    collected = []
+    try:
+        for file in filelist:
+            if Path(file).is_file() and filter_func(file):
+                filename = Path(file).resolve().absolute()
+                collected.append([filename])
+                # T: #CMD
+                print_verbose(_('Add {file}').format(file=filename), min_level=2, verbose=verbosity)
+            elif Leni_archive_format(file) is not None:
+                # T: #CMD
+                print_verbose(_('Analyse {file}').format(file=file), min_level=3, verbose=verbosity)
+                if jobs <= 1:
+                    with Leni_timing_span('extract_archive', archive=file) as span:
+                        collected.append(extract_func(file))
+                        count_extracted(span, file, collected[-1])
+                    continue
+                executor = executor or ProcessPoolExecutor(max_workers=jobs)
+                collected.append((file, executor.submit(extract_func, file)))
+
+        for item in collected:
+            if isinstance(item, list):
+                results.extend(item)
+                continue
+            if isinstance(item, tuple):
+                file, future = item
+                # time spent waiting for the worker process
+                with Leni_timing_span('extract_archive', archive=file, jobs=jobs) as span:
+                    item = future.result()
+                    count_extracted(span, file, item)
+            # members keep their directories inside of the archive
+            extract_filelist_by_suffix(sorted(f for f in Path(item).rglob('*') if f.is_file()), filter_func, results, **kwargs)
+    finally:
+        if executor is not None:
+            executor.shutdown()
     return results
 
 
-def filter_member_by_suffix(members: list[tarfile.TarInfo], suffix: str = '.txt') -> tarfile.TarInfo:
+def count_extracted(span, archive, directory) -> None:
+    """
+    Add the size of an archive and the number and size of the files extracted from it to a timing span
+
+    :param span: span, see lenitools.timing.Leni_timing_span
+    :param archive: filepath to archive
+    :param directory: directory containing the extracted files
+    """
+    if not span.enabled:
+        return
+    sizes = [file.stat().st_size for file in Path(directory).rglob('*') if file.is_file()]
+    span.add(files=len(sizes), bytes_read=os.path.getsize(archive), bytes_written=sum(sizes))
+
+
+def filter_member_by_suffix(members: list[tarfile.TarInfo], suffix: str = '.txt', tags=None) -> tarfile.TarInfo:
     """
     Generator to filter members of a Tarfile by file suffix
 
     :param members: list of TarInfo objects
     :param suffix: suffix to look for
+    :param tags: only pass wheels compatible with these tags, see lenitools.interpreter.Leni_interpreter_tags
 
     :return: next TarInfo object with suffix
     """
     for tarinfo in members:
-        if os.path.splitext(tarinfo.name)[1] == suffix:
+        if os.path.splitext(tarinfo.name)[1] == suffix and (tags is None or Leni_wheel_is_compatible(tarinfo.name, tags)):
             yield tarinfo
 
 
@@ -68,17 +215,34 @@ def get_maya_install_dir(version: str) -> str:
     """
     return Maya Installation Directory
 
-    Currently, only works in Maya itself
+    Installations are looked up in the default directories or $LENITOOLS_MAYA_ROOTS,
+    see lenitools.mayainstall.Leni_maya_installs.
 
-    :param version: Return installation of specific Maya Version. Currently unused. Required.
+    :param version: Return installation of specific Maya Version, e.g. '2024'. Empty for the running Maya.
 
-    :return: installation directory of Maya
+    :return: installation directory of Maya, empty if it is not installed
     """
-    if is_maya:
-        return os.environ['MAYA_LOCATION'].rstrip(os.path.sep).rstrip('/')
+    if version:
+        install = Leni_maya_install(version)
+        if install is not None:
+            return install.location.rstrip(os.path.sep).rstrip('/')
+    if is_maya and os.environ.get('MAYA_LOCATION'):
+        import maya.cmds as cmds
+        if not version or str(version) == cmds.about(version=True):
+            # running Maya, installed in a directory without its version in the name
+            return os.environ['MAYA_LOCATION'].rstrip(os.path.sep).rstrip('/')
     return ''
 
 
+def get_python_interpreter() -> str:
+    """
+    return the python interpreter to install modules for
+
+    :return: mayapy inside of Maya, python3 otherwise
+    """
+    return '{}/bin/mayapy'.format(os.environ['MAYA_LOCATION']) if is_maya else 'python3'
+
+
 def info_string() -> str:
     """
     Returns a string with some information about the Maya installation
@@ -92,7 +256,10 @@ def info_string() -> str:
 
     :return: system information as string
     """
-    maya_version = cmds.about(version=True) if is_maya else ''
+    maya_version = ''
+    if is_maya:
+        import maya.cmds as cmds
+        maya_version = cmds.about(version=True)
     # T: #CMD Results in sth. like:
     # T: #CMD    Maya 2023, Python 2.9 on Windows <with PyMEL>
     # T: #CMD    Installed in C:\Program Files\Autodesk\Maya2023
@@ -103,7 +270,7 @@ def info_string() -> str:
         python_version=_("Python {version}").format(version=platform.python_version()),
         system=platform.system(),
         # T: #CMD "PyMEL" is the name of a Python Module (https://pypi.org/project/pymel/)
-        pymel=_('<with PyMEL>') if not pymel_supported else '',
+        pymel=_('<with PyMEL>') if pymel_supported else '',
         # T: #CMD
         install_path='{}{}{}'.format('\n', '', _('Installed in {directory}').format(get_maya_install_dir(version=maya_version)))
     )
@@ -113,12 +280,22 @@ def install_module(*args, **kwargs) -> int:
     """
     Install a python module or wheel
 
+    Wheels, which are already installed in the same version, are skipped.
+
     :param args: list of modules or wheel files to install
     :param kwargs: keyword arguments
     
     keyword arguments:
         path: directory containing wheel files to install
         verbosity: verbosity level
+        batch: install all wheels with a single pip call, defaults to False
+        interpreter: python interpreter to install the modules for, see get_python_interpreter
+        jobs: number of pip processes to run at the same time, defaults to 1
+        timeout: seconds after which a pip process is killed, defaults to 60
+        reinstall: install wheels even if they are already installed, defaults to False
+        plan: actions planned before for the wheels, see Leni_install_plan, the others are planned here
+        native: unpack pure python wheels without pip, see Leni_install_wheel, defaults to False
+        schedule: install wheels in waves, after the wheels they depend on, defaults to False
     """
     if len(args) < 1 and 'path' not in kwargs.keys():
         return False
@@ -127,25 +304,190 @@ def install_module(*args, **kwargs) -> int:
     if 'path' in kwargs.keys():
         return len([x for x in filter(lambda y: y, [install_module(str(wheel)) for wheel in Path(kwargs.get('path')).iterdir()])])
 
-    python_interpreter = '{}/bin/mayapy'.format(os.environ['MAYA_LOCATION']) if is_maya else 'python3'
+    python_interpreter = kwargs.get('interpreter') or get_python_interpreter()
     pip_options = kwargs.get('pip_options', ['user'])
-    commands = []
+    verbosity = kwargs.get('verbosity', 0)
+
+    if not kwargs.get('reinstall', False):
+        # wheels planned before, e.g. for --dry-run, are matched by their file name
+        known = {Path(action.wheel).name: action for action in kwargs.get('plan') or []}
+        unknown = [wheel for wheel in args if Path(wheel).name not in known]
+        planned = {}
+        if unknown:
+            with Leni_timing_span('plan') as span:
+                plan = Leni_install_plan(*unknown, interpreter=python_interpreter)
+                span.add(files=len(plan))
+            print_plan(plan, min_level=2, verbose=verbosity)
+            planned = {action.wheel: action for action in plan}
+        args = [str(wheel) for wheel in args
+                if (known.get(Path(wheel).name) or planned[str(wheel)]).action != 'skip']
+        if not args:
+            return 0
+
+    waves = [list(args)]
+    if kwargs.get('schedule', False):
+        # markers of the dependencies, e.g. "python_version < '3.11'", are evaluated for the target interpreter
+        info = Leni_interpreter_info(python_interpreter)
+        with Leni_timing_span('schedule') as span:
+            schedule = Leni_schedule_waves(*args, environment=info.environment if info is not None else None)
+            span.add(files=len(args))
+        print_schedule(schedule, Leni_installed_distributions(python_interpreter), verbose=verbosity)
+        waves = schedule.waves
+
+    if kwargs.get('native', False) and 'dry-run' not in pip_options:
+        remaining = []
+        with Leni_timing_span('install_native'):
+            for filepath in args:
+                if Leni_install_wheel(filepath, native=True, fallback=False, interpreter=python_interpreter,
+                                      user='user' in pip_options):
+                    # T: #CMD
+                    print_verbose(_('Installed {module} without pip').format(module=filepath), min_level=1, verbose=verbosity)
+                else:
+                    remaining.append(filepath)
+        args = remaining
+        waves = [[filepath for filepath in wave if filepath in remaining] for wave in waves]
+        if not args:
+            return 0
+
+    if kwargs.get('batch', False):
+        with Leni_timing_span('install_batch') as span:
+            report = install_batch(args, python_interpreter, pip_options, verbosity=verbosity, timeout=kwargs.get('timeout', 60))
+            span.add(files=len(args))
+        for mode in ('batch', 'fallback', 'failed'):
+            # T: #CMD Summary of a batch installation, "mode" is one of batch, fallback or failed
+            print_verbose(_('{mode}: {amount} wheels').format(mode=mode, amount=len(report[mode])), min_level=1, verbose=verbosity)
+            for filepath in report[mode]:
+                print_verbose(filepath, min_level=2, verbose=verbosity, prefix='    ')
+        return len(report['failed'])
+
+    failed = 0
+    for wave in waves:
+        commands = []
+        for filepath in wave:
+            # T: #CMD
+            print_verbose(_('Install {module}').format(module=filepath), min_level=2, verbose=verbosity)
+            commands.append(pip_install_command(python_interpreter, pip_options, [filepath]))
 
-    for filepath in args:
-        # T: #CMD
-        print_verbose(_('Install {module}').format(module=filepath), min_level=2, verbose=kwargs.get('verbosity', 0))
-        commands.append('"{interpreter}" -m pip install {options} {module}'.format(
-            interpreter=python_interpreter, module=filepath,
-            options=' '.join(['--{}'.format(opt) for opt in pip_options]))
-        )
+        with Leni_timing_span('install_pip', jobs=kwargs.get('jobs', 1)) as span:
+            results = run_commands(commands, jobs=kwargs.get('jobs', 1), timeout=kwargs.get('timeout', 60), verbosity=verbosity)
+            for status, output, command in results:
+                # T: #CMD
+                print_verbose(_('✅') if status == 0 else _('❌'), shlex.join(command), min_level=1, verbose=verbosity)
+                failed += status != 0
+            span.add(files=len(commands))
+
+    return failed
+
+
+def install_batch(wheels, python_interpreter: str, pip_options: list[str], **kwargs) -> dict[str, list[str]]:
+    """
+    Install wheels with a single pip call and fall back to one call per wheel
+
+    All wheels are handed to pip at once, dependencies are only looked up in the directories containing
+    the wheels (``--no-index --find-links``), so pip resolves the whole set just once. Wheels that pip
+    did not report as installed are installed again, one by one, this time with access to the package index.
 
-    for status, output, command in run_commands(commands):
-        print_verbose(command, min_level=1, verbose=kwargs.get('verbosity', 0), prefix='🖥️ ')
-        print_verbose(output, min_level=2, verbose=kwargs.get('verbosity', 0))
+    :param wheels: list of wheel files
+    :param python_interpreter: python interpreter to run pip with
+    :param pip_options: pip options without leading dashes
+    :param kwargs: keyword arguments, supports verbosity and timeout
+
+    :return: dict with the wheels installed by the batch, by the fallback and the ones that failed
+    """
+    verbosity = kwargs.get('verbosity', 0)
+    timeout = kwargs.get('timeout', 60)
+    wheels = [str(wheel) for wheel in wheels]
+    report = {'batch': [], 'fallback': [], 'failed': []}
+    if not wheels:
+        return report
+
+    find_links = sorted(set(str(Path(wheel).parent) for wheel in wheels))
+    find_links = ['find-links={}'.format(directory) for directory in find_links]
+    command = pip_install_command(python_interpreter, pip_options + ['no-index'] + find_links, wheels)
+
+    installed = set()
+    batch_status = 1
+    for status, output, cmd in run_commands([command], timeout=timeout, verbosity=verbosity):
+        installed.update(parse_pip_installed(output))
+        batch_status = status
+
+    remaining = []
+    for wheel in wheels:
+        try:
+            wheel_name = Leni_wheel_parse_filename(wheel)
+            project = (wheel_name.project, wheel_name.version)
+        except ValueError:
+            project = None
+        if batch_status == 0 or project in installed:
+            report['batch'].append(wheel)
+        else:
+            remaining.append(wheel)
+
+    for wheel in remaining:
         # T: #CMD
-        print_verbose(_('✅') if status == 0 else _('❌'), min_level=1, verbose=kwargs.get('verbosity', 0))
+        print_verbose(_('Install {module}').format(module=wheel), min_level=2, verbose=verbosity)
+        status = 1
+        command = pip_install_command(python_interpreter, pip_options + find_links, [wheel])
+        for status, output, cmd in run_commands([command], timeout=timeout, verbosity=verbosity):
+            pass
+        report['fallback' if status == 0 else 'failed'].append(wheel)
+    return report
 
-    return 0
+
+def list_wheels(files, tags=None, **kwargs) -> list[str]:
+    """
+    List wheel files and wheels inside of archives without extracting anything
+
+    :param files: wheel files and archives
+    :param tags: only list wheels compatible with these tags, see lenitools.interpreter.Leni_interpreter_tags
+    :param kwargs: keyword arguments, passed to iter_archive_members
+    :return: list of wheel files and archive members
+    """
+    wheels = []
+    archives = []
+    for file in files:
+        if Path(file).suffix == '.whl':
+            wheels.append(str(file))
+        else:
+            archives.append(file)
+    wheels.extend(member['name'] for _archive, member in iter_archive_members(*archives, **kwargs)
+                  if Path(member['name']).suffix == '.whl')
+    if tags is not None:
+        tags = frozenset(tags)
+        wheels = [wheel for wheel in wheels if Leni_wheel_is_compatible(wheel, tags)]
+    return wheels
+
+
+def parse_pip_installed(output: str) -> set[tuple[str, str]]:
+    """
+    Parse the "Successfully installed" line of pip's output
+
+    :param output: output of pip install
+
+    :return: set of (normalized project name, version) tuples
+    """
+    installed = set()
+    for line in output.splitlines():
+        if not line.startswith('Successfully installed '):
+            continue
+        for requirement in line[len('Successfully installed '):].split():
+            name, _separator, version = requirement.rpartition('-')
+            installed.add((Leni_wheel_normalize_name(name), version))
+    return installed
+
+
+def pip_install_command(python_interpreter: str, pip_options: list[str], modules: list[str]) -> list[str]:
+    """
+    Build a command to install modules with pip
+
+    :param python_interpreter: python interpreter to run pip with
+    :param pip_options: pip options without leading dashes, e.g. 'user' or 'find-links=/path/to/wheels'
+    :param modules: modules or wheel files to install
+
+    :return: command as list of arguments
+    """
+    return [str(python_interpreter), '-m', 'pip', 'install'] + \
+        ['--{}'.format(opt) for opt in pip_options] + [str(module) for module in modules]
 
 
 def list_archive(*args, **kwargs) -> dict[str, list[str]]:
@@ -154,8 +496,12 @@ def list_archive(*args, **kwargs) -> dict[str, list[str]]:
 
     Currently, only tar-archives are supported.
 
+    The members are read from the index of each archive, which is built on the first call.
+    Archives are listed at the same time, archives that can't be listed are reported and have no members.
+
     :param args: list of archive files to scan
-    :param kwargs: keyword arguments, currently not supported
+    :param kwargs: keyword arguments, supports cache_dir to keep the index in, shared for a cache shared by
+        many hosts, jobs for the number of archives to list at once and verbosity
     
     :return: dict, grouped by archive file with a list of wheel-files in each archive file.
     
@@ -177,19 +523,121 @@ def list_archive(*args, **kwargs) -> dict[str, list[str]]:
     ```
     
     """
-    archive_items = {}
-    archives = filter(lambda f: Path(f).is_file() and tarfile.is_tarfile(f), args)
-
-    for filepath in archives:
-        with tarfile.open(filepath) as archive:
-            archive_items[filepath] = archive.getnames()
+    archive_items = {filepath: [] for filepath in args if Leni_archive_format(filepath) is not None}
+    for archive, member in iter_archive_members(*archive_items, **kwargs):
+        archive_items[archive].append(member['name'])
     return archive_items
 
 
+def iter_archive_members(*args, **kwargs):
+    """
+    Generator listing the members of archives at the same time, archives that can't be listed are reported
+
+    :param args: list of archive files to scan, other files are skipped
+    :param kwargs: keyword arguments, supports cache_dir, shared, jobs and verbosity, see list_archive
+    :return: next (archive, member) tuple, see lenitools.install.Leni_iter_archive_members
+    """
+    archives = (filepath for filepath in args if Leni_archive_format(filepath) is not None)
+    for record in Leni_iter_archive_members(*archives, jobs=kwargs.get('jobs', 4), cache_dir=kwargs.get('cache_dir'),
+                                            shared=kwargs.get('shared', False)):
+        if record.error is not None:
+            # T: #CMD
+            print_verbose(_('Can not list {file}: {error}').format(file=record.archive, error=record.error), min_level=0,
+                          verbose=kwargs.get('verbosity', 0), file=sys.stderr)
+            continue
+        yield record.archive, record.member
+
+
+def is_installable(filepath, tags=None, **kwargs) -> bool:
+    """
+    return whether a file is a wheel, that an interpreter supporting <tags> can install
+
+    :param filepath: filepath
+    :param tags: tags supported by the target interpreter, None accepts all wheels
+    :param kwargs: keyword arguments, supports verbosity and names, the file names of the selected wheels
+    """
+    if Path(filepath).suffix != '.whl':
+        return False
+    if kwargs.get('names') is not None and Path(filepath).name not in kwargs['names']:
+        return False
+    if tags is None or Leni_wheel_is_compatible(filepath, tags):
+        return True
+    # T: #CMD
+    print_verbose(_('Skip {file}, it is built for another platform').format(file=filepath), min_level=2,
+                  verbose=kwargs.get('verbosity', 0))
+    return False
+
+
+def print_files(files, verbosity: int = 0):
+    """
+    Generator to print files while passing them on
+
+    :param files: iterable of files
+    :param verbosity: verbosity level
+    :return: next file
+    """
+    for file in files:
+        print_verbose(file, min_level=1, verbose=verbosity)
+        yield file
+
+
+def print_plan(plan, **kwargs) -> None:
+    """
+    print an installation plan as returned by Leni_install_plan
+
+    :param plan: list of planned actions
+    :param kwargs: keyword arguments passed to print_verbose
+    """
+    actions = {
+        # T: #CMD Planned action for a wheel
+        'install': _('install'),
+        # T: #CMD Planned action for a wheel
+        'upgrade': _('upgrade'),
+        # T: #CMD Planned action for a wheel
+        'skip': _('skip'),
+    }
+    for action in plan:
+        print_verbose('{action:<10} {project} {version}{installed}'.format(
+            action=actions[action.action], project=action.project, version=action.version,
+            # T: #CMD Version of a module that is already installed
+            installed=' ({})'.format(_('installed: {version}').format(version=action.installed)) if action.installed else ''
+        ), **kwargs)
+
+
+def print_schedule(schedule, installed: dict[str, str], **kwargs) -> None:
+    """
+    print the waves of a schedule as returned by Leni_schedule_waves, with its cycles and missing dependencies
+
+    :param schedule: schedule
+    :param installed: installed distributions, these are not reported as missing
+    :param kwargs: keyword arguments, supports verbose
+    """
+    verbosity = kwargs.get('verbose', 0)
+    for number, wave in enumerate(schedule.waves, 1):
+        # T: #CMD Headline for a group of wheels, which are installed at the same time
+        print_verbose(_('Wave {number}:').format(number=number), min_level=2, verbose=verbosity)
+        for filepath in wave:
+            print_verbose(Path(filepath).name, min_level=2, verbose=verbosity, prefix='    ')
+    for cycle in schedule.cycles:
+        # T: #CMD
+        print_verbose(_('Dependency cycle: {projects}').format(projects=' -> '.join(cycle + cycle[:1])),
+                      min_level=0, verbose=verbosity, file=sys.stderr)
+    for filepath, requirements in schedule.missing.items():
+        requirements = [requirement for requirement in requirements if requirement not in installed]
+        if requirements:
+            # T: #CMD
+            print_verbose(_('{module} depends on {requirements}, which is neither installed nor part of the wheels').format(
+                module=Path(filepath).name, requirements=', '.join(requirements)
+            ), min_level=0, verbose=verbosity, file=sys.stderr)
+
+
 def print_verbose(*args, **kwargs):
     """ print depending on the verbosity level """
     verbosity = kwargs.pop('verbose', 0)
+    prefix = kwargs.pop('prefix', '')
     if verbosity >= kwargs.pop('min_level', DEFAULT_VERBOSE_LEVEL):
+        if prefix and args:
+            args = ('{}{}'.format(prefix, args[0]),) + args[1:]
         print(*args, **kwargs)
 
 
@@ -226,46 +674,108 @@ def prompt(msg, actions, options=None, settings=None, **kwargs):
     return 0
 
 
-def run_commands(commands: list[str]) -> tuple[int, str, str]:
+def run_commands(commands: list[list[str]], jobs: int = 1, timeout: float = 60, **kwargs) -> tuple[int, str, list[str]]:
     """
-    Generator to run commands in shell
+    Generator to run commands
+
+    Commands are lists of arguments and run without a shell. Up to <jobs> commands run at the same time,
+    their output is streamed line by line to print_verbose while they are running.
+    The results are yielded in the order of <commands>.
 
     Returns a tuple that contains the status code (0 for success),
     the output of the command and the command itself.
-    
-    :param commands: list of shell commands to run
+
+    :param commands: list of commands to run
+    :param jobs: number of commands to run at the same time
+    :param timeout: seconds after which a command is killed
+    :param kwargs: keyword arguments, supports verbosity
     :return: tuple with (status code, output, command)
     """
-    for command in commands:
-        # ignore empty lines
-        if not command.strip():
-            continue
+    commands = [command for command in commands if command]
+    import asyncio
+
+    yield from asyncio.run(run_commands_async(commands, jobs=jobs, timeout=timeout, **kwargs))
 
-        # run command
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            close_fds=True
-        )
-        try:
-            std_output, std_error = process.communicate(timeout=60)
-            process.terminate()
-        except subprocess.TimeoutExpired:
-            process.kill()
-            std_output, std_error = process.communicate()
 
-        # decode output
-        std_output = std_output.decode()
-        std_error = std_error.decode()
+async def run_commands_async(commands: list[list[str]], jobs: int = 1, timeout: float = 60,
+                             **kwargs) -> list[tuple[int, str, list[str]]]:
+    """
+    Run commands concurrently, see run_commands
 
-        if std_error:
-            yield 1, std_error.strip(), command.strip()
+    :param commands: list of commands to run
+    :param jobs: number of commands to run at the same time
+    :param timeout: seconds after which a command is killed
+    :param kwargs: keyword arguments, supports verbosity
+    :return: list of tuples with (status code, output, command)
+    """
+    import asyncio
 
-        std_output = '\n' + std_output.rstrip() if len(std_output.splitlines()) > 1 else std_output.rstrip()
-        yield 0, std_output, command.strip()
+    semaphore = asyncio.Semaphore(max(jobs, 1))
+    return await asyncio.gather(*[
+        run_command_async(
+            command, semaphore, timeout=timeout, prefix='[{}] '.format(number) if jobs > 1 and len(commands) > 1 else '',
+            **kwargs
+        ) for number, command in enumerate(commands, 1)
+    ])
+
+
+async def run_command_async(command: list[str], semaphore: 'asyncio.Semaphore', timeout: float = 60,
+                            **kwargs) -> tuple[int, str, list[str]]:
+    """
+    Run a command and stream its output line by line to print_verbose
+
+    :param command: command to run
+    :param semaphore: semaphore limiting the number of commands running at the same time
+    :param timeout: seconds after which the command is killed
+    :param kwargs: keyword arguments, supports verbosity and a prefix for each line of output
+    :return: tuple with (status code, output, command)
+    """
+    import asyncio
+
+    verbosity = kwargs.get('verbosity', 0)
+    prefix = kwargs.get('prefix', '')
+    lines = []
+
+    def add_line(line: bytes):
+        line = line.decode(errors='replace').rstrip()
+        lines.append(line)
+        print_verbose(line, min_level=2, verbose=verbosity, prefix=prefix)
+
+    async def read_lines(stream):
+        # read chunks instead of lines, a line longer than the limit of the stream (64 KiB) would raise
+        pending = b''
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            *complete, pending = (pending + chunk).split(b'\n')
+            for line in complete:
+                add_line(line)
+        if pending:
+            add_line(pending)
+
+    async with semaphore:
+        print_verbose(shlex.join(command), min_level=1, verbose=verbosity, prefix='{}🖥️ '.format(prefix))
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError as error:
+            # e.g. the interpreter does not exist, reported like a failed command
+            print_verbose(str(error), min_level=1, verbose=verbosity, prefix=prefix, file=sys.stderr)
+            return 127, str(error), command
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(read_lines(process.stdout), read_lines(process.stderr), process.wait()), timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            # T: #CMD
+            message = _('Killed after {seconds} seconds.').format(seconds=timeout)
+            lines.append(str(message))
+            print_verbose(message, min_level=1, verbose=verbosity, prefix=prefix, file=sys.stderr)
+    return process.returncode, '\n'.join(lines), command
 
 
 def run():
@@ -339,6 +849,11 @@ def main(arguments) -> int:
         # T: #CMD Help text
         help=_('Look recursively for files.')
     )
+    cli_arg_grp.add_argument(
+        '-i', '--ignore', action='append', default=list(DEFAULT_IGNORE), metavar='PATTERN',
+        # T: #CMD Help text
+        help=_('Skip files and directories matching this glob pattern. Can be given more than once.')
+    )
     cli_arg_grp.add_argument(
         '-v', '--verbose', action='count',
         # T: #CMD Help text
@@ -354,6 +869,61 @@ def main(arguments) -> int:
         # T: #CMD Help text
         help=_('Install modules system-wide, not in user space.')
     )
+    cli_arg_grp.add_argument(
+        '-j', '--jobs', type=int, default=1, metavar='N',
+        # T: #CMD Help text
+        help=_('Number of worker processes to extract archives with, 0 uses one per CPU.')
+    )
+    cli_arg_grp.add_argument(
+        '--cache', action='store_true',
+        # T: #CMD Help text
+        help=_('Reuse wheels extracted from unchanged archives by earlier runs.')
+    )
+    cli_arg_grp.add_argument(
+        '--cache-dir', type=str, metavar='DIR',
+        # T: #CMD Help text
+        help=_('Directory of the extraction cache. Implies --cache.')
+    )
+    cli_arg_grp.add_argument(
+        '--cache-size', type=int, metavar='MB',
+        # T: #CMD Help text
+        help=_('Size limit of the extraction cache in megabytes.')
+    )
+    cli_arg_grp.add_argument(
+        '--shared-cache', type=str, metavar='DIR',
+        # T: #CMD Help text
+        help=_('Extraction cache shared by many hosts, e.g. on NFS. Each archive is read and extracted by one host only, the others reuse the result.')
+    )
+    cli_arg_grp.add_argument(
+        '--install-jobs', type=int, default=1, metavar='N',
+        # T: #CMD Help text
+        help=_('Number of pip processes to run at the same time.')
+    )
+    cli_arg_grp.add_argument(
+        '--timeout', type=float, default=60, metavar='SECONDS',
+        # T: #CMD Help text
+        help=_('Seconds after which a pip process is killed.')
+    )
+    cli_arg_grp.add_argument(
+        '--schedule', action='store_true',
+        # T: #CMD Help text
+        help=_('Install wheels in waves, after the wheels they depend on. Wheels of a wave run in parallel.')
+    )
+    cli_arg_grp.add_argument(
+        '--batch', action='store_true',
+        # T: #CMD Help text
+        help=_('Install all wheels with a single pip call, fall back to one call per failed wheel.')
+    )
+    cli_arg_grp.add_argument(
+        '--native', action='store_true',
+        # T: #CMD Help text
+        help=_('Unpack pure python wheels directly, without pip. Other wheels are installed with pip.')
+    )
+    cli_arg_grp.add_argument(
+        '--reinstall', action='store_true',
+        # T: #CMD Help text
+        help=_('Install wheels even if the same version is already installed.')
+    )
     cli_arg_grp.add_argument(
         '-y', '--yes', action='store_true',
         # T: #CMD Help text
@@ -364,6 +934,41 @@ def main(arguments) -> int:
         # T: #CMD Help text
         help=_('Strict mode: Only look for .whl wheel files, ignore archives.')
     )
+    cli_arg_grp.add_argument(
+        '--all-platforms', action='store_true',
+        # T: #CMD Help text
+        help=_('Also extract and install wheels built for other platforms or python versions than the target interpreter.')
+    )
+    cli_arg_grp.add_argument(
+        '--pins', metavar='FILE',
+        # T: #CMD Help text
+        help=_('Only install versions matching the pins in FILE, written like a requirements file, e.g. "numpy==1.26.4".')
+    )
+    cli_arg_grp.add_argument(
+        '--all-versions', action='store_true',
+        # T: #CMD Help text
+        help=_('Install every wheel found, not only the best wheel of each project. Ignores --pins.')
+    )
+    cli_arg_grp.add_argument(
+        '--maya', action='append', metavar='VERSION',
+        # T: #CMD Help text
+        help=_('Install into the mayapy of this Maya version, e.g. 2024. Can be given more than once.')
+    )
+    cli_arg_grp.add_argument(
+        '--all-maya', action='store_true',
+        # T: #CMD Help text
+        help=_('Install into all Maya versions found, at the same time. Each gets the wheels for its python version. Set $LENITOOLS_MAYA_ROOTS to look in other directories.')
+    )
+    cli_arg_grp.add_argument(
+        '--profile', metavar='FILE',
+        # T: #CMD Help text
+        help=_('Write the wall time, bytes read and written and files processed of each phase as JSON to FILE.')
+    )
+    cli_arg_grp.add_argument(
+        '--cprofile', metavar='FILE',
+        # T: #CMD Help text
+        help=_('Write cProfile statistics to FILE, e.g. for snakeviz or pstats.')
+    )
     cli_arg_grp.add_argument(
         '-h', '--help', action='help',
         # T: #CMD Help text
@@ -371,7 +976,220 @@ def main(arguments) -> int:
     )
 
     args = parser.parse_args(arguments)
+    if not (args.profile or args.cprofile):
+        return install_from_args(args)
+
+    profiler = None
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+    Leni_timing_enable()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        with Leni_timing_span('main'):
+            return install_from_args(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if args.profile:
+            Leni_timing_write(args.profile)
+        Leni_timing_enable(False)
+
+
+def confirm_installation() -> int:
+    """
+    Ask the user whether to continue with the installation
+
+    :return: 0 to continue, see prompt
+    """
+    # T: #CMD
+    message = _('Do you want to continue with installation?  (Y/n) ')
+    actions = {
+        'y': 'OK',
+        'n': 'Cancel'
+    }
+    settings = {
+        'verbosity_map': [
+            # T: #CMD
+            '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)')),
+            # T: #CMD
+            '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)')),
+            # T: #CMD
+            '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)'))
+        ]
+    }
+    return prompt(message, actions, settings=settings)
+
+
+def find_maya_installs(versions=None, **kwargs) -> list:
+    """
+    return the Maya installations to install into
+
+    :param versions: Maya versions, e.g. ['2024'], Defaults to all installations
+    :param kwargs: keyword arguments, supports verbosity
+    :return: list of installations, see lenitools.mayainstall.Leni_maya_installs, empty if one is missing
+    """
+    verbosity = kwargs.get('verbosity', 0)
+    if not versions:
+        installs = Leni_maya_installs()
+        if not installs:
+            # T: #CMD
+            print_verbose(_('Found no Maya installation with mayapy.'), min_level=0, verbose=verbosity, file=sys.stderr)
+        return installs
+
+    installs = []
+    for version in versions:
+        install = Leni_maya_install(version)
+        if install is None:
+            # T: #CMD
+            print_verbose(_('Maya {version} is not installed.').format(version=version), min_level=0, verbose=verbosity,
+                          file=sys.stderr)
+            return []
+        if install not in installs:
+            installs.append(install)
+    return installs
+
+
+def install_into_mayas(installs, files, args, pip_options: list[str], **kwargs) -> int:
+    """
+    Install wheels into several Maya versions at the same time
+
+    Each mayapy gets the best wheels for its python version and platform. Archives are extracted once for all
+    of them, then one job per mayapy installs its wheels. Maya versions sharing a python version share the
+    user site-packages, so these install one after another, unless installing system-wide.
+
+    :param installs: Maya installations, see find_maya_installs
+    :param files: wheel files and archives
+    :param args: parsed command line arguments
+    :param pip_options: pip options, see pip_install_command
+    :param kwargs: keyword arguments, supports cache_dir, shared and verbosity
+    :return: exit code
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+
+    verbosity = kwargs.get('verbosity', 0)
+    cache_dir = kwargs.get('cache_dir')
+    shared = kwargs.get('shared', False)
+    pins = Leni_read_pins(args.pins) if args.pins else None
+
+    def select(maya):
+        # starting each mayapy takes seconds, the answers are cached
+        info = Leni_interpreter_info(maya.interpreter, cache_dir=args.cache_dir)
+        if info is None:
+            return None, []
+        tags = frozenset(info.tags)
+        if args.all_versions:
+            return info, [wheel for wheel in candidates if args.all_platforms or Leni_wheel_is_compatible(wheel, tags)]
+        return info, Leni_select_wheels(*candidates, tags=info.tags, keep_incompatible=args.all_platforms,
+                                        pins=pins).selected
+
+    with Leni_timing_span('select') as span:
+        candidates = list_wheels(files, cache_dir=cache_dir, shared=shared)
+        with ThreadPoolExecutor(max_workers=len(installs)) as executor:
+            targets = list(zip(installs, executor.map(select, installs)))
+        span.add(files=len(candidates))
+
+    for maya, (info, _wheels) in targets:
+        if info is None:
+            # T: #CMD
+            print_verbose(_('Can not run {interpreter}, Maya {version} is skipped.').format(
+                interpreter=maya.interpreter, version=maya.version), min_level=0, verbose=verbosity, file=sys.stderr)
+
+    plans = [None] * len(targets)
+    if args.list or args.dry_run:
+        with Leni_timing_span('plan') as span:
+            with ThreadPoolExecutor(max_workers=len(installs)) as executor:
+                plans = list(executor.map(
+                    lambda target: Leni_install_plan(*target[1][1], interpreter=target[0].interpreter) if target[1][0] else [],
+                    targets
+                ))
+            span.add(files=sum(len(plan) for plan in plans))
+        for (maya, (info, _wheels)), plan in zip(targets, plans):
+            if info is None:
+                continue
+            # T: #CMD Headline of the list of planned actions for one Maya version
+            print_verbose(_('Installation plan for Maya {version}, Python {python_version}:').format(
+                version=maya.version, python_version=info.python_version), min_level=-1, verbose=verbosity)
+            print_plan(plan, min_level=-1, verbose=verbosity)
+
+    if args.list:
+        return 0
+
+    if not args.yes and confirm_installation() != 0:
+        return 1
+
+    # T: #CMD
+    print_verbose(_('Extract archives and collect wheels'), min_level=1, verbose=verbosity)
+    names = frozenset(Path(wheel).name for _maya, (_info, wheels) in targets for wheel in wheels)
+    with Leni_timing_span('extract') as span:
+        extracted_files = extract_filelist_by_suffix(
+            files, filter_func=functools.partial(is_installable, names=names, verbosity=verbosity),
+            verbosity=verbosity, jobs=args.jobs, names=names,
+            cache=args.cache or cache_dir is not None, cache_dir=cache_dir, shared=shared,
+            cache_size=args.cache_size * 1024 ** 2 if args.cache_size else None
+        )
+        # the same wheel may be found in several places, install it once
+        extracted = {}
+        for file in extracted_files:
+            extracted.setdefault(Path(file).name, file)
+        span.add(files=len(extracted))
+
+    # T: #CMD
+    print_verbose(_('Install wheels'), min_level=1, verbose=verbosity)
+    user_site_locks = {}
+    for _maya, (info, _wheels) in targets:
+        if info is not None:
+            user_site_locks.setdefault('.'.join(info.python_version.split('.')[:2]), threading.Lock())
+
+    def install_target(target, plan):
+        maya, (info, wheels) = target
+        start = time.perf_counter()
+        if info is None:
+            return maya, info, 0, 1, 0.0
+        wheels = [extracted[Path(wheel).name] for wheel in wheels if Path(wheel).name in extracted]
+        if 'user' in pip_options:
+            lock = user_site_locks['.'.join(info.python_version.split('.')[:2])]
+        else:
+            lock = threading.Lock()
+        with lock, Leni_timing_span('install', maya=maya.version):
+            failed = install_module(
+                *wheels, interpreter=maya.interpreter, pip_options=pip_options, batch=args.batch,
+                reinstall=args.reinstall, native=args.native, jobs=args.install_jobs, timeout=args.timeout,
+                schedule=args.schedule, verbosity=verbosity, plan=plan
+            ) if wheels else 0
+        return maya, info, len(wheels), failed, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        results = list(executor.map(install_target, targets, plans))
+
+    # T: #CMD Headline of the summary after installing into several Maya versions
+    print_verbose(_('Summary:'), min_level=0, verbose=verbosity)
+    failed = 0
+    for maya, info, amount, errors, seconds in results:
+        failed += errors != 0
+        if info is None:
+            # T: #CMD
+            report = _('Can not run {interpreter}').format(interpreter=maya.interpreter)
+        else:
+            # T: #CMD One line of the summary, e.g. "Python 3.10.8, 12 wheels, 0 failed, 4.2 s"
+            report = _('Python {python_version}, {amount} wheels, {failed} failed, {seconds:.1f} s').format(
+                python_version=info.python_version, amount=amount, failed=errors, seconds=seconds)
+        print_verbose('{} {:<14} {}'.format(_('✅') if errors == 0 else _('❌'),
+                                            _('Maya {version}').format(version=maya.version), report),
+                      min_level=0, verbose=verbosity)
+    return 1 if failed else 0
+
+
+def install_from_args(args) -> int:
+    """
+    Look for wheels and install them, as requested on the command line
 
+    :param args: parsed command line arguments
+    :return: exit code
+    """
     pip_options=[]
     if not args.system_wide:
         pip_options.append('user')
@@ -383,76 +1201,131 @@ def main(arguments) -> int:
     ignore_archives = args.strict
     if not is_maya and Path(__file__).absolute().resolve() == Path(sys.argv[0]).absolute().resolve():
         args.path = args.path[1:]
-    search_path = ''.join(args.path)
+    search_path = ', '.join(args.path)
+
+    # a shared cache is an extraction cache, that several hosts use at once
+    shared = args.shared_cache is not None
+    cache_dir = args.shared_cache if shared else args.cache_dir
+
+    # several Maya versions, each with its own mayapy, python version and tags
+    installs = None
+    if args.maya or args.all_maya:
+        installs = find_maya_installs(None if args.all_maya else args.maya, verbosity=verbosity)
+        if not installs:
+            return 1
+
+    # wheels for other platforms are never extracted, pip would reject them anyway.
+    # With --all-platforms, the tags still rank the wheels of a project, see Leni_select_wheels.
+    select = not args.all_versions
+    interpreter_tags = None
+    if installs is None and (select or not args.all_platforms):
+        interpreter_tags = Leni_interpreter_tags(get_python_interpreter())
+        if interpreter_tags is None:
+            # T: #CMD
+            print_verbose(_('Can not determine the wheel tags of {interpreter}, wheels are not filtered by platform.').format(
+                interpreter=get_python_interpreter()), min_level=1, verbose=verbosity, file=sys.stderr)
+    tags = None if args.all_platforms else interpreter_tags
 
     # Collect module files
-    files = [
-        # get all wheel files
-        file for file in Path(search_path).glob('**/*.whl' if args.recursive else '*.whl')
-    ] if ignore_archives else [
-        # get all wheel files plus any file archive
-        file for file in filter(
-            lambda f: f.is_file() and tarfile.is_tarfile(f) or f.suffix == '.whl',
-            [file for file in Path(search_path).glob('**/*.*' if args.recursive else '*.*')]
-        )
-    ]
-    # T: #CMD
-    print_verbose(_('Files in "{directory}":').format(directory=search_path), min_level=-1 if args.list else 1, verbose=verbosity)
-    for file in files:
-        print_verbose(file, min_level=-1 if args.list else 1, verbose=verbosity)
-    print_verbose(
-        # T: #CMD
-        _('Found no files.') if len(files) <= 0 else \
+    files = Leni_discover_files(*args.path, recursive=args.recursive, archives=not ignore_archives, ignore=args.ignore)
+
+    # picking the best wheel of each project needs all files, before extracting anything
+    if args.yes and not (args.list or args.dry_run or select or installs):
+        # nothing to confirm, start extracting while the scan is still running
+        files = print_files(files, verbosity)
+    else:
+        with Leni_timing_span('discover') as span:
+            files = list(files)
+            span.add(files=len(files))
         # T: #CMD
-        _('{amount} files found.').format(amount=len(files)),
+        print_verbose(_('Files in "{directory}":').format(directory=search_path), min_level=-1 if args.list else 1, verbose=verbosity)
+        for file in files:
+            print_verbose(file, min_level=-1 if args.list else 1, verbose=verbosity)
+        print_verbose(
+            # T: #CMD
+            _('Found no files.') if len(files) <= 0 else \
+            # T: #CMD
+            _('{amount} files found.').format(amount=len(files)),
 
-        min_level=-1 if args.list else 0, verbose=verbosity, file=sys.stderr if len(files) <= 0 else sys.stdout)
+            min_level=-1 if args.list else 0, verbose=verbosity, file=sys.stderr if len(files) <= 0 else sys.stdout)
 
-    if len(files) <= 0:
-        return 1
+        if len(files) <= 0:
+            return 1
+
+    if installs is not None:
+        return install_into_mayas(installs, files, args, pip_options, cache_dir=cache_dir, shared=shared,
+                                  verbosity=verbosity)
+
+    wheels = None
+    if select:
+        with Leni_timing_span('select') as span:
+            candidates = list_wheels(files, tags=tags, cache_dir=cache_dir, shared=shared)
+            selection = Leni_select_wheels(*candidates, tags=interpreter_tags, keep_incompatible=args.all_platforms,
+                                           pins=Leni_read_pins(args.pins) if args.pins else None)
+            span.add(files=len(selection.selected))
+        for wheel, reason in selection.dropped.items():
+            # T: #CMD
+            print_verbose(_('Skip {file}, {reason}').format(file=wheel, reason=reason), min_level=2, verbose=verbosity)
+        wheels = selection.selected
+
+    plan = None
+    if args.list or args.dry_run:
+        # T: #CMD Headline of the list of planned actions (install, upgrade or skip) for each wheel
+        print_verbose(_('Installation plan:'), min_level=-1, verbose=verbosity)
+        with Leni_timing_span('plan') as span:
+            planned = wheels if wheels is not None else list_wheels(files, tags=tags, cache_dir=cache_dir, shared=shared)
+            plan = Leni_install_plan(*planned, interpreter=get_python_interpreter())
+            span.add(files=len(plan))
+        print_plan(plan, min_level=-1, verbose=verbosity)
 
     if args.list:
         return 0
 
     # prompt user whether to continue with installation or not
-    if not args.yes:
-        # T: #CMD
-        message = _('Do you want to continue with installation?  (Y/n) ')
-        actions = {
-            'y': 'OK',
-            'n': 'Cancel'
-        }
-        settings = {
-            'verbosity_map': [
-                # T: #CMD
-                '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)')),
-                # T: #CMD
-                '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)')),
-                # T: #CMD
-                '{}{}'.format('\n', _('(Archives, that do not contain python wheels will be ignored automatically)'))
-            ]
-        }
-        prompt(message, actions, settings=settings)
+    if not args.yes and confirm_installation() != 0:
+        return 1
 
     # T: #CMD
     print_verbose(_('Prepare installation'), min_level=1, verbose=verbosity)
     # T: #CMD
     print_verbose(_('Extract archives and collect wheels'), min_level=1, verbose=verbosity)
-    extracted_files = extract_filelist_by_suffix(files, filter_func=lambda f: Path(f).suffix == '.whl')
+    names = frozenset(Path(wheel).name for wheel in wheels) if wheels is not None else None
+    with Leni_timing_span('extract') as span:
+        extracted_files = extract_filelist_by_suffix(
+            files, filter_func=functools.partial(is_installable, tags=tags, names=names, verbosity=verbosity),
+            verbosity=verbosity, jobs=args.jobs, tags=tags, names=names,
+            cache=args.cache or cache_dir is not None, cache_dir=cache_dir, shared=shared,
+            cache_size=args.cache_size * 1024 ** 2 if args.cache_size else None
+        )
+        if names is not None:
+            # the same wheel may be found in several places, install it once
+            unique = {}
+            for file in extracted_files:
+                unique.setdefault(Path(file).name, file)
+            extracted_files = list(unique.values())
+        span.add(files=len(extracted_files))
+    if len(extracted_files) <= 0:
+        # T: #CMD
+        print_verbose(_('Found no files.'), min_level=0, verbose=verbosity, file=sys.stderr)
+        return 1
 
     # T: #CMD
     print_verbose(_('Install wheels'), min_level=1, verbose=verbosity)
-    install_module(extracted_files, pip_options=pip_options)
+    with Leni_timing_span('install'):
+        failed = install_module(
+            *extracted_files, pip_options=pip_options, batch=args.batch, reinstall=args.reinstall, native=args.native,
+            jobs=args.install_jobs, timeout=args.timeout, schedule=args.schedule, verbosity=verbosity, plan=plan
+        )
 
     # T: #CMD
     print_verbose(_('Finished.'), min_level=3, verbose=verbosity)
-    return 0
+    return 1 if failed else 0
 
 
 if __name__ == '__main__':
     if not is_maya:
         # run as command line application, without Maya
         arguments = sys.argv if len(sys.argv) > 1 else ['-h']
-        main(arguments)
+        sys.exit(main(arguments))
     else:
         run()
@@ -9,7 +9,8 @@ except (ModuleNotFoundError, ImportError):
 setup(
     name='leni-tools',
     version='1.0',
-    packages=['lenitools'],
+    packages=['lenitools', 'lenitools.filter'],
+    package_data={'lenitools': ['locale/*/LC_MESSAGES/*.mo']},
     url='https://github.com/lenimagesvonhinten/leni-tools',
     license='Apache 2.0 License',
     author='Leni mag es von Hinten',